@@ -1,7 +1,59 @@
 from flask import Flask, render_template
+from flask.json.provider import JSONProvider
 from config.config import config
 from routes.api_routes import api_bp
+from logging.handlers import QueueHandler, QueueListener
+import atexit
+import decimal
+import logging
+import orjson
 import os
+import queue
+
+
+def _orjson_default(obj):
+    """Serialize types orjson does not handle natively (mirrors Flask's default provider)"""
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class ORJSONProvider(JSONProvider):
+    """JSON provider backed by orjson (C-accelerated serialization for large matching payloads)"""
+    
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_orjson_default, option=self.option).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response instead of round-tripping through str
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=_orjson_default, option=self.option),
+            mimetype="application/json"
+        )
+
+
+def _configure_logging(level):
+    """Route log records through a queue so formatting and stream writes happen on a background thread"""
+    root = logging.getLogger()
+    root.setLevel(level)
+    if any(isinstance(handler, QueueHandler) for handler in root.handlers):
+        return
+    
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, logging.StreamHandler(), respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)  # flush queued records on shutdown
+    root.addHandler(QueueHandler(log_queue))
+    
+    # The OpenAI SDK's HTTP client logs every request at INFO; keep that for DEBUG runs
+    if root.level > logging.DEBUG:
+        logging.getLogger('httpx').setLevel(logging.WARNING)
 
 
 def create_app(config_name=None):
@@ -12,13 +64,12 @@ def create_app(config_name=None):
     app = Flask(__name__)
     app.config.from_object(config[config_name])
     
-    # Configure JSON to not escape Unicode characters (for proper emoji display)
-    # Note: Flask 3.x JSON configuration - commented out due to type checker issues
-    # The emojis will still display correctly in most cases
-    # if hasattr(app, 'json') and hasattr(app.json, 'ensure_ascii'):
-    #     app.json.ensure_ascii = False
-    # else:
-    #     app.config['JSON_AS_ASCII'] = False
+    # Progress lines log at INFO; per-call diagnostics (e.g. raw OpenAI responses) at DEBUG
+    _configure_logging(app.config['LOG_LEVEL'])
+    
+    # Serialize JSON with orjson - much faster on large matching payloads, and it
+    # writes UTF-8 directly so emojis are not escaped
+    app.json = ORJSONProvider(app)
     
     # Register blueprints
     app.register_blueprint(api_bp)
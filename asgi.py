@@ -0,0 +1,16 @@
+"""
+ASGI entry point for production serving
+
+Wraps the Flask app with asgiref so uvicorn workers can serve it. Each request
+runs in asgiref's thread pool, so a long /matching/process-batch call blocked on
+Salesforce/OpenAI I/O no longer holds up other requests.
+
+Run with:
+    uvicorn asgi:asgi_app --workers 4 --loop uvloop
+"""
+
+from asgiref.wsgi import WsgiToAsgi
+from app import create_app
+
+app = create_app()
+asgi_app = WsgiToAsgi(app)
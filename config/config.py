@@ -86,6 +86,7 @@ class Config:
     """Base configuration class"""
     DEBUG = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()  # DEBUG adds per-call OpenAI diagnostics
     
     # Salesforce Configuration
     SF_USERNAME = os.getenv('SF_USERNAME')
@@ -97,11 +98,34 @@ class Config:
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
     OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo')
     OPENAI_MAX_TOKENS = int(os.getenv('OPENAI_MAX_TOKENS', '1000'))
+    OPENAI_FAST_MODEL = os.getenv('OPENAI_FAST_MODEL', 'gpt-4o-mini')  # Model for clear-cut match pairs (empty = always gpt-4o)
+    OPENAI_FAST_MODEL_LOW_SCORE = float(os.getenv('OPENAI_FAST_MODEL_LOW_SCORE', '35'))  # All scores below this use the fast model; keep above AI_SKIP_LOW_SCORE when that is set
     
     # Batch Processing Configuration
     SALESFORCE_BATCH_SIZE = int(os.getenv('SALESFORCE_BATCH_SIZE', '200'))  # SOQL IN clause safety
     OPENAI_BATCH_SIZE = int(os.getenv('OPENAI_BATCH_SIZE', '10'))  # Concurrent API calls
-    OPENAI_RATE_LIMIT_DELAY = float(os.getenv('OPENAI_RATE_LIMIT_DELAY', '0.5'))  # Seconds between calls
+    OPENAI_REQUESTS_PER_MINUTE = float(os.getenv('OPENAI_REQUESTS_PER_MINUTE', '500'))  # Request rate across concurrent calls (0 = unlimited)
+    OPENAI_TOKENS_PER_MINUTE = float(os.getenv('OPENAI_TOKENS_PER_MINUTE', '0'))  # Estimated prompt and reply tokens per minute (0 = unlimited)
+    OPENAI_PAIRS_PER_REQUEST = int(os.getenv('OPENAI_PAIRS_PER_REQUEST', '1'))  # Match pairs assessed per chat completion
+    OPENAI_MAX_RETRIES = int(os.getenv('OPENAI_MAX_RETRIES', '5'))  # SDK retries on 429/5xx/connection errors, with backoff
+    OPENAI_TIMEOUT = float(os.getenv('OPENAI_TIMEOUT', '60'))  # Seconds per OpenAI request attempt (connect times out after 5)
+    AI_SKIP_LOW_SCORE = float(os.getenv('AI_SKIP_LOW_SCORE', '0'))  # Website, name and address all below this skip OpenAI (0 = disabled)
+    AI_ASSESSMENT_CACHE_TTL = float(os.getenv('AI_ASSESSMENT_CACHE_TTL', '86400'))  # Seconds to reuse AI assessments (0 disables)
+    AI_ASSESSMENT_CACHE_SIZE = int(os.getenv('AI_ASSESSMENT_CACHE_SIZE', '5000'))  # Max cached AI assessments
+    AI_ASSESSMENT_CACHE_PATH = os.getenv('AI_ASSESSMENT_CACHE_PATH', '')  # SQLite file shared across workers/restarts (empty = memory only)
+    FUZZY_MATCH_WORKERS = int(os.getenv('FUZZY_MATCH_WORKERS', str(os.cpu_count() or 1)))  # Fuzzy matching processes
+    FUZZY_PARALLEL_THRESHOLD = int(os.getenv('FUZZY_PARALLEL_THRESHOLD', '32'))  # Min customers before using processes
+    FUZZY_FULL_SCAN_LIMIT = int(os.getenv('FUZZY_FULL_SCAN_LIMIT', '500'))  # Max shells scored in full when no bucket matches
+    FUZZY_MAX_CANDIDATES = int(os.getenv('FUZZY_MAX_CANDIDATES', '50'))  # Max bucketed shells scored per customer
+    SF_RECORD_CACHE_TTL = float(os.getenv('SF_RECORD_CACHE_TTL', '300'))  # Seconds to reuse fetched accounts (0 disables)
+    SF_RECORD_CACHE_SIZE = int(os.getenv('SF_RECORD_CACHE_SIZE', '10000'))  # Max cached accounts per type
+    SF_RECORD_CACHE_PATH = os.getenv('SF_RECORD_CACHE_PATH', '')  # SQLite file shared across workers/restarts (empty = memory only)
+    SF_RECORD_CACHE_DISK_TTL = float(os.getenv('SF_RECORD_CACHE_DISK_TTL', '86400'))  # Seconds accounts stay in the SQLite file
+    SF_VALIDATION_CACHE_SIZE = int(os.getenv('SF_VALIDATION_CACHE_SIZE', '100000'))  # Max cached ID validation results per type (shares SF_RECORD_CACHE_TTL)
+    EXCEL_WORKBOOK_TTL = int(os.getenv('EXCEL_WORKBOOK_TTL', '1800'))  # Seconds an uploaded workbook stays staged
+    SF_HTTP_POOL_SIZE = int(os.getenv('SF_HTTP_POOL_SIZE', '20'))  # Kept-alive connections to Salesforce (raised to 2x SF_QUERY_WORKERS if lower)
+    SF_QUERY_WORKERS = int(os.getenv('SF_QUERY_WORKERS', '8'))  # Concurrent SOQL batch queries per bulk fetch
+    SF_BULK_API_THRESHOLD = int(os.getenv('SF_BULK_API_THRESHOLD', '0'))  # Fetches of more IDs use Bulk API 2.0 jobs (0 = always REST, opt-in)
     
     @staticmethod
     def validate_salesforce_config():
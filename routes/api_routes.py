@@ -1,9 +1,14 @@
-from flask import Blueprint, jsonify, request, send_file
+from flask import Blueprint, Response, jsonify, request, send_file, stream_with_context
 from services.salesforce_service import SalesforceService
-from services.openai_service import test_openai_connection, test_openai_completion, get_openai_config
+from services.openai_service import test_openai_connection, test_openai_completion, get_openai_config, get_ai_match_assessments_batch, iter_ai_match_assessments
 from services.excel_service import ExcelService
 from services.fuzzy_matching_service import FuzzyMatchingService
 from config.config import Config
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from time import perf_counter
+import orjson
+import os
 
 # Create blueprint for API routes
 api_bp = Blueprint('api', __name__)
@@ -11,57 +16,140 @@ api_bp = Blueprint('api', __name__)
 # Initialize services
 sf_service = SalesforceService()
 excel_service = ExcelService()
-fuzzy_matcher = FuzzyMatchingService()
+fuzzy_matcher = FuzzyMatchingService(full_scan_limit=Config.FUZZY_FULL_SCAN_LIMIT,
+                                      max_candidates=Config.FUZZY_MAX_CANDIDATES)
+
+def _get_uploaded_workbook():
+    """
+    Resolve the workbook for a validate request - either a workbook_id staged by
+    /excel/parse or a freshly uploaded file
+    Returns:
+        Tuple of (file_source, file_name, error_response)
+    """
+    workbook_id = request.form.get('workbook_id')
+    if workbook_id and 'file' not in request.files:
+        staged_path = excel_service.get_staged_workbook(workbook_id)
+        if staged_path is None:
+            return None, None, (jsonify({
+                'status': 'error',
+                'message': 'Uploaded workbook has expired, please upload the file again'
+            }), 400)
+        return staged_path, request.form.get('file_name', ''), None
+    
+    # Check if file is present
+    if 'file' not in request.files:
+        return None, None, (jsonify({
+            'status': 'error',
+            'message': 'No file uploaded'
+        }), 400)
+    
+    file = request.files['file']
+    
+    if file.filename == '':
+        return None, None, (jsonify({
+            'status': 'error',
+            'message': 'No file selected'
+        }), 400)
+    
+    return file.stream, file.filename, None
+
+def _remove_export_file(file_path):
+    """Delete a temporary export file, ignoring one that is already gone"""
+    try:
+        os.remove(file_path)
+    except OSError as e:
+        print(f"⚠️ Could not delete export file {file_path}: {str(e)}")
+
+def _wants_ndjson():
+    """Whether the client opted into a streamed NDJSON matching response"""
+    if request.args.get('stream') == 'ndjson':
+        return True
+    return request.accept_mimetypes.best_match(['application/json', 'application/x-ndjson']) == 'application/x-ndjson'
+
+def _format_ai_assessment(ai_assessment):
+    """Trim an AI assessment result down to the fields returned to the client"""
+    return {
+        'confidence_score': ai_assessment.get('confidence_score', 0),
+        'explanation_bullets': ai_assessment.get('explanation_bullets', []),
+        'success': ai_assessment.get('success', False)
+    }
+
+def _build_matching_summary(customer_data, clean_customers, flagged_customers, shell_data,
+                            invalid_customer_count, invalid_shell_count, matched_count, unmatched_count, execution_time):
+    """Build the summary block shared by the JSON and NDJSON matching responses"""
+    return {
+        "total_customer_accounts": len(customer_data) + invalid_customer_count,
+        "clean_customer_accounts": len(clean_customers),
+        "flagged_customer_accounts": len(flagged_customers),
+        "invalid_customer_accounts": invalid_customer_count,
+        "total_shell_accounts": len(shell_data) + invalid_shell_count,
+        "invalid_shell_accounts": invalid_shell_count,
+        "matched_pairs": matched_count,
+        "unmatched_customers": unmatched_count,
+        "execution_time": execution_time
+    }
+
+# Constant responses are serialized once at import so probes skip per-request JSON encoding
+_API_INFO_BYTES = orjson.dumps({
+    "message": "Dual-File Account Matching API",
+    "version": "2.0.0",
+    "status": "running",
+    "web_ui": "/",
+    "endpoints": {
+        "health": "/health",
+        "debug_config": "/debug-config",
+        "salesforce_test": "/test-salesforce-connection",
+        "openai_test": "/test-openai-connection",
+        "openai_completion": "/test-openai-completion",
+        "parse_excel": "/excel/parse",
+        "parse_customer_excel": "/excel/parse-customer-file",
+        "parse_shell_excel": "/excel/parse-shell-file",
+        "process_matching": "/matching/process-batch",
+        "export_results": "/export/matching-results"
+    }
+})
+
+_HEALTH_BYTES = orjson.dumps({
+    "status": "healthy",
+    "service": "Dual-File Account Matching API"
+})
+
+@lru_cache(maxsize=1)
+def _get_debug_config():
+    """Configuration snapshot for /debug-config (Config is fixed once the app has loaded)"""
+    return {
+        "salesforce": {
+            "username_present": bool(Config.SF_USERNAME),
+            "password_present": bool(Config.SF_PASSWORD),
+            "token_present": bool(Config.SF_SECURITY_TOKEN),
+            "domain": Config.SF_DOMAIN
+        },
+        "openai": {
+            "api_key_present": bool(Config.OPENAI_API_KEY),
+            "api_key_length": len(Config.OPENAI_API_KEY) if Config.OPENAI_API_KEY else 0,
+            "api_key_starts_with_sk": Config.OPENAI_API_KEY.startswith('sk-') if Config.OPENAI_API_KEY else False,
+            "model": Config.OPENAI_MODEL,
+            "max_tokens": Config.OPENAI_MAX_TOKENS
+        }
+    }
 
 @api_bp.route('/api')
 def api_info():
     """API information endpoint"""
-    return jsonify({
-        "message": "Dual-File Account Matching API",
-        "version": "2.0.0",
-        "status": "running",
-        "web_ui": "/",
-        "endpoints": {
-            "health": "/health",
-            "debug_config": "/debug-config",
-            "salesforce_test": "/test-salesforce-connection",
-            "openai_test": "/test-openai-connection",
-            "openai_completion": "/test-openai-completion",
-            "parse_excel": "/excel/parse",
-            "parse_customer_excel": "/excel/parse-customer-file",
-            "parse_shell_excel": "/excel/parse-shell-file",
-            "process_matching": "/matching/process-batch",
-            "export_results": "/export/matching-results"
-        }
-    })
+    response = Response(_API_INFO_BYTES, mimetype='application/json')
+    response.headers['Cache-Control'] = 'public, max-age=60'
+    return response
 
 @api_bp.route('/health')
 def health_check():
     """Health check endpoint"""
-    return jsonify({
-        "status": "healthy",
-        "service": "Dual-File Account Matching API"
-    })
+    return Response(_HEALTH_BYTES, mimetype='application/json')
 
 @api_bp.route('/debug-config')
 def debug_config():
     """Debug endpoint to check configuration (for development only)"""
     try:
-        return jsonify({
-            "salesforce": {
-                "username_present": bool(Config.SF_USERNAME),
-                "password_present": bool(Config.SF_PASSWORD),
-                "token_present": bool(Config.SF_SECURITY_TOKEN),
-                "domain": Config.SF_DOMAIN
-            },
-            "openai": {
-                "api_key_present": bool(Config.OPENAI_API_KEY),
-                "api_key_length": len(Config.OPENAI_API_KEY) if Config.OPENAI_API_KEY else 0,
-                "api_key_starts_with_sk": Config.OPENAI_API_KEY.startswith('sk-') if Config.OPENAI_API_KEY else False,
-                "model": Config.OPENAI_MODEL,
-                "max_tokens": Config.OPENAI_MAX_TOKENS
-            }
-        })
+        return jsonify(_get_debug_config())
     except Exception as e:
         return jsonify({
             "status": "error",
@@ -173,13 +261,12 @@ def parse_excel_file():
                 'error': 'No file selected'
             }), 400
         
-        # Read file content
-        file_content = file.read()
-        
-        # Parse the Excel file structure
-        result = excel_service.parse_excel_file(file_content)
+        # Stage the upload so the validate step can reuse it via workbook_id, then parse its structure
+        workbook_id = excel_service.stage_workbook(file.stream)
+        result = excel_service.parse_excel_file(excel_service.get_staged_workbook(workbook_id))
         
         if result['success']:
+            result['workbook_id'] = workbook_id
             return jsonify({
                 'success': True,
                 'data': result
@@ -200,20 +287,9 @@ def parse_excel_file():
 def parse_customer_excel():
     """Parse uploaded customer Excel file and validate account IDs"""
     try:
-        # Check if file is present
-        if 'file' not in request.files:
-            return jsonify({
-                'status': 'error',
-                'message': 'No file uploaded'
-            }), 400
-        
-        file = request.files['file']
-        
-        if file.filename == '':
-            return jsonify({
-                'status': 'error',
-                'message': 'No file selected'
-            }), 400
+        file_source, file_name, error_response = _get_uploaded_workbook()
+        if error_response:
+            return error_response
         
         # Get form data
         sheet_name = request.form.get('sheet_name')
@@ -232,12 +308,9 @@ def parse_customer_excel():
                 'message': 'Account ID column is required'
             }), 400
         
-        # Read file content
-        file_content = file.read()
-        
-        # Extract Account IDs from Excel
+        # Extract Account IDs from Excel - only the ID column is parsed
         extraction_result = excel_service.extract_account_ids_from_excel(
-            file_content, sheet_name, account_id_column
+            file_source, sheet_name, account_id_column
         )
         
         if not extraction_result['success']:
@@ -284,7 +357,7 @@ def parse_customer_excel():
                 'excel_info': {
                     'sheet_name': sheet_name,
                     'account_id_column': account_id_column,
-                    'file_name': file.filename,
+                    'file_name': file_name,
                     'total_rows': extraction_result['total_rows']
                 }
             }
@@ -300,20 +373,9 @@ def parse_customer_excel():
 def parse_shell_excel():
     """Parse uploaded shell Excel file and validate account IDs"""
     try:
-        # Check if file is present
-        if 'file' not in request.files:
-            return jsonify({
-                'status': 'error',
-                'message': 'No file uploaded'
-            }), 400
-        
-        file = request.files['file']
-        
-        if file.filename == '':
-            return jsonify({
-                'status': 'error',
-                'message': 'No file selected'
-            }), 400
+        file_source, file_name, error_response = _get_uploaded_workbook()
+        if error_response:
+            return error_response
         
         # Get form data
         sheet_name = request.form.get('sheet_name')
@@ -332,12 +394,9 @@ def parse_shell_excel():
                 'message': 'Account ID column is required'
             }), 400
         
-        # Read file content
-        file_content = file.read()
-        
-        # Extract Account IDs from Excel
+        # Extract Account IDs from Excel - only the ID column is parsed
         extraction_result = excel_service.extract_account_ids_from_excel(
-            file_content, sheet_name, account_id_column
+            file_source, sheet_name, account_id_column
         )
         
         if not extraction_result['success']:
@@ -384,7 +443,7 @@ def parse_shell_excel():
                 'excel_info': {
                     'sheet_name': sheet_name,
                     'account_id_column': account_id_column,
-                    'file_name': file.filename,
+                    'file_name': file_name,
                     'total_rows': extraction_result['total_rows']
                 }
             }
@@ -424,23 +483,29 @@ def process_matching_batch():
                 "message": "At least one customer and one shell account ID must be provided"
             }), 400
         
-        # Get customer account data from Salesforce (with batching)
-        from config.config import Config
-        customer_data, customer_message = sf_service.get_customer_accounts_bulk(
-            customer_account_ids, 
-            batch_size=Config.SALESFORCE_BATCH_SIZE
-        )
+        # Get customer and shell account data from Salesforce (with batching)
+        # The two bulk queries are independent, so run them concurrently; each connects only
+        # for IDs its caches can't serve, and a failed connection comes back as its error message
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            customer_future = executor.submit(
+                sf_service.get_customer_accounts_bulk,
+                customer_account_ids,
+                batch_size=Config.SALESFORCE_BATCH_SIZE
+            )
+            shell_future = executor.submit(
+                sf_service.get_shell_accounts_bulk,
+                shell_account_ids,
+                batch_size=Config.SALESFORCE_BATCH_SIZE
+            )
+            customer_data, customer_message = customer_future.result()
+            shell_data, shell_message = shell_future.result()
+        
         if customer_data is None:
             return jsonify({
                 "status": "error",
                 "message": f"Error retrieving customer account data: {customer_message}"
             }), 500
         
-        # Get shell account data from Salesforce (with batching)  
-        shell_data, shell_message = sf_service.get_shell_accounts_bulk(
-            shell_account_ids,
-            batch_size=Config.SALESFORCE_BATCH_SIZE
-        )
         if shell_data is None:
             return jsonify({
                 "status": "error",
@@ -451,87 +516,132 @@ def process_matching_batch():
         clean_customers, flagged_customers = sf_service.filter_customer_accounts_by_bad_domains(customer_data)
         
         # Process matching for clean customer accounts
-        import time
-        from services.openai_service import get_ai_match_assessments_batch
-        
-        start_time = time.time()
-        matched_pairs = []
+        start_time = perf_counter()
         unmatched_customers = []
-        ai_assessment_data = []  # Store data for batch AI processing
         
         print(f"🔍 Processing fuzzy matching for {len(clean_customers)} customer accounts...")
         
-        # Phase 1: Fuzzy matching (fast, no API calls)
-        for customer in clean_customers:
-            # Find best shell match using fuzzy matching
-            match_result = fuzzy_matcher.find_best_shell_match(customer, shell_data)
-            
+        # Phase 1: Fuzzy matching (fast, no API calls) - parallelized across processes for large batches
+        match_results = fuzzy_matcher.find_best_shell_matches(
+            clean_customers,
+            shell_data,
+            max_workers=Config.FUZZY_MATCH_WORKERS,
+            parallel_threshold=Config.FUZZY_PARALLEL_THRESHOLD
+        )
+        
+        # Split results in one pass, then assemble the output rows column-wise with
+        # comprehensions (cheaper than growing several lists inside a branchy loop)
+        matched_results = []
+        for customer, match_result in zip(clean_customers, match_results):
             if match_result['success']:
-                best_match = match_result['best_match']
-                
-                # Prepare data for batch AI processing
-                ai_assessment_data.append({
-                    'customer_account': customer,
-                    'shell_account': best_match['shell_account'],
-                    'match_scores': best_match
-                })
-                
-                # Create match pair result (without AI assessment for now)
-                match_pair = {
-                    'customer_account': customer,
-                    'recommended_shell': best_match['shell_account'],
-                    'match_confidence': best_match['confidence_score'],
-                    'website_match': best_match['website_match'],
-                    'name_match': best_match['name_match'], 
-                    'address_consistency': best_match['address_consistency'],
-                    'explanations': best_match['explanations'],
-                    'candidate_count': match_result['candidate_count'],
-                    'total_shells': match_result['total_shells']
-                }
-                matched_pairs.append(match_pair)
+                matched_results.append((customer, match_result, match_result['best_match']))
             else:
                 unmatched_customers.append({
                     'customer_account': customer,
                     'reason': match_result['message']
                 })
         
+        # Create match pair results (without AI assessment for now)
+        matched_pairs = [
+            {
+                'customer_account': customer,
+                'recommended_shell': best_match['shell_account'],
+                'match_confidence': best_match['confidence_score'],
+                'website_match': best_match['website_match'],
+                'name_match': best_match['name_match'],
+                'address_consistency': best_match['address_consistency'],
+                'explanations': best_match['explanations'],
+                'candidate_count': match_result['candidate_count'],
+                'total_shells': match_result['total_shells']
+            }
+            for customer, match_result, best_match in matched_results
+        ]
+        
+        # Prepare data for batch AI processing
+        ai_assessment_data = [
+            {
+                'customer_account': customer,
+                'shell_account': best_match['shell_account'],
+                'match_scores': best_match
+            }
+            for customer, _, best_match in matched_results
+        ]
+        
         print(f"✅ Fuzzy matching complete: {len(matched_pairs)} matched, {len(unmatched_customers)} unmatched")
         
+        invalid_customer_count = len(invalid_customer_ids)
+        invalid_shell_count = len(invalid_shell_ids)
+        
+        if _wants_ndjson():
+            def generate():
+                """Emit one JSON line per match pair as its AI assessment lands, then the summary"""
+                try:
+                    if ai_assessment_data:
+                        print(f"🤖 Streaming batch AI assessment for {len(ai_assessment_data)} matches...")
+                    for index, ai_assessment in iter_ai_match_assessments(
+                        ai_assessment_data,
+                        batch_size=Config.OPENAI_BATCH_SIZE,
+                        requests_per_minute=Config.OPENAI_REQUESTS_PER_MINUTE,
+                        tokens_per_minute=Config.OPENAI_TOKENS_PER_MINUTE,
+                        pairs_per_request=Config.OPENAI_PAIRS_PER_REQUEST
+                    ):
+                        match_pair = matched_pairs[index]
+                        match_pair['ai_assessment'] = _format_ai_assessment(ai_assessment)
+                        yield orjson.dumps({"type": "match_pair", "index": index, "data": match_pair}) + b'\n'
+                    
+                    execution_time = f"{perf_counter() - start_time:.2f}s"
+                    summary = _build_matching_summary(
+                        customer_data, clean_customers, flagged_customers, shell_data,
+                        invalid_customer_count, invalid_shell_count,
+                        len(matched_pairs), len(unmatched_customers), execution_time
+                    )
+                    yield orjson.dumps({
+                        "type": "summary",
+                        "status": "success",
+                        "message": f"Matching completed successfully in {execution_time}",
+                        "data": {
+                            "summary": summary,
+                            "unmatched_customers": unmatched_customers,
+                            "flagged_customers": flagged_customers,
+                            "invalid_customers": invalid_customer_ids
+                        }
+                    }) + b'\n'
+                except Exception as e:
+                    yield orjson.dumps({
+                        "type": "error",
+                        "status": "error",
+                        "message": f"Error processing matching batch: {str(e)}"
+                    }) + b'\n'
+            
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+        
         # Phase 2: Batch AI processing for matched pairs
         if ai_assessment_data:
             print(f"🤖 Starting batch AI assessment for {len(ai_assessment_data)} matches...")
             ai_results = get_ai_match_assessments_batch(
                 ai_assessment_data, 
                 batch_size=Config.OPENAI_BATCH_SIZE, 
-                delay_between_calls=Config.OPENAI_RATE_LIMIT_DELAY
+                requests_per_minute=Config.OPENAI_REQUESTS_PER_MINUTE,
+                tokens_per_minute=Config.OPENAI_TOKENS_PER_MINUTE,
+                pairs_per_request=Config.OPENAI_PAIRS_PER_REQUEST
             )
             
-            # Add AI results to matched pairs
-            for i, ai_assessment in enumerate(ai_results):
-                if i < len(matched_pairs):
-                    matched_pairs[i]['ai_assessment'] = {
-                        'confidence_score': ai_assessment.get('confidence_score', 0),
-                        'explanation_bullets': ai_assessment.get('explanation_bullets', []),
-                        'success': ai_assessment.get('success', False)
-                    }
-        
-        execution_time = time.time() - start_time
+            # Add AI results to matched pairs (results come back in input order)
+            for match_pair, ai_assessment in zip(matched_pairs, ai_results):
+                match_pair['ai_assessment'] = _format_ai_assessment(ai_assessment)
+        
+        execution_time = f"{perf_counter() - start_time:.2f}s"
+        summary = _build_matching_summary(
+            customer_data, clean_customers, flagged_customers, shell_data,
+            invalid_customer_count, invalid_shell_count,
+            len(matched_pairs), len(unmatched_customers), execution_time
+        )
         
         return jsonify({
             "status": "success",
-            "message": f"Matching completed successfully in {execution_time:.2f}s",
+            "message": f"Matching completed successfully in {execution_time}",
             "data": {
-                "summary": {
-                    "total_customer_accounts": len(customer_data) + len(invalid_customer_ids),
-                    "clean_customer_accounts": len(clean_customers),
-                    "flagged_customer_accounts": len(flagged_customers),
-                    "invalid_customer_accounts": len(invalid_customer_ids),
-                    "total_shell_accounts": len(shell_data) + len(invalid_shell_ids),
-                    "invalid_shell_accounts": len(invalid_shell_ids),
-                    "matched_pairs": len(matched_pairs),
-                    "unmatched_customers": len(unmatched_customers),
-                    "execution_time": f"{execution_time:.2f}s"
-                },
+                "summary": summary,
                 "matched_pairs": matched_pairs,
                 "unmatched_customers": unmatched_customers,
                 "flagged_customers": flagged_customers,
@@ -547,7 +657,7 @@ def process_matching_batch():
 
 @api_bp.route('/export/matching-results', methods=['POST'])
 def export_matching_results():
-    """Export dual-file matching results to Excel"""
+    """Export dual-file matching results to Excel (or zipped CSVs with "format": "csv")"""
     try:
         data = request.get_json()
         if not data or 'matched_pairs' not in data:
@@ -562,8 +672,10 @@ def export_matching_results():
         invalid_customers = data.get('invalid_customers', [])
         summary = data.get('summary', {})
         
-        # Create Excel export
-        export_result = excel_service.create_matching_results_export(
+        # Create Excel export, or zipped CSVs for result sets too large to open as a workbook
+        as_csv = data.get('format') == 'csv'
+        create_export = excel_service.create_matching_results_export_csv if as_csv else excel_service.create_matching_results_export
+        export_result = create_export(
             matched_pairs=matched_pairs,
             unmatched_customers=unmatched_customers,
             flagged_customers=flagged_customers,
@@ -572,12 +684,23 @@ def export_matching_results():
         )
         
         if export_result['success']:
-            return send_file(
-                export_result['file_buffer'],
-                as_attachment=True,
-                download_name=export_result['filename'],
-                mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            )
+            # Stream the export from disk via the server's file wrapper; the temp file is deleted once the
+            # response is closed (Windows can't delete a file that is still open)
+            file_path = export_result['file_path']
+            try:
+                response = send_file(
+                    file_path,
+                    as_attachment=True,
+                    download_name=export_result['filename'],
+                    mimetype='application/zip' if as_csv else 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+                )
+            except Exception:
+                _remove_export_file(file_path)
+                raise
+            # Passthrough responses skip close callbacks, so iterate through Werkzeug, which closes the file first
+            response.direct_passthrough = False
+            response.call_on_close(lambda: _remove_export_file(file_path))
+            return response
         else:
             return jsonify({
                 "status": "error",
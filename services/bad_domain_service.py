@@ -2,7 +2,7 @@ import csv
 import os
 import re
 from urllib.parse import urlparse
-from typing import Tuple, Set
+from typing import List, Tuple, Set
 from config.config import BAD_EMAIL_DOMAINS
 
 class BadDomainService:
@@ -13,6 +13,9 @@ class BadDomainService:
     def __init__(self):
         """Initialize the service with bad domains from config"""
         self.bad_domains = BAD_EMAIL_DOMAINS
+        # Longest first, so overlapping entries (e.g. yahoo.com / yahoo.com.au) resolve to the most specific one
+        # in every process - iterating the set directly would depend on the per-process string hash seed
+        self._bad_domains_longest_first = tuple(sorted(self.bad_domains, key=lambda d: (-len(d), d)))
         print(f"✅ Loaded {len(self.bad_domains)} bad domains from config")
     
     def _load_bad_domains(self) -> Set[str]:
@@ -72,22 +75,25 @@ class BadDomainService:
         if domain in self.bad_domains:
             return domain
         
-        # Handle common malformed patterns
-        # Pattern 1: Known bad domain + extra characters (e.g., "gmail.comno" -> "gmail.com")
-        for bad_domain in self.bad_domains:
-            if domain.startswith(bad_domain) and len(domain) > len(bad_domain):
-                # Check if it's just extra characters appended
-                extra_chars = domain[len(bad_domain):]
-                # If extra chars are just letters/numbers (not a valid TLD), treat as malformed
-                if extra_chars.isalnum() and len(extra_chars) <= 4:
+        # Set lookups rule out both partial-match patterns below for most clean domains;
+        # only scan the bad domain list (longest entry first) when one could match
+        if self._may_partially_match(domain):
+            # Handle common malformed patterns
+            # Pattern 1: Known bad domain + extra characters (e.g., "gmail.comno" -> "gmail.com")
+            for bad_domain in self._bad_domains_longest_first:
+                if domain.startswith(bad_domain) and len(domain) > len(bad_domain):
+                    # Check if it's just extra characters appended
+                    extra_chars = domain[len(bad_domain):]
+                    # If extra chars are just letters/numbers (not a valid TLD), treat as malformed
+                    if extra_chars.isalnum() and len(extra_chars) <= 4:
+                        return bad_domain
+        
+            # Pattern 1.5: Check if domain is a subdomain of a known bad domain
+            # (e.g., "test.ringcentral.com" should match "ringcentral.com")
+            for bad_domain in self._bad_domains_longest_first:
+                if domain.endswith('.' + bad_domain):
                     return bad_domain
         
-        # Pattern 1.5: Check if domain is a subdomain of a known bad domain
-        # (e.g., "test.ringcentral.com" should match "ringcentral.com")
-        for bad_domain in self.bad_domains:
-            if domain.endswith('.' + bad_domain):
-                return bad_domain
-        
         # Pattern 2: Missing common TLDs - try to extract base domain
         # ONLY for clearly malformed TLDs (not valid TLDs like .xyz, .io, etc.)
         if '.' in domain:
@@ -108,6 +114,18 @@ class BadDomainService:
         # Return original domain if no patterns matched
         return domain
     
+    def _may_partially_match(self, domain: str) -> bool:
+        """
+        Whether a bad domain could match domain with a short alphanumeric suffix appended
+        or as a parent domain - the two patterns _clean_domain otherwise scans the whole list for
+        """
+        for extra_len in range(1, 5):
+            if extra_len < len(domain) and domain[-extra_len:].isalnum() and domain[:-extra_len] in self.bad_domains:
+                return True
+        
+        parts = domain.split('.')
+        return any('.'.join(parts[i:]) in self.bad_domains for i in range(1, len(parts)))
+    
     def extract_domain_from_email(self, email: str) -> str:
         """
         Extract domain from email address
@@ -194,4 +212,18 @@ class BadDomainService:
                 explanation = f"{' and '.join(bad_matches)} both match bad domain list"
             return True, explanation
         else:
-            return False, "No bad domains detected" 
\ No newline at end of file
+            return False, "No bad domains detected" 
+    
+    def check_batch(self, websites: List[str]) -> List[Tuple[bool, str]]:
+        """
+        Check a list of websites for bad domains in one pass
+        Each distinct website is only parsed and cleaned once
+        
+        Returns:
+            List of (is_bad_domain, explanation) tuples in input order
+        """
+        results = {
+            website: self.check_account_for_bad_domains({'Website': website})
+            for website in dict.fromkeys(websites)
+        }
+        return [results[website] for website in websites]
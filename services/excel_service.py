@@ -1,10 +1,62 @@
 from openpyxl import Workbook, load_workbook
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
-from datetime import datetime
+from openpyxl.utils import get_column_letter, range_boundaries
+from openpyxl.cell import WriteOnlyCell
+from copy import copy
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from itertools import islice
+from typing import Optional
+from config.config import Config
+import csv
+import hashlib
 import json
 import io
-import pandas as pd
+import os
+import tempfile
+import time
+import zipfile
+
+try:
+    import xlsxwriter  # C-accelerated writer, several times faster than openpyxl for large exports
+except ImportError:
+    xlsxwriter = None
+
+try:
+    from python_calamine import CalamineWorkbook  # Rust-backed reader, far faster than openpyxl on large files
+except ImportError:
+    CalamineWorkbook = None
+
+# Cell strings treated as missing in the Account ID column (pandas.read_excel's default NA values)
+EXCEL_NA_STRINGS = {
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+}
+
+# Export match statuses
+STATUS_MATCHED = 'MATCHED'
+STATUS_UNMATCHED = 'UNMATCHED'
+STATUS_FLAGGED = 'FLAGGED'
+STATUS_INVALID = 'INVALID'
+
+# Address fields joined into the export's address columns, in display order
+CUSTOMER_ADDRESS_FIELDS = ('BillingCity', 'BillingState', 'BillingCountry', 'BillingPostalCode')
+SHELL_ADDRESS_FIELDS = ('ZI_Company_City__c', 'ZI_Company_State__c', 'ZI_Company_Country__c', 'ZI_Company_Postal_Code__c')
+
+@dataclass(slots=True)
+class _CustomerResult:
+    """One export row's worth of data; score fields default to zero for customers that never reached matching"""
+    customer: dict
+    status: str
+    reason: str
+    shell: Optional[dict] = None
+    match_confidence: float = 0
+    website_match: float = 0
+    name_match: float = 0
+    address_consistency: float = 0
+    ai_assessment: dict = field(default_factory=dict)
+    candidate_count: int = 0
+    total_shells: int = 0
 
 class ExcelService:
     """Service for Excel operations and Account data handling"""
@@ -33,50 +85,249 @@ class ExcelService:
         )
         self.center_alignment = Alignment(horizontal='center', vertical='center')
         self.wrap_alignment = Alignment(horizontal='left', vertical='top', wrap_text=True)
+        excluded_fill = PatternFill(start_color="FFB6C1", end_color="FFB6C1", fill_type="solid")  # Light red
+        self.status_fills = {
+            STATUS_MATCHED: PatternFill(start_color="90EE90", end_color="90EE90", fill_type="solid"),    # Light green
+            STATUS_UNMATCHED: PatternFill(start_color="FFE4B5", end_color="FFE4B5", fill_type="solid"),  # Light orange
+            STATUS_FLAGGED: excluded_fill,
+            STATUS_INVALID: excluded_fill
+        }
+        
+        # Uploaded workbooks are staged on disk (keyed by content hash) so the validate
+        # endpoints can reuse the file from /excel/parse instead of re-uploading it
+        self.staging_dir = os.path.join(tempfile.gettempdir(), 'sfdc_account_matching')
+        self.staging_ttl = Config.EXCEL_WORKBOOK_TTL
     
 
     
-    def parse_excel_file(self, file_content):
-        """Parse uploaded Excel file and return sheet names and preview data"""
+    def _as_file_like(self, file_source):
+        """Accept raw bytes, a file path, or a seekable file-like object (e.g. an upload stream)"""
+        if isinstance(file_source, (bytes, bytearray)):
+            return io.BytesIO(file_source)
+        return file_source
+    
+    def _styled_cell(self, ws, value, font=None, fill=None, alignment=None, border=None):
+        """Build a styled cell for appending to a write-only worksheet"""
+        cell = WriteOnlyCell(ws, value=value)
+        if font:
+            cell.font = font
+        if fill:
+            cell.fill = fill
+        if alignment:
+            cell.alignment = alignment
+        if border:
+            cell.border = border
+        return cell
+    
+    def _cell_factory(self, ws):
+        """
+        Return a styled-cell builder for a write-only worksheet
+        Each font/fill/alignment/border combination is registered with the workbook once and
+        its style array reused, instead of re-hashing the style objects for every cell.
+        Cells share that array: write-only cells are serialized on append and never restyled,
+        so callers must not set style attributes on the returned cells.
+        """
+        style_arrays = {}
+        
+        def make_cell(value, font=None, fill=None, alignment=None, border=None):
+            key = (id(font), id(fill), id(alignment), id(border))
+            style = style_arrays.get(key)
+            if style is None:
+                cell = self._styled_cell(ws, value, font=font, fill=fill, alignment=alignment, border=border)
+                style_arrays[key] = copy(cell._style)
+                return cell
+            cell = WriteOnlyCell(ws, value=value)
+            cell._style = style
+            return cell
+        
+        return make_cell
+    
+    def open_workbook(self, file_source):
+        """Open a workbook for streaming reads (read-only, cached values, no external links)"""
+        return load_workbook(self._as_file_like(file_source), read_only=True, data_only=True, keep_links=False)
+    
+    def _staged_path(self, workbook_id):
+        """Path of a staged workbook (workbook IDs are hex content hashes)"""
+        return os.path.join(self.staging_dir, f"{workbook_id}.xlsx")
+    
+    def _purge_staged_workbooks(self):
+        """Remove staged workbooks older than the staging TTL"""
+        cutoff = time.time() - self.staging_ttl
+        for entry in os.scandir(self.staging_dir):
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                pass  # Already removed by another worker
+    
+    def stage_workbook(self, file_source):
+        """
+        Save an uploaded workbook to the staging area
+        Args:
+            file_source: Upload stream, file-like object, or raw bytes
+        Returns:
+            workbook_id (sha256 of the file content) for use with get_staged_workbook
+        """
+        file_obj = self._as_file_like(file_source)
+        os.makedirs(self.staging_dir, exist_ok=True)
+        self._purge_staged_workbooks()
+        
+        # Stream the upload to disk in chunks, hashing as we go (no full in-memory copy)
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=self.staging_dir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in iter(lambda: file_obj.read(1024 * 1024), b''):
+                digest.update(chunk)
+                f.write(chunk)
+        workbook_id = digest.hexdigest()
+        
+        # Same content already staged (re-upload) - the rename just refreshes it
+        os.replace(tmp_path, self._staged_path(workbook_id))
+        
+        return workbook_id
+    
+    def get_staged_workbook(self, workbook_id):
+        """Return the path of a staged workbook, or None if unknown or expired"""
+        if not workbook_id or not all(c in '0123456789abcdef' for c in workbook_id):
+            return None
+        
+        path = self._staged_path(workbook_id)
         try:
-            # Load workbook from file content
-            wb = load_workbook(io.BytesIO(file_content), read_only=True)
-            sheet_names = wb.sheetnames
-            
-            # Get headers for ALL sheets (not just first one)
+            if time.time() - os.path.getmtime(path) > self.staging_ttl:
+                return None
+        except OSError:
+            return None
+        return path
+    
+    def _calamine_value(self, value):
+        """Normalize a calamine cell value to what openpyxl would return"""
+        if value == "":
+            return None
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        if type(value) is date:
+            return datetime.combine(value, datetime.min.time())
+        return value
+    
+    def _header_names(self, row):
+        """Header row values, with Column_N standing in for blank header cells"""
+        if None not in row:
+            return list(row)  # Common case: every column is named
+        return [cell if cell is not None else f"Column_{i+1}" for i, cell in enumerate(row)]
+    
+    def _read_preview_calamine(self, file_source):
+        """
+        Read sheet names, headers, first-sheet preview rows and row count with python-calamine
+        Returns:
+            Tuple of (sheet_names, all_headers, preview_data, total_rows)
+        """
+        if isinstance(file_source, (str, os.PathLike)):
+            wb = CalamineWorkbook.from_path(file_source)
+        else:
+            wb = CalamineWorkbook.from_filelike(self._as_file_like(file_source))
+        
+        try:
+            sheet_names = wb.sheet_names
             all_headers = {}
             preview_data = []
             total_rows = 0
             
             for sheet_name in sheet_names:
-                sheet = wb[sheet_name]
+                sheet = wb.get_sheet_by_name(sheet_name)
                 
-                # Get headers for this sheet
-                sheet_headers = []
-                first_row = next(sheet.iter_rows(values_only=True), None)
-                if first_row:
-                    sheet_headers = [cell if cell is not None else f"Column_{i+1}" for i, cell in enumerate(first_row)]
+                # Header plus the first 10 data rows in one call (only the header for other sheets)
+                nrows = 11 if sheet_name == sheet_names[0] else 1
+                rows = [[self._calamine_value(cell) for cell in row]
+                        for row in sheet.to_python(skip_empty_area=False, nrows=nrows)]
                 
+                sheet_headers = []
+                if rows:
+                    sheet_headers = self._header_names(rows[0])
                 all_headers[sheet_name] = sheet_headers
                 
-                # Only get preview data for the first sheet
                 if sheet_name == sheet_names[0]:
-                    for row_idx, row in enumerate(sheet.iter_rows(values_only=True)):
-                        if row_idx == 0:
-                            continue  # Skip header row
-                        elif row_idx < 11:  # First 10 data rows
-                            row_data = [cell if cell is not None else "" for cell in row]
-                            # Pad row to match header length
-                            while len(row_data) < len(sheet_headers):
-                                row_data.append("")
-                            preview_data.append(row_data[:len(sheet_headers)])  # Trim to header length
-                        else:
-                            break
+                    for row in rows[1:]:
+                        row_data = [cell if cell is not None else "" for cell in row]
+                        # Pad row to match header length
+                        while len(row_data) < len(sheet_headers):
+                            row_data.append("")
+                        preview_data.append(row_data[:len(sheet_headers)])  # Trim to header length
                     
-                    # Calculate total rows for first sheet
-                    total_rows = (sheet.max_row - 1) if sheet.max_row else 0
-            
+                    # sheet.end is the 0-based (row, col) of the last used cell
+                    total_rows = sheet.end[0] if sheet.end else 0
+        finally:
             wb.close()
+        
+        return sheet_names, all_headers, preview_data, total_rows
+    
+    def _sheet_dimension(self, sheet):
+        """Return the sheet's declared dimension (e.g. "A1:S1200"), or None if the file doesn't carry one"""
+        try:
+            return sheet.calculate_dimension()
+        except ValueError:
+            return None
+    
+    def _read_preview_openpyxl(self, file_source):
+        """
+        Read sheet names, headers, first-sheet preview rows and row count with openpyxl
+        Returns:
+            Tuple of (sheet_names, all_headers, preview_data, total_rows)
+        """
+        # Load workbook in streaming read-only mode (no extra in-memory copy)
+        wb = self.open_workbook(file_source)
+        sheet_names = wb.sheetnames
+        
+        # Get headers for ALL sheets (not just first one)
+        all_headers = {}
+        preview_data = []
+        total_rows = 0
+        
+        for sheet_name in sheet_names:
+            sheet = wb[sheet_name]
+            
+            # Some writers stamp every sheet as "A1:A1"; trusting that would clip rows and columns
+            dimension = self._sheet_dimension(sheet)
+            unsized = dimension in (None, 'A1:A1')
+            if unsized:
+                sheet.reset_dimensions()
+            
+            # Get headers for this sheet
+            sheet_headers = []
+            first_row = next(sheet.iter_rows(values_only=True), None)
+            if first_row:
+                sheet_headers = self._header_names(first_row)
+            
+            all_headers[sheet_name] = sheet_headers
+            
+            # Only get preview data for the first sheet
+            if sheet_name == sheet_names[0]:
+                # Skip the header row, then take the first 10 data rows
+                for row in islice(sheet.iter_rows(values_only=True), 1, 11):
+                    row_data = [cell if cell is not None else "" for cell in row]
+                    # Pad row to match header length
+                    while len(row_data) < len(sheet_headers):
+                        row_data.append("")
+                    preview_data.append(row_data[:len(sheet_headers)])  # Trim to header length
+                
+                # Calculate total rows for first sheet from the dimension tag, counting only when it is missing
+                if unsized:
+                    max_row = sum(1 for _ in sheet.iter_rows(values_only=True))
+                else:
+                    max_row = range_boundaries(dimension)[3]
+                total_rows = (max_row - 1) if max_row else 0
+        
+        wb.close()
+        
+        return sheet_names, all_headers, preview_data, total_rows
+    
+    def parse_excel_file(self, file_source):
+        """Parse uploaded Excel file and return sheet names and preview data"""
+        try:
+            # python-calamine when installed, openpyxl otherwise - same result shape either way
+            if CalamineWorkbook is not None:
+                sheet_names, all_headers, preview_data, total_rows = self._read_preview_calamine(file_source)
+            else:
+                sheet_names, all_headers, preview_data, total_rows = self._read_preview_openpyxl(file_source)
             
             return {
                 'success': True,
@@ -94,48 +345,105 @@ class ExcelService:
     
 
 
-    def extract_account_ids_from_excel(self, file_content, sheet_name, account_id_column):
-        """Extract Account IDs from specified column in Excel file"""
-        try:
-            # Use pandas for easier data extraction - read as string to preserve Account ID format
-            df = pd.read_excel(io.BytesIO(file_content), sheet_name=sheet_name, dtype={account_id_column: str})
-            
-            if account_id_column not in df.columns:
-                return {
-                    'success': False,
-                    'error': f"Column '{account_id_column}' not found in sheet '{sheet_name}'"
-                }
-            
-            # Extract Account IDs and remove null/empty values
-            account_ids = df[account_id_column].dropna().astype(str).tolist()
-            # Remove empty strings and whitespace-only strings, and handle Excel formatting issues
-            cleaned_account_ids = []
-            for aid in account_ids:
-                aid_str = str(aid).strip()
-                # Remove any Excel formatting artifacts
-                if aid_str and aid_str.lower() not in ['nan', 'none', 'null']:
-                    # Handle potential floating point conversion (e.g., "1.23456789012345e+17")
-                    if 'e+' in aid_str.lower():
-                        try:
-                            # Convert scientific notation back to full number
-                            aid_str = f"{float(aid_str):.0f}"
-                        except:
-                            pass
-                    cleaned_account_ids.append(aid_str)
-            
-            account_ids = cleaned_account_ids
-            
-            # Get original data for later merging - handle NaN values
-            # Replace NaN with empty string to avoid JSON serialization issues
-            df_clean = df.where(pd.notnull(df), '')  # Replace NaN with empty string
-            original_data = df_clean.to_dict('records')
-            
+    def _clean_account_id(self, value):
+        """Normalize one Account ID cell to a string, or None if the cell is effectively empty"""
+        if type(value) is int:
+            return str(value)  # Whole-number cells have nothing to clean up
+        aid_str = str(value).strip()
+        lowered = aid_str.lower()
+        # Remove any Excel formatting artifacts
+        if not aid_str or lowered in ('nan', 'none', 'null'):
+            return None
+        # Handle potential floating point conversion (e.g., "1.23456789012345e+17")
+        if 'e+' in lowered:
+            try:
+                # Convert scientific notation back to full number
+                aid_str = f"{float(aid_str):.0f}"
+            except ValueError:
+                pass
+        return aid_str
+    
+    def _extract_account_ids_from_rows(self, rows, sheet_name, account_id_column, normalize=None):
+        """
+        Single pass over a sheet's rows (no DataFrame) shared by the calamine and openpyxl readers
+        Args:
+            rows: Iterable of row value sequences, header row first
+            normalize: Optional per-cell converter to openpyxl-style values (blank cells -> None)
+        """
+        normalize = normalize or (lambda value: value)
+        rows = iter(rows)
+        
+        # Same header naming as parse_excel_file, so any header offered in the UI resolves
+        first_row = next(rows, None) or []
+        headers = [normalize(cell) for cell in first_row]
+        headers = [str(cell) if cell is not None else f"Column_{i+1}" for i, cell in enumerate(headers)]
+        if account_id_column not in headers:
             return {
-                'success': True,
-                'account_ids': account_ids,
-                'original_data': original_data,
-                'total_rows': len(df)
+                'success': False,
+                'error': f"Column '{account_id_column}' not found in sheet '{sheet_name}'"
             }
+        col_idx = headers.index(account_id_column)
+        
+        account_ids = []
+        total_rows = 0  # Rows up to the last non-blank one (trailing blank rows aren't data)
+        for row_number, row in enumerate(rows, 1):
+            value = normalize(row[col_idx]) if col_idx < len(row) else None
+            
+            if value is not None:
+                total_rows = row_number
+                if not (isinstance(value, str) and value in EXCEL_NA_STRINGS):
+                    aid_str = self._clean_account_id(value)
+                    if aid_str:
+                        account_ids.append(aid_str)
+            elif any(cell is not None and cell != '' for cell in row):
+                total_rows = row_number
+        
+        return {
+            'success': True,
+            'account_ids': account_ids,
+            'total_rows': total_rows
+        }
+    
+    def extract_account_ids_from_excel(self, file_source, sheet_name, account_id_column):
+        """
+        Extract Account IDs from specified column in Excel file (bytes, path, or file-like)
+        Rows are streamed with python-calamine when installed, else openpyxl read-only mode
+        Args:
+            file_source: Upload stream, file path, or raw bytes
+            sheet_name: Sheet containing the Account IDs
+            account_id_column: Header of the Account ID column
+        """
+        try:
+            if CalamineWorkbook is not None:
+                if isinstance(file_source, (str, os.PathLike)):
+                    wb = CalamineWorkbook.from_path(file_source)
+                else:
+                    wb = CalamineWorkbook.from_filelike(self._as_file_like(file_source))
+                try:
+                    if sheet_name not in wb.sheet_names:
+                        return {
+                            'success': False,
+                            'error': f"Sheet '{sheet_name}' not found"
+                        }
+                    rows = wb.get_sheet_by_name(sheet_name).to_python(skip_empty_area=False)
+                finally:
+                    wb.close()
+                return self._extract_account_ids_from_rows(
+                    rows, sheet_name, account_id_column, normalize=self._calamine_value
+                )
+            
+            wb = self.open_workbook(file_source)
+            try:
+                if sheet_name not in wb.sheetnames:
+                    return {
+                        'success': False,
+                        'error': f"Sheet '{sheet_name}' not found"
+                    }
+                return self._extract_account_ids_from_rows(
+                    wb[sheet_name].iter_rows(values_only=True), sheet_name, account_id_column
+                )
+            finally:
+                wb.close()
             
         except Exception as e:
             return {
@@ -144,47 +452,37 @@ class ExcelService:
             }
 
     def create_basic_excel(self, data, headers, title="Data Export", filename_prefix="export"):
-        """Create a basic Excel file with data and headers"""
+        """Create a basic Excel file with data and headers (write-only mode, rows streamed)"""
         try:
-            wb = Workbook()
-            ws = wb.active
-            if ws is not None:
-                ws.title = "Data"
-                
-                # Add title
-                current_row = 1
-                ws.merge_cells(f'A{current_row}:{get_column_letter(len(headers))}{current_row}')
-                ws[f'A{current_row}'] = title
-                ws[f'A{current_row}'].font = self.title_font
-                ws[f'A{current_row}'].alignment = self.center_alignment
-                current_row += 1
-                
-                # Add timestamp
-                ws.merge_cells(f'A{current_row}:{get_column_letter(len(headers))}{current_row}')
-                ws[f'A{current_row}'] = f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-                ws[f'A{current_row}'].alignment = self.center_alignment
-                current_row += 2
-                
-                # Add headers
-                for col, header in enumerate(headers, 1):
-                    cell = ws.cell(row=current_row, column=col, value=header)
-                    cell.font = self.header_font
-                    cell.fill = self.header_fill
-                    cell.alignment = self.center_alignment
-                    cell.border = self.border
-                
-                current_row += 1
-                
-                # Add data rows
-                for row_data in data:
-                    for col, value in enumerate(row_data, 1):
-                        cell = ws.cell(row=current_row, column=col, value=value)
-                        cell.border = self.border
-                    current_row += 1
-                
-                # Auto-adjust column widths
-                for col in range(1, len(headers) + 1):
-                    ws.column_dimensions[get_column_letter(col)].width = 20
+            wb = Workbook(write_only=True)
+            ws = wb.create_sheet("Data")
+            cell = self._cell_factory(ws)
+            now = datetime.now()
+            column_letters = [get_column_letter(col) for col in range(1, len(headers) + 1)]
+            last_column = column_letters[-1]
+            
+            # Column widths (must be set before rows are streamed in write-only mode)
+            for column_letter in column_letters:
+                ws.column_dimensions[column_letter].width = 20
+            
+            # Add title
+            ws.merged_cells.add(f'A1:{last_column}1')
+            ws.append([cell(title, font=self.title_font, alignment=self.center_alignment)])
+            
+            # Add timestamp
+            ws.merged_cells.add(f'A2:{last_column}2')
+            ws.append([cell(f"Generated: {now.strftime('%Y-%m-%d %H:%M:%S')}", alignment=self.center_alignment)])
+            ws.append([])
+            
+            # Add headers
+            ws.append([
+                cell(header, font=self.header_font, fill=self.header_fill, alignment=self.center_alignment, border=self.border)
+                for header in headers
+            ])
+            
+            # Add data rows
+            for row_data in data:
+                ws.append([cell(value, border=self.border) for value in row_data])
             
             # Create file buffer
             file_buffer = io.BytesIO()
@@ -192,7 +490,7 @@ class ExcelService:
             file_buffer.seek(0)
             
             # Generate filename
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            timestamp = now.strftime('%Y%m%d_%H%M%S')
             filename = f"{filename_prefix}_{timestamp}.xlsx"
             
             return {
@@ -207,229 +505,155 @@ class ExcelService:
                 'error': f"Error creating Excel file: {str(e)}"
             } 
 
-    def create_matching_results_export(self, matched_pairs, unmatched_customers=None, flagged_customers=None, invalid_customers=None, summary=None):
-        """Create Excel export for dual-file matching results with one row per customer account"""
-        try:
-            wb = Workbook()
-            
-            # Sheet 1: Complete Customer Match Results (ALL customers)
-            ws_results = wb.active
-            ws_results.title = "Customer Match Results"
-            
-            # Add title
-            current_row = 1
-            title = "Customer-to-Shell Account Matching Results"
-            ws_results.merge_cells(f'A{current_row}:S{current_row}')
-            ws_results[f'A{current_row}'] = title
-            ws_results[f'A{current_row}'].font = self.title_font
-            ws_results[f'A{current_row}'].alignment = self.center_alignment
-            ws_results[f'A{current_row}'].fill = PatternFill(start_color=self.rc_cerulean, end_color=self.rc_cerulean, fill_type="solid")
-            current_row += 1
-            
-            # Add timestamp and summary
-            ws_results.merge_cells(f'A{current_row}:S{current_row}')
-            ws_results[f'A{current_row}'] = f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-            ws_results[f'A{current_row}'].alignment = self.center_alignment
-            current_row += 1
-            
-            if summary:
-                ws_results.merge_cells(f'A{current_row}:S{current_row}')
-                summary_text = f"Total Customers: {summary.get('total_customer_accounts', 0)} | Matched: {summary.get('matched_pairs', 0)} | Unmatched: {summary.get('unmatched_customers', 0)} | Flagged: {summary.get('flagged_customer_accounts', 0)} | Processing Time: {summary.get('execution_time', 'N/A')}"
-                ws_results[f'A{current_row}'] = summary_text
-                ws_results[f'A{current_row}'].alignment = self.center_alignment
-            current_row += 2
-            
-            # Headers for complete results table
-            headers = [
-                "Customer ID", "Customer Name", "Customer Website", "Customer Billing Address",
-                "Match Status", "Match Reason",
-                "Recommended Shell ID", "Shell Name", "Shell ZI ID", "Shell Website", "Shell Billing Address",
-                "Overall Match Confidence", "Website Match Score", "Name Match Score", "Address Consistency Score",
-                "AI Confidence Score", "AI Explanation",
-                "Candidate Count", "Processing Notes"
+    def _iter_customer_results(self, matched_pairs, unmatched_customers=None, flagged_customers=None, invalid_customers=None):
+        """Yield one result record per customer: matched, then unmatched, flagged and invalid"""
+        # 1. Matched customers
+        for pair in matched_pairs:
+            yield _CustomerResult(
+                customer=pair['customer_account'],
+                status=STATUS_MATCHED,
+                reason=f"Matched to shell account with {pair.get('match_confidence', 0):.1f}% confidence",
+                shell=pair['recommended_shell'],
+                match_confidence=pair.get('match_confidence', 0),
+                website_match=pair.get('website_match', 0),
+                name_match=pair.get('name_match', 0),
+                address_consistency=pair.get('address_consistency', 0),
+                ai_assessment=pair.get('ai_assessment', {}),
+                candidate_count=pair.get('candidate_count', 0),
+                total_shells=pair.get('total_shells', 0)
+            )
+        
+        # 2. Unmatched customers
+        for unmatched in unmatched_customers or []:
+            yield _CustomerResult(
+                customer=unmatched['customer_account'],
+                status=STATUS_UNMATCHED,
+                reason=unmatched.get('reason', 'No suitable shell match found')
+            )
+        
+        # 3. Flagged customers
+        for flagged in flagged_customers or []:
+            bad_domain_info = flagged.get('Bad_Domain', {})
+            yield _CustomerResult(
+                customer=flagged,
+                status=STATUS_FLAGGED,
+                reason=f"Excluded from matching: {bad_domain_info.get('explanation', 'Bad domain detected')}"
+            )
+        
+        # 4. Invalid customers (minimal customer object for IDs that don't exist)
+        for invalid_id in invalid_customers or []:
+            yield _CustomerResult(
+                customer={'Id': invalid_id, 'Name': 'INVALID ACCOUNT ID', 'Website': '', 'BillingCity': '', 'BillingState': '', 'BillingCountry': '', 'BillingPostalCode': ''},
+                status=STATUS_INVALID,
+                reason='Invalid Account ID - does not exist in Salesforce'
+            )
+    
+    def _build_matching_results(self, matched_pairs, unmatched_customers=None, flagged_customers=None, invalid_customers=None, summary=None):
+        """
+        Assemble the matching results as plain values, shared by the Excel and CSV exports
+        Returns:
+            Tuple of (headers, result_rows as (status, row values), summary_text, metrics)
+        """
+        # Headers for complete results table
+        headers = [
+            "Customer ID", "Customer Name", "Customer Website", "Customer Billing Address",
+            "Match Status", "Match Reason",
+            "Recommended Shell ID", "Shell Name", "Shell ZI ID", "Shell Website", "Shell Billing Address",
+            "Overall Match Confidence", "Website Match Score", "Name Match Score", "Address Consistency Score",
+            "AI Confidence Score", "AI Explanation",
+            "Candidate Count", "Processing Notes"
+        ]
+        
+        # Create a comprehensive list of ALL customers with their status
+        all_customer_results = list(self._iter_customer_results(
+            matched_pairs, unmatched_customers, flagged_customers, invalid_customers
+        ))
+        
+        # Sort results by customer name for better readability (key is computed once per row; None names sort first)
+        all_customer_results.sort(key=lambda x: x.customer.get('Name') or '')
+        
+        # Format ALL customer results as plain row values (styles are applied by the writer)
+        result_rows = []
+        for result in all_customer_results:
+            customer = result.customer
+            shell = result.shell
+            ai_assessment = result.ai_assessment
+            
+            # Format customer and shell (if matched) addresses from their non-empty parts
+            customer_address = ', '.join(part for field_name in CUSTOMER_ADDRESS_FIELDS if (part := customer.get(field_name)))
+            shell_address = ', '.join(part for field_name in SHELL_ADDRESS_FIELDS if (part := shell.get(field_name))) if shell else ''
+            
+            # Format AI explanation
+            ai_bullets = ai_assessment.get('explanation_bullets', [])
+            is_matched = result.status == STATUS_MATCHED
+            ai_explanation = '\n'.join(ai_bullets) if ai_bullets else ('No AI explanation available' if is_matched else 'No AI analysis (not matched)')
+            
+            # Determine processing notes
+            if is_matched:
+                processing_notes = f"Evaluated {result.total_shells} shell candidates, found {result.candidate_count} potential matches"
+            elif result.status == STATUS_UNMATCHED:
+                processing_notes = "No matching shell candidates met minimum similarity threshold"
+            else:  # FLAGGED
+                processing_notes = "Excluded from matching due to data quality issues"
+            
+            row_data = [
+                customer.get('Id', ''),
+                customer.get('Name', ''),
+                customer.get('Website', ''),
+                customer_address,
+                result.status,
+                result.reason,
+                shell.get('Id', '') if shell else '',
+                shell.get('ZI_Company_Name__c', '') if shell else '',
+                shell.get('ZI_Id__c', '') if shell else '',
+                shell.get('ZI_Website__c', '') if shell else '',
+                shell_address,
+                f"{result.match_confidence:.1f}%" if result.match_confidence > 0 else '',
+                f"{result.website_match:.1f}%" if result.website_match > 0 else '',
+                f"{result.name_match:.1f}%" if result.name_match > 0 else '',
+                f"{result.address_consistency:.1f}/100" if result.address_consistency > 0 else '',
+                f"{ai_assessment.get('confidence_score', 0)}/100" if ai_assessment.get('confidence_score', 0) > 0 else '',
+                ai_explanation,
+                result.candidate_count if result.candidate_count > 0 else '',
+                processing_notes
             ]
             
-            # Add headers
-            for col, header in enumerate(headers, 1):
-                cell = ws_results.cell(row=current_row, column=col, value=header)
-                cell.font = self.header_font
-                cell.fill = self.header_fill
-                cell.alignment = self.center_alignment
-                cell.border = self.border
-            current_row += 1
-            
-            # Create a comprehensive list of ALL customers with their status
-            all_customer_results = []
-            
-            # 1. Add matched customers
-            for pair in matched_pairs:
-                customer = pair['customer_account']
-                shell = pair['recommended_shell']
-                ai_assessment = pair.get('ai_assessment', {})
-                
-                all_customer_results.append({
-                    'customer': customer,
-                    'status': 'MATCHED',
-                    'reason': f"Matched to shell account with {pair.get('match_confidence', 0):.1f}% confidence",
-                    'shell': shell,
-                    'match_confidence': pair.get('match_confidence', 0),
-                    'website_match': pair.get('website_match', 0),
-                    'name_match': pair.get('name_match', 0),
-                    'address_consistency': pair.get('address_consistency', 0),
-                    'ai_assessment': ai_assessment,
-                    'candidate_count': pair.get('candidate_count', 0),
-                    'total_shells': pair.get('total_shells', 0)
-                })
-            
-            # 2. Add unmatched customers
-            if unmatched_customers:
-                for unmatched in unmatched_customers:
-                    customer = unmatched['customer_account']
-                    
-                    all_customer_results.append({
-                        'customer': customer,
-                        'status': 'UNMATCHED',
-                        'reason': unmatched.get('reason', 'No suitable shell match found'),
-                        'shell': None,
-                        'match_confidence': 0,
-                        'website_match': 0,
-                        'name_match': 0,
-                        'address_consistency': 0,
-                        'ai_assessment': {},
-                        'candidate_count': 0,
-                        'total_shells': 0
-                    })
-            
-            # 3. Add flagged customers
-            if flagged_customers:
-                for flagged in flagged_customers:
-                    bad_domain_info = flagged.get('Bad_Domain', {})
-                    
-                    all_customer_results.append({
-                        'customer': flagged,
-                        'status': 'FLAGGED',
-                        'reason': f"Excluded from matching: {bad_domain_info.get('explanation', 'Bad domain detected')}",
-                        'shell': None,
-                        'match_confidence': 0,
-                        'website_match': 0,
-                        'name_match': 0,
-                        'address_consistency': 0,
-                        'ai_assessment': {},
-                        'candidate_count': 0,
-                        'total_shells': 0
-                    })
-            
-            # 4. Add invalid customers
-            if invalid_customers:
-                for invalid_id in invalid_customers:
-                    # Create a minimal customer object for invalid IDs
-                    all_customer_results.append({
-                        'customer': {'Id': invalid_id, 'Name': 'INVALID ACCOUNT ID', 'Website': '', 'BillingCity': '', 'BillingState': '', 'BillingCountry': '', 'BillingPostalCode': ''},
-                        'status': 'INVALID',
-                        'reason': 'Invalid Account ID - does not exist in Salesforce',
-                        'shell': None,
-                        'match_confidence': 0,
-                        'website_match': 0,
-                        'name_match': 0,
-                        'address_consistency': 0,
-                        'ai_assessment': {},
-                        'candidate_count': 0,
-                        'total_shells': 0
-                    })
-            
-            # Sort results by customer name for better readability
-            all_customer_results.sort(key=lambda x: x['customer'].get('Name', ''))
-            
-            # Add ALL customer results to the table
-            for result in all_customer_results:
-                customer = result['customer']
-                shell = result['shell']
-                ai_assessment = result['ai_assessment']
-                
-                # Format customer address
-                customer_address_parts = []
-                if customer.get('BillingCity'):
-                    customer_address_parts.append(customer['BillingCity'])
-                if customer.get('BillingState'):
-                    customer_address_parts.append(customer['BillingState'])
-                if customer.get('BillingCountry'):
-                    customer_address_parts.append(customer['BillingCountry'])
-                if customer.get('BillingPostalCode'):
-                    customer_address_parts.append(customer['BillingPostalCode'])
-                customer_address = ', '.join(customer_address_parts)
-                
-                # Format shell address (if matched)
-                shell_address = ''
-                if shell:
-                    shell_address_parts = []
-                    if shell.get('ZI_Company_City__c'):
-                        shell_address_parts.append(shell['ZI_Company_City__c'])
-                    if shell.get('ZI_Company_State__c'):
-                        shell_address_parts.append(shell['ZI_Company_State__c'])
-                    if shell.get('ZI_Company_Country__c'):
-                        shell_address_parts.append(shell['ZI_Company_Country__c'])
-                    if shell.get('ZI_Company_Postal_Code__c'):
-                        shell_address_parts.append(shell['ZI_Company_Postal_Code__c'])
-                    shell_address = ', '.join(shell_address_parts)
-                
-                # Format AI explanation
-                ai_bullets = ai_assessment.get('explanation_bullets', [])
-                ai_explanation = '\n'.join(ai_bullets) if ai_bullets else ('No AI analysis (not matched)' if result['status'] != 'MATCHED' else 'No AI explanation available')
-                
-                # Determine processing notes
-                if result['status'] == 'MATCHED':
-                    processing_notes = f"Evaluated {result['total_shells']} shell candidates, found {result['candidate_count']} potential matches"
-                elif result['status'] == 'UNMATCHED':
-                    processing_notes = "No matching shell candidates met minimum similarity threshold"
-                else:  # FLAGGED
-                    processing_notes = "Excluded from matching due to data quality issues"
-                
-                row_data = [
-                    customer.get('Id', ''),
-                    customer.get('Name', ''),
-                    customer.get('Website', ''),
-                    customer_address,
-                    result['status'],
-                    result['reason'],
-                    shell.get('Id', '') if shell else '',
-                    shell.get('ZI_Company_Name__c', '') if shell else '',
-                    shell.get('ZI_Id__c', '') if shell else '',
-                    shell.get('ZI_Website__c', '') if shell else '',
-                    shell_address,
-                    f"{result['match_confidence']:.1f}%" if result['match_confidence'] > 0 else '',
-                    f"{result['website_match']:.1f}%" if result['website_match'] > 0 else '',
-                    f"{result['name_match']:.1f}%" if result['name_match'] > 0 else '',
-                    f"{result['address_consistency']:.1f}/100" if result['address_consistency'] > 0 else '',
-                    f"{ai_assessment.get('confidence_score', 0)}/100" if ai_assessment.get('confidence_score', 0) > 0 else '',
-                    ai_explanation,
-                    result['candidate_count'] if result['candidate_count'] > 0 else '',
-                    processing_notes
-                ]
-                
-                for col, value in enumerate(row_data, 1):
-                    cell = ws_results.cell(row=current_row, column=col, value=value)
-                    cell.border = self.border
-            
-                    # Apply conditional formatting based on status
-                    if result['status'] == 'MATCHED':
-                        if col == 5:  # Status column
-                            cell.fill = PatternFill(start_color="90EE90", end_color="90EE90", fill_type="solid")  # Light green
-                        if col in [12, 13, 14, 15, 16]:  # Score columns
-                            cell.alignment = self.center_alignment
-                        else:
-                            cell.alignment = self.wrap_alignment
-                    elif result['status'] == 'UNMATCHED':
-                        if col == 5:  # Status column
-                            cell.fill = PatternFill(start_color="FFE4B5", end_color="FFE4B5", fill_type="solid")  # Light orange
-                        cell.alignment = self.wrap_alignment
-                    else:  # FLAGGED
-                        if col == 5:  # Status column
-                            cell.fill = PatternFill(start_color="FFB6C1", end_color="FFB6C1", fill_type="solid")  # Light red
-                        cell.alignment = self.wrap_alignment
-                
-                current_row += 1
+            result_rows.append((result.status, row_data))
+        
+        summary_text = None
+        metrics = None
+        if summary:
+            summary_text = f"Total Customers: {summary.get('total_customer_accounts', 0)} | Matched: {summary.get('matched_pairs', 0)} | Unmatched: {summary.get('unmatched_customers', 0)} | Flagged: {summary.get('flagged_customer_accounts', 0)} | Processing Time: {summary.get('execution_time', 'N/A')}"
+            metrics = [
+                ["Total Customer Accounts Processed", summary.get('total_customer_accounts', 0)],
+                ["Successfully Matched", summary.get('matched_pairs', 0)],
+                ["Unable to Match", summary.get('unmatched_customers', 0)],
+                ["Flagged (Bad Domains)", summary.get('flagged_customer_accounts', 0)],
+                ["Total Shell Accounts Available", summary.get('total_shell_accounts', 0)],
+                ["Processing Time", summary.get('execution_time', 'N/A')],
+                ["Match Success Rate", f"{(summary.get('matched_pairs', 0) / max(summary.get('clean_customer_accounts', 1), 1) * 100):.1f}%" if summary.get('clean_customer_accounts', 0) > 0 else "0%"]
+            ]
+        
+        return headers, result_rows, summary_text, metrics
+    
+    def create_matching_results_export(self, matched_pairs, unmatched_customers=None, flagged_customers=None, invalid_customers=None, summary=None):
+        """
+        Create Excel export for dual-file matching results with one row per customer account
+        
+        Rows are assembled as plain values first, then written with xlsxwriter in
+        constant-memory mode when it is installed (openpyxl write-only mode otherwise).
+        Both stream rows to a temp file, so memory stays flat regardless of result size.
+        Everything but a few summary rows lands on one sheet, so writing sheets in separate
+        processes wouldn't help; very large result sets should use the CSV export instead.
+        Returns:
+            Dict with success, file_path (caller must delete it) and filename
+        """
+        file_path = None
+        try:
+            headers, result_rows, summary_text, metrics = self._build_matching_results(
+                matched_pairs, unmatched_customers, flagged_customers, invalid_customers, summary
+            )
             
-            # Auto-adjust column widths
             column_widths = {
                 1: 18,   # Customer ID
                 2: 30,   # Customer Name
@@ -452,75 +676,238 @@ class ExcelService:
                 19: 40   # Processing Notes
             }
             
-            for col, width in column_widths.items():
-                column_letter = get_column_letter(col)
-                ws_results.column_dimensions[column_letter].width = width
-            
-            # Freeze panes to keep headers visible
-            ws_results.freeze_panes = "A2"
+            # One timestamp for both the "Generated" row and the filename
+            now = datetime.now()
+            generated_at = now.strftime('%Y-%m-%d %H:%M:%S')
             
-            # Sheet 2: Summary Metrics
-            ws_summary = wb.create_sheet("Summary Metrics")
-            
-            # Add summary title
-            current_row = 1
-            ws_summary.merge_cells(f'A{current_row}:B{current_row}')
-            ws_summary[f'A{current_row}'] = "Matching Process Summary"
-            ws_summary[f'A{current_row}'].font = self.title_font
-            ws_summary[f'A{current_row}'].alignment = self.center_alignment
-            ws_summary[f'A{current_row}'].fill = PatternFill(start_color=self.rc_cerulean, end_color=self.rc_cerulean, fill_type="solid")
-            current_row += 2
-            
-            # Summary metrics
-            if summary:
-                metrics = [
-                    ["Total Customer Accounts Processed", summary.get('total_customer_accounts', 0)],
-                    ["Successfully Matched", summary.get('matched_pairs', 0)],
-                    ["Unable to Match", summary.get('unmatched_customers', 0)],
-                    ["Flagged (Bad Domains)", summary.get('flagged_customer_accounts', 0)],
-                    ["Total Shell Accounts Available", summary.get('total_shell_accounts', 0)],
-                    ["Processing Time", summary.get('execution_time', 'N/A')],
-                    ["Match Success Rate", f"{(summary.get('matched_pairs', 0) / max(summary.get('clean_customer_accounts', 1), 1) * 100):.1f}%" if summary.get('clean_customer_accounts', 0) > 0 else "0%"]
-                ]
-                
-                # Add metric headers
-                ws_summary[f'A{current_row}'] = "Metric"
-                ws_summary[f'B{current_row}'] = "Value"
-                ws_summary[f'A{current_row}'].font = self.header_font
-                ws_summary[f'B{current_row}'].font = self.header_font
-                ws_summary[f'A{current_row}'].fill = self.header_fill
-                ws_summary[f'B{current_row}'].fill = self.header_fill
-                current_row += 1
-            
-                # Add metrics
-                for metric_name, metric_value in metrics:
-                    ws_summary[f'A{current_row}'] = metric_name
-                    ws_summary[f'B{current_row}'] = metric_value
-                    ws_summary[f'A{current_row}'].border = self.border
-                    ws_summary[f'B{current_row}'].border = self.border
-            current_row += 1
-            
-            # Auto-adjust summary column widths
-            ws_summary.column_dimensions['A'].width = 35
-            ws_summary.column_dimensions['B'].width = 20
-            
-            # Save to buffer
-            buffer = io.BytesIO()
-            wb.save(buffer)
-            buffer.seek(0)
+            # Save straight to a temp file - the route streams it to the client and deletes it
+            fd, file_path = tempfile.mkstemp(prefix='matching_results_', suffix='.xlsx')
+            os.close(fd)
+            if xlsxwriter is not None:
+                self._write_matching_results_xlsxwriter(file_path, headers, column_widths, result_rows, summary_text, metrics, generated_at)
+            else:
+                self._write_matching_results_openpyxl(file_path, headers, column_widths, result_rows, summary_text, metrics, generated_at)
             
             # Generate filename
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            timestamp = now.strftime('%Y%m%d_%H%M%S')
             filename = f"customer_shell_matching_results_{timestamp}.xlsx"
             
             return {
                 'success': True,
-                'file_buffer': buffer,
+                'file_path': file_path,
                 'filename': filename
             }
             
         except Exception as e:
+            if file_path and os.path.exists(file_path):
+                os.remove(file_path)
             return {
                 'success': False,
                 'error': f"Error creating matching results export: {str(e)}"
-            } 
\ No newline at end of file
+            }
+    
+    def create_matching_results_export_csv(self, matched_pairs, unmatched_customers=None, flagged_customers=None, invalid_customers=None, summary=None):
+        """
+        Create a zipped CSV export of the matching results (results.csv + summary.csv)
+        
+        Same rows as the Excel export without styling, for result sets too large to
+        open comfortably as a workbook. CSVs are written with a BOM so Excel reads them as UTF-8.
+        Returns:
+            Dict with success, file_path (caller must delete it) and filename
+        """
+        file_path = None
+        try:
+            headers, result_rows, summary_text, metrics = self._build_matching_results(
+                matched_pairs, unmatched_customers, flagged_customers, invalid_customers, summary
+            )
+            now = datetime.now()
+            
+            # Stream both CSVs into a zip on disk - the route streams it to the client and deletes it
+            fd, file_path = tempfile.mkstemp(prefix='matching_results_', suffix='.zip')
+            os.close(fd)
+            with zipfile.ZipFile(file_path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+                with archive.open('results.csv', 'w') as raw, io.TextIOWrapper(raw, encoding='utf-8-sig', newline='') as f:
+                    writer = csv.writer(f)
+                    writer.writerow(headers)
+                    writer.writerows(row_data for _, row_data in result_rows)
+                
+                with archive.open('summary.csv', 'w') as raw, io.TextIOWrapper(raw, encoding='utf-8-sig', newline='') as f:
+                    writer = csv.writer(f)
+                    writer.writerow(["Metric", "Value"])
+                    writer.writerow(["Generated", now.strftime('%Y-%m-%d %H:%M:%S')])
+                    writer.writerows(metrics or [])
+            
+            # Generate filename
+            timestamp = now.strftime('%Y%m%d_%H%M%S')
+            filename = f"customer_shell_matching_results_{timestamp}.zip"
+            
+            return {
+                'success': True,
+                'file_path': file_path,
+                'filename': filename
+            }
+            
+        except Exception as e:
+            if file_path and os.path.exists(file_path):
+                os.remove(file_path)
+            return {
+                'success': False,
+                'error': f"Error creating matching results CSV export: {str(e)}"
+            }
+    
+    def _write_matching_results_openpyxl(self, file_path, headers, column_widths, result_rows, summary_text, metrics, generated_at):
+        """Write the matching results workbook with openpyxl in write-only mode"""
+        wb = Workbook(write_only=True)
+        
+        # Sheet 1: Complete Customer Match Results (ALL customers)
+        ws_results = wb.create_sheet("Customer Match Results")
+        results_cell = self._cell_factory(ws_results)
+        last_column = get_column_letter(len(headers))
+        
+        # Column widths (must be set before rows are streamed in write-only mode)
+        for col, width in column_widths.items():
+            ws_results.column_dimensions[get_column_letter(col)].width = width
+        
+        # Freeze panes to keep headers visible
+        ws_results.freeze_panes = "A2"
+        
+        # Add title
+        ws_results.merged_cells.add(f'A1:{last_column}1')
+        ws_results.append([results_cell("Customer-to-Shell Account Matching Results", font=self.title_font, alignment=self.center_alignment, fill=self.header_fill)])
+        
+        # Add timestamp and summary
+        ws_results.merged_cells.add(f'A2:{last_column}2')
+        ws_results.append([results_cell(f"Generated: {generated_at}", alignment=self.center_alignment)])
+        
+        if summary_text:
+            ws_results.merged_cells.add(f'A3:{last_column}3')
+            ws_results.append([results_cell(summary_text, alignment=self.center_alignment)])
+        else:
+            ws_results.append([])
+        ws_results.append([])
+        
+        # Add headers
+        ws_results.append([
+            results_cell(header, font=self.header_font, fill=self.header_fill, alignment=self.center_alignment, border=self.border)
+            for header in headers
+        ])
+        
+        # Conditional formatting depends only on status, so resolve each column's (fill, alignment) once per status
+        row_styles = {}
+        for status, row_data in result_rows:
+            styles = row_styles.get(status)
+            if styles is None:
+                status_fill = self.status_fills.get(status)
+                styles = row_styles[status] = [
+                    (
+                        status_fill if col == 5 else None,  # Status column
+                        self.center_alignment if status == STATUS_MATCHED and col in [12, 13, 14, 15, 16] else self.wrap_alignment  # Score columns
+                    )
+                    for col in range(1, len(headers) + 1)
+                ]
+            ws_results.append([
+                results_cell(value, fill=fill, alignment=alignment, border=self.border)
+                for value, (fill, alignment) in zip(row_data, styles)
+            ])
+        
+        # Sheet 2: Summary Metrics
+        ws_summary = wb.create_sheet("Summary Metrics")
+        summary_cell = self._cell_factory(ws_summary)
+        
+        # Summary column widths
+        ws_summary.column_dimensions['A'].width = 35
+        ws_summary.column_dimensions['B'].width = 20
+        
+        # Add summary title
+        ws_summary.merged_cells.add('A1:B1')
+        ws_summary.append([summary_cell("Matching Process Summary", font=self.title_font, alignment=self.center_alignment, fill=self.header_fill)])
+        ws_summary.append([])
+        
+        if metrics:
+            # Add metric headers
+            ws_summary.append([
+                summary_cell("Metric", font=self.header_font, fill=self.header_fill),
+                summary_cell("Value", font=self.header_font, fill=self.header_fill)
+            ])
+            
+            # Add metrics
+            for metric_name, metric_value in metrics:
+                ws_summary.append([
+                    summary_cell(metric_name, border=self.border),
+                    summary_cell(metric_value, border=self.border)
+                ])
+        
+        wb.save(file_path)
+    
+    def _write_matching_results_xlsxwriter(self, file_path, headers, column_widths, result_rows, summary_text, metrics, generated_at):
+        """Write the matching results workbook with xlsxwriter (same layout and styling as openpyxl)"""
+        # constant_memory flushes each row once the next one starts; URLs stay plain text as with openpyxl
+        wb = xlsxwriter.Workbook(file_path, {'constant_memory': True, 'strings_to_urls': False})
+        try:
+            # Formats are created once and shared by every cell that uses them
+            border = {'border': 1, 'border_color': f"#{self.rc_ash}"}
+            center = {'align': 'center', 'valign': 'vcenter'}
+            wrap = {'align': 'left', 'valign': 'top', 'text_wrap': True}
+            header_fill = {'pattern': 1, 'bg_color': f"#{self.rc_cerulean}"}
+            title_format = wb.add_format({'bold': True, 'font_size': 16, 'font_color': f"#{self.rc_ocean}", **center, **header_fill})
+            center_format = wb.add_format(center)
+            header_format = wb.add_format({'bold': True, 'font_color': '#FFFFFF', **header_fill, **center, **border})
+            metric_header_format = wb.add_format({'bold': True, 'font_color': '#FFFFFF', **header_fill})
+            border_format = wb.add_format(border)
+            wrap_format = wb.add_format({**wrap, **border})
+            score_format = wb.add_format({**center, **border})
+            fill_formats = {}
+            for fill in self.status_fills.values():
+                if id(fill) not in fill_formats:
+                    fill_formats[id(fill)] = wb.add_format({**wrap, **border, 'pattern': 1, 'bg_color': f"#{fill.fgColor.rgb[-6:]}"})
+            status_formats = {status: fill_formats[id(fill)] for status, fill in self.status_fills.items()}
+            last_col = len(headers) - 1
+            
+            # Sheet 1: Complete Customer Match Results (ALL customers)
+            ws_results = wb.add_worksheet("Customer Match Results")
+            for col, width in column_widths.items():
+                ws_results.set_column(col - 1, col - 1, width)
+            
+            # Freeze panes to keep headers visible
+            ws_results.freeze_panes(1, 0)
+            
+            # Title, timestamp and summary rows
+            ws_results.merge_range(0, 0, 0, last_col, "Customer-to-Shell Account Matching Results", title_format)
+            ws_results.merge_range(1, 0, 1, last_col, f"Generated: {generated_at}", center_format)
+            if summary_text:
+                ws_results.merge_range(2, 0, 2, last_col, summary_text, center_format)
+            
+            ws_results.write_row(4, 0, headers, header_format)
+            
+            # Per-status column formats, resolved once and grouped into runs of adjacent
+            # columns sharing a format so each run goes out in a single write_row call
+            row_format_runs = {}
+            for row_idx, (status, row_data) in enumerate(result_rows, 5):
+                runs = row_format_runs.get(status)
+                if runs is None:
+                    runs = row_format_runs[status] = []
+                    for col in range(len(headers)):
+                        cell_format = (
+                            status_formats.get(status, wrap_format) if col == 4  # Status column
+                            else score_format if status == STATUS_MATCHED and 11 <= col <= 15  # Score columns
+                            else wrap_format
+                        )
+                        if runs and runs[-1][2] is cell_format:
+                            runs[-1][1] = col + 1
+                        else:
+                            runs.append([col, col + 1, cell_format])
+                for start, end, cell_format in runs:
+                    ws_results.write_row(row_idx, start, row_data[start:end], cell_format)
+            
+            # Sheet 2: Summary Metrics
+            ws_summary = wb.add_worksheet("Summary Metrics")
+            ws_summary.set_column(0, 0, 35)
+            ws_summary.set_column(1, 1, 20)
+            ws_summary.merge_range(0, 0, 0, 1, "Matching Process Summary", title_format)
+            
+            if metrics:
+                ws_summary.write_row(2, 0, ["Metric", "Value"], metric_header_format)
+                for row_idx, metric_row in enumerate(metrics, 3):
+                    ws_summary.write_row(row_idx, 0, metric_row, border_format)
+        finally:
+            wb.close()
@@ -1,82 +1,323 @@
-from urllib.parse import urlparse
+import itertools
+import logging
+import math
+import multiprocessing
+import os
 import re
-from difflib import SequenceMatcher
-from typing import Optional, Tuple, List, Dict
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Optional, Tuple, List, Dict, Union, Iterable, Callable
+
+try:
+    # C++ backed string matching - much faster than the pure-Python ratio on large batches
+    from rapidfuzz.fuzz import ratio as rapidfuzz_ratio
+    from rapidfuzz.process import extract_iter as rapidfuzz_extract_iter
+except ImportError:
+    rapidfuzz_ratio = rapidfuzz_extract_iter = None
+
+try:
+    # C edit distance for installs without rapidfuzz - same ratio as rapidfuzz's, so thresholds hold
+    from Levenshtein import ratio as levenshtein_ratio
+except ImportError:
+    levenshtein_ratio = None
+
+logger = logging.getLogger(__name__)
+
+
+def _indel_ratio(str1: str, str2: str) -> float:
+    """
+    Pure-Python rapidfuzz ratio / 100: 2 * LCS / total length, with the LCS from the
+    bit-parallel algorithm (one big-int update per character instead of a DP table)
+    """
+    if len(str1) < len(str2):
+        str1, str2 = str2, str1
+    char_masks = {}
+    for position, char in enumerate(str2):
+        char_masks[char] = char_masks.get(char, 0) | (1 << position)
+    all_ones = (1 << len(str2)) - 1
+    row = all_ones
+    for char in str1:
+        matches = row & char_masks.get(char, 0)
+        row = ((row + matches) | (row - matches)) & all_ones
+    lcs = len(str2) - row.bit_count()
+    return 2 * lcs / (len(str1) + len(str2))
+
+
+def string_similarity(str1: str, str2: str) -> float:
+    """Similarity ratio (0.0 to 1.0) of two already-normalized strings"""
+    if str1 == str2:
+        return 1.0  # Identical after normalization - no need to run the edit-distance scorer
+    if rapidfuzz_ratio is not None:
+        return rapidfuzz_ratio(str1, str2) / 100.0
+    if levenshtein_ratio is not None:
+        return levenshtein_ratio(str1, str2)
+    return _indel_ratio(str1, str2)
+
+
+def batch_similarities(query: str, choices: List[str]) -> Optional[List[float]]:
+    """
+    string_similarity of query against every choice in one rapidfuzz call,
+    instead of paying rapidfuzz's per-call setup once per pair; None without rapidfuzz
+    """
+    if rapidfuzz_extract_iter is None or not query:
+        return None
+    similarities = [0.0] * len(choices)
+    for _, score, index in rapidfuzz_extract_iter(query, choices, scorer=rapidfuzz_ratio, processor=None):
+        if choices[index]:
+            similarities[index] = score / 100.0
+    return similarities
+
+
+# Common domain prefixes and suffixes to normalize
+DOMAIN_PREFIXES = ('www.', 'app.', 'portal.', 'my.', 'secure.', 'admin.')
+DOMAIN_SUFFIXES = ('.com', '.org', '.net', '.edu', '.gov', '.co', '.io', '.ai')
+
+# Common business suffixes stripped from company names (legal suffix handling)
+BUSINESS_SUFFIXES = (
+    'inc', 'incorporated', 'corp', 'corporation', 'ltd', 'limited',
+    'llc', 'llp', 'company', 'co', 'group', 'holdings', 'enterprises'
+)
+
+# Each suffix with the separators it may follow, checked in order with one endswith() per suffix
+_BUSINESS_SUFFIX_PATTERNS = tuple(
+    (tuple(f'{separator}{suffix}' for separator in ' .,-'), len(suffix) + 1)
+    for suffix in BUSINESS_SUFFIXES
+)
+_ANY_BUSINESS_SUFFIX = tuple(pattern for patterns, _ in _BUSINESS_SUFFIX_PATTERNS for pattern in patterns)
+
+# Same host as urlparse's netloc for http(s) URLs and bare domains, in a single match
+_URL_HOST_RE = re.compile(
+    r'(?:https?://)?(?:' + '|'.join(re.escape(prefix) for prefix in DOMAIN_PREFIXES) + r')?([^/?#]*)',
+    re.IGNORECASE
+)
+_DOMAIN_SUFFIX_RE = re.compile('(?:' + '|'.join(re.escape(suffix) for suffix in DOMAIN_SUFFIXES) + r')\Z')
+_NON_ALNUM_RE = re.compile(r'[^a-zA-Z0-9]')
+_NON_ALNUM_SPACE_RE = re.compile(r'[^a-zA-Z0-9\s]')
+
+# bytes.translate tables doing the same cleanup for ASCII text without the regex engine
+# (non-ASCII strings use the patterns above)
+_ASCII_ALNUM = b'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
+_ASCII_NON_ALNUM = bytes(c for c in range(128) if c not in _ASCII_ALNUM)
+_ASCII_PUNCTUATION = bytes(c for c in _ASCII_NON_ALNUM if not chr(c).isspace())
+_PUNCTUATION_TO_SPACE = bytes.maketrans(_ASCII_PUNCTUATION, b' ' * len(_ASCII_PUNCTUATION))
+
+
+# The same shell names and domains come up for every customer in a batch, so the
+# pure string helpers below are memoized at module level (per process)
+
+@lru_cache(maxsize=4096)
+def extract_domain_from_url(url: str) -> Optional[str]:
+    """Extract clean domain name from URL (the host part, lower-cased, without common prefixes)"""
+    if not url or not isinstance(url, str):
+        return None
+    
+    # Optional scheme, optional common prefix, then everything up to the path/query/fragment
+    return _URL_HOST_RE.match(url.strip()).group(1).lower()
+
+
+@lru_cache(maxsize=4096)
+def extract_company_name_from_domain(domain: str) -> Optional[str]:
+    """Extract company name from domain (remove TLD and common patterns)"""
+    if not domain:
+        return None
+        
+    # Remove TLD
+    domain = _DOMAIN_SUFFIX_RE.sub('', domain, count=1)
+    
+    # Remove common patterns
+    if domain.isascii():
+        domain = domain.encode('ascii').translate(None, _ASCII_NON_ALNUM).decode('ascii')  # Remove special chars
+    else:
+        domain = _NON_ALNUM_RE.sub('', domain)
+    return domain.lower() if domain else None
+
+
+@lru_cache(maxsize=16384)
+def normalize_company_name(name: str) -> str:
+    """Normalize company name for comparison (with legal suffix handling)"""
+    if not name:
+        return ""
+        
+    # Convert to lowercase
+    normalized = name.lower()
+    
+    # Remove common business suffixes (legal suffix handling), each with any of its separators
+    # Most names have none, so one endswith() over every pattern skips the ordered pass
+    if normalized.endswith(_ANY_BUSINESS_SUFFIX):
+        for patterns, pattern_length in _BUSINESS_SUFFIX_PATTERNS:
+            if normalized.endswith(patterns):
+                normalized = normalized[:-pattern_length]
+    
+    # Remove special characters and extra spaces (de-noising)
+    if normalized.isascii():
+        normalized = normalized.encode('ascii').translate(_PUNCTUATION_TO_SPACE).decode('ascii')
+    else:
+        normalized = _NON_ALNUM_SPACE_RE.sub(' ', normalized)
+    normalized = ' '.join(normalized.split())  # Normalize whitespace
+    
+    return normalized
+
+
+@lru_cache(maxsize=8192)
+def _cached_similarity(norm1: str, norm2: str) -> float:
+    """string_similarity for a normalized pair, callers pass the pair sorted (similarity is symmetric)"""
+    return string_similarity(norm1, norm2)
+
+
+# Q-gram blocking: a shell must share at least this fraction of the smaller of its and the
+# customer key's 3-gram sets (overlap coefficient, so short names aren't drowned by long ones)
+QGRAM_SIZE = 3
+QGRAM_MIN_SHARED = 0.5
+
+
+def _qgrams(text: str) -> set:
+    """Distinct q-grams of text with spaces removed (short strings are their own single gram)"""
+    text = text.replace(' ', '')
+    if len(text) <= QGRAM_SIZE:
+        return {text} if text else set()
+    return {text[i:i + QGRAM_SIZE] for i in range(len(text) - QGRAM_SIZE + 1)}
+
+
+# Overall score weighting, picked once per pair from which fields both sides have.
+# Data precedence: Website > Account Name for entity identity (if they conflict, website wins);
+# address consistency always contributes (address scores are 0-100, normalized here)
+def _score_website_and_name(website_score: float, name_score: float, address_score: float) -> float:
+    """Both sides have a website: website gets higher weight, name is secondary"""
+    return website_score * 0.6 + name_score * 0.3 + address_score * 0.1 / 100
+
+
+def _score_name_only(website_score: float, name_score: float, address_score: float) -> float:
+    """No website pair: fall back to the name match"""
+    return name_score * 0.6 + address_score * 0.1 / 100
+
+
+def _score_address_only(website_score: float, name_score: float, address_score: float) -> float:
+    """Neither a website nor a name pair: address signals only"""
+    return address_score * 0.6 / 100 + address_score * 0.1 / 100
+
+
+def pick_overall_scorer(has_websites: bool, has_names: bool) -> Callable[[float, float, float], float]:
+    """Weighting function for a pair given whether both sides have websites / names"""
+    if has_websites:
+        return _score_website_and_name
+    if has_names:
+        return _score_name_only
+    return _score_address_only
+
+
+# Address consistency points per (country, state, city, postal_code) part, in address_features order
+ADDRESS_SCORING = (('Country', 30), ('State', 30), ('City', 30), ('Postal', 10))
+
+
+@lru_cache(maxsize=16384)
+def _score_address_parts(customer_address: Tuple[str, str, str, str],
+                         shell_address: Tuple[str, str, str, str]) -> Tuple[float, str]:
+    """
+    Address consistency score and explanation for two cleaned (country, state, city, postal_code) tuples
+    Memoized: shells cluster on a few locations, so each distinct address pair is scored once per process
+    """
+    score = 0.0
+    matches = []
+    mismatches = []
+    
+    # Parts present on both sides earn their points when equal and are listed as mismatches otherwise
+    for (label, points), customer_part, shell_part in zip(ADDRESS_SCORING, customer_address, shell_address):
+        if customer_part and shell_part:
+            if customer_part == shell_part:
+                score += points
+                matches.append(f"{label}: {customer_part}")
+            else:
+                mismatches.append(f"{label}: {customer_part} ≠ {shell_part}")
+    
+    # Create explanation
+    explanation_parts = []
+    if matches:
+        explanation_parts.append(f"Matches: {', '.join(matches)}")
+    if mismatches:
+        explanation_parts.append(f"Mismatches: {', '.join(mismatches)}")
+    
+    explanation = '; '.join(explanation_parts) if explanation_parts else "No address data to compare"
+    
+    return score, explanation
+
+
+class ShellIndex:
+    """Shell accounts with hash buckets and normalized website/name/address fields precomputed once per batch"""
+    
+    def __init__(self, shell_accounts: List[dict], hash_buckets: Dict, features: Dict[int, Dict]):
+        self.shell_accounts = shell_accounts
+        self.hash_buckets = hash_buckets
+        self.features = features  # id(shell) -> normalized fields (shell dicts are never mutated)
+    
+    def __len__(self):
+        return len(self.shell_accounts)
+
+
+# One process pool per server process, started on first use (spawn: workers don't inherit the
+# Flask app's threads and sockets); shells are shipped with each customer chunk and indexed once
+# per batch in each worker, instead of being pickled again with every customer
+_fuzzy_pool: Optional[ProcessPoolExecutor] = None
+_fuzzy_pool_lock = threading.Lock()
+_fuzzy_batch_ids = itertools.count()
+
+_worker_batch_id = None
+_worker_matcher = None
+_worker_shell_index: Optional[ShellIndex] = None
+
+
+def _get_fuzzy_pool(max_workers: int) -> ProcessPoolExecutor:
+    """The shared fuzzy matching process pool, created on first use with max_workers processes"""
+    global _fuzzy_pool
+    with _fuzzy_pool_lock:
+        if _fuzzy_pool is None:
+            _fuzzy_pool = ProcessPoolExecutor(max_workers=max_workers,
+                                              mp_context=multiprocessing.get_context('spawn'))
+        return _fuzzy_pool
+
+
+def _discard_fuzzy_pool(pool: ProcessPoolExecutor):
+    """Drop a failed pool so the next batch starts a fresh one"""
+    global _fuzzy_pool
+    with _fuzzy_pool_lock:
+        if _fuzzy_pool is pool:
+            _fuzzy_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _score_customer_chunk(batch_id: int, shell_accounts: List[dict], full_scan_limit: int,
+                          max_candidates: int, customers: List[dict]) -> List[Dict]:
+    """Process-pool task: best shell matches for a chunk of customers (shells indexed once per batch)"""
+    global _worker_batch_id, _worker_matcher, _worker_shell_index
+    if _worker_batch_id != batch_id:
+        _worker_matcher = FuzzyMatchingService(full_scan_limit=full_scan_limit, max_candidates=max_candidates)
+        _worker_shell_index = _worker_matcher.prepare_shell_index(shell_accounts)
+        _worker_batch_id = batch_id
+    return [_worker_matcher.find_best_shell_match(customer, _worker_shell_index) for customer in customers]
 
 
 class FuzzyMatchingService:
     """Service for fuzzy matching operations used in dual-file account matching"""
     
-    def __init__(self):
-        # Common domain prefixes and suffixes to normalize
-        self.domain_prefixes = ['www.', 'app.', 'portal.', 'my.', 'secure.', 'admin.']
-        self.domain_suffixes = ['.com', '.org', '.net', '.edu', '.gov', '.co', '.io', '.ai']
+    def __init__(self, full_scan_limit: int = 500, max_candidates: int = 50):
+        # Shell lists larger than this are blocked by name/domain 3-grams before falling back
+        # to scoring every shell, when a customer shares no domain or name token with any shell
+        self.full_scan_limit = full_scan_limit
+        # Bucketed candidates kept for scoring, exact domain hits first, then the closest names
+        self.max_candidates = max_candidates
         
     def extract_domain_from_url(self, url: str) -> Optional[str]:
         """Extract clean domain name from URL"""
-        if not url:
-            return None
-            
-        try:
-            # Add protocol if missing
-            if not url.startswith(('http://', 'https://')):
-                url = 'https://' + url
-                
-            parsed = urlparse(url)
-            domain = parsed.netloc.lower()
-            
-            # Remove common prefixes
-            for prefix in self.domain_prefixes:
-                if domain.startswith(prefix):
-                    domain = domain[len(prefix):]
-                    break
-                    
-            return domain
-        except Exception:
-            return None
+        return extract_domain_from_url(url)
     
     def extract_company_name_from_domain(self, domain: str) -> Optional[str]:
         """Extract company name from domain (remove TLD and common patterns)"""
-        if not domain:
-            return None
-            
-        # Remove TLD
-        for suffix in self.domain_suffixes:
-            if domain.endswith(suffix):
-                domain = domain[:-len(suffix)]
-                break
-        
-        # Remove common patterns
-        domain = re.sub(r'[^a-zA-Z0-9]', '', domain)  # Remove special chars
-        return domain.lower() if domain else None
+        return extract_company_name_from_domain(domain)
     
     def normalize_company_name(self, name: str) -> str:
         """Normalize company name for comparison (with legal suffix handling)"""
-        if not name:
-            return ""
-            
-        # Convert to lowercase
-        normalized = name.lower()
-        
-        # Remove common business suffixes (legal suffix handling)
-        business_suffixes = [
-            'inc', 'incorporated', 'corp', 'corporation', 'ltd', 'limited', 
-            'llc', 'llp', 'company', 'co', 'group', 'holdings', 'enterprises'
-        ]
-        
-        for suffix in business_suffixes:
-            # Remove suffix with various separators
-            patterns = [f' {suffix}', f'.{suffix}', f',{suffix}', f'-{suffix}']
-            for pattern in patterns:
-                if normalized.endswith(pattern):
-                    normalized = normalized[:-len(pattern)]
-                    break
-        
-        # Remove special characters and extra spaces (de-noising)
-        normalized = re.sub(r'[^a-zA-Z0-9\s]', ' ', normalized)
-        normalized = ' '.join(normalized.split())  # Normalize whitespace
-        
-        return normalized
+        return normalize_company_name(name)
     
     def compute_fuzzy_similarity(self, str1: str, str2: str) -> float:
         """Compute fuzzy similarity between two strings (0.0 to 1.0)"""
@@ -90,9 +331,27 @@ class FuzzyMatchingService:
         if not norm1 or not norm2:
             return 0.0
         
-        # Use SequenceMatcher for fuzzy comparison
-        similarity = SequenceMatcher(None, norm1, norm2).ratio()
-        return similarity
+        if norm2 < norm1:
+            norm1, norm2 = norm2, norm1
+        return _cached_similarity(norm1, norm2)
+    
+    def website_features(self, website: str) -> Dict:
+        """Precompute the domain-derived fields used by website matching"""
+        domain = self.extract_domain_from_url(website) if website else None
+        domain_company = self.extract_company_name_from_domain(domain) if domain else None
+        return {
+            'website': website,
+            'domain': domain,
+            'domain_company': domain_company,
+            'normalized': self.normalize_company_name(domain_company) if domain_company else ''
+        }
+    
+    def name_features(self, name: str) -> Dict:
+        """Precompute the normalized form used by name matching"""
+        return {
+            'name': name,
+            'normalized': self.normalize_company_name(name) if name else ''
+        }
     
     # NEW MATCHING ALGORITHM METHODS FOR DUAL-FILE SYSTEM
     
@@ -101,36 +360,50 @@ class FuzzyMatchingService:
         Compute Website_Match score between customer Website and shell ZI_Website__c
         Returns (score_0_to_100, explanation)
         """
-        if not customer_website:
+        return self.website_match_from_features(
+            self.website_features(customer_website),
+            self.website_features(shell_zi_website)
+        )
+    
+    def website_match_from_features(self, customer: Dict, shell: Dict,
+                                    similarity: Optional[float] = None, explain: bool = True) -> Tuple[float, str]:
+        """
+        compute_website_match on precomputed website_features (no re-parsing per pair)
+        similarity of the normalized domain names may be passed in when already batch-scored;
+        explain=False skips formatting the explanation of a scored pair
+        """
+        if not customer['website']:
             return 0.0, "No customer website provided"
             
-        if not shell_zi_website:
+        if not shell['website']:
             return 0.0, "No shell ZI website provided"
         
-        # Extract domains from both websites
-        customer_domain = self.extract_domain_from_url(customer_website)
-        shell_domain = self.extract_domain_from_url(shell_zi_website)
+        # Domains extracted from both websites
+        customer_domain = customer['domain']
+        shell_domain = shell['domain']
         
         if not customer_domain:
-            return 0.0, f"Could not extract valid domain from customer website: {customer_website}"
+            return 0.0, f"Could not extract valid domain from customer website: {customer['website']}"
         
         if not shell_domain:
-            return 0.0, f"Could not extract valid domain from shell ZI website: {shell_zi_website}"
-        
-        # Extract company names from domains
-        customer_domain_company = self.extract_company_name_from_domain(customer_domain)
-        shell_domain_company = self.extract_company_name_from_domain(shell_domain)
+            return 0.0, f"Could not extract valid domain from shell ZI website: {shell['website']}"
         
-        if not customer_domain_company:
+        # Company names extracted from domains
+        if not customer['domain_company']:
             return 0.0, f"Could not extract company name from customer domain: {customer_domain}"
         
-        if not shell_domain_company:
+        if not shell['domain_company']:
             return 0.0, f"Could not extract company name from shell domain: {shell_domain}"
         
         # Compute similarity between domain-derived company names
-        similarity = self.compute_fuzzy_similarity(customer_domain_company, shell_domain_company)
+        if similarity is None:
+            similarity = 0.0
+            if customer['normalized'] and shell['normalized']:
+                similarity = string_similarity(customer['normalized'], shell['normalized'])
         score = similarity * 100
         
+        if not explain:
+            return score, ''
         explanation = f"Comparing customer domain '{customer_domain}' with shell ZI domain '{shell_domain}' (similarity: {score:.1f}%)"
         
         return score, explanation
@@ -140,91 +413,78 @@ class FuzzyMatchingService:
         Compute Name_Match score between customer Name and shell ZI_Company_Name__c
         Returns (score_0_to_100, explanation)
         """
-        if not customer_name:
+        return self.name_match_from_features(
+            self.name_features(customer_name),
+            self.name_features(shell_zi_name)
+        )
+    
+    def name_match_from_features(self, customer: Dict, shell: Dict,
+                                 similarity: Optional[float] = None, explain: bool = True) -> Tuple[float, str]:
+        """
+        compute_name_match on precomputed name_features (no re-normalizing per pair)
+        similarity of the normalized names may be passed in when already batch-scored;
+        explain=False skips formatting the explanation of a scored pair
+        """
+        if not customer['name']:
             return 0.0, "No customer name provided"
             
-        if not shell_zi_name:
+        if not shell['name']:
             return 0.0, "No shell ZI company name provided"
         
         # Compute similarity between normalized names
-        similarity = self.compute_fuzzy_similarity(customer_name, shell_zi_name)
+        customer_normalized = customer['normalized']
+        shell_normalized = shell['normalized']
+        if similarity is None:
+            similarity = 0.0
+            if customer_normalized and shell_normalized:
+                similarity = string_similarity(customer_normalized, shell_normalized)
         score = similarity * 100
         
+        if not explain:
+            return score, ''
         # Create explanation with normalized names for transparency
-        customer_normalized = self.normalize_company_name(customer_name)
-        shell_normalized = self.normalize_company_name(shell_zi_name)
-        
         explanation = f"Comparing customer name '{customer_normalized}' with shell ZI name '{shell_normalized}' (similarity: {score:.1f}%)"
         
         return score, explanation
     
-    def compute_address_consistency_score(self, customer_data: dict, shell_data: dict) -> Tuple[float, str]:
+    def address_features(self, country: str, state: str, city: str, postal_code: str) -> Tuple[str, str, str, str]:
+        """Precompute the trimmed, lower-cased (country, state, city, postal_code) compared by address consistency scoring"""
+        return (
+            (country or '').strip().lower(),
+            (state or '').strip().lower(),
+            (city or '').strip().lower(),
+            (postal_code or '').strip().lower()
+        )
+    
+    def customer_address(self, customer: dict) -> Tuple[str, str, str, str]:
+        """address_features of a customer's Billing address"""
+        return self.address_features(
+            customer.get('BillingCountry'), customer.get('BillingState'),
+            customer.get('BillingCity'), customer.get('BillingPostalCode')
+        )
+    
+    def shell_address(self, shell: dict) -> Tuple[str, str, str, str]:
+        """address_features of a shell's ZI company address"""
+        return self.address_features(
+            shell.get('ZI_Company_Country__c'), shell.get('ZI_Company_State__c'),
+            shell.get('ZI_Company_City__c'), shell.get('ZI_Company_Postal_Code__c')
+        )
+    
+    def compute_address_consistency_score(self, customer_data: dict, shell_data: dict,
+                                          customer_address: Optional[Tuple[str, str, str, str]] = None,
+                                          shell_address: Optional[Tuple[str, str, str, str]] = None) -> Tuple[float, str]:
         """
         Compute Address_Consistency score using project breakdown scoring:
         Country match (+30), State match (+30), City match (+30), Postal code match (+10)
+        customer_address/shell_address (from address_features) may be passed in to skip re-cleaning per pair
         Returns (score_0_to_100, explanation)
         """
         if not customer_data or not shell_data:
             return 0.0, "Missing customer or shell address data"
         
-        score = 0.0
-        matches = []
-        mismatches = []
-        
-        # Country match (+30 points)
-        customer_country = customer_data.get('BillingCountry', '').strip().lower()
-        shell_country = shell_data.get('ZI_Company_Country__c', '').strip().lower()
-        
-        if customer_country and shell_country:
-            if customer_country == shell_country:
-                score += 30
-                matches.append(f"Country: {customer_country}")
-            else:
-                mismatches.append(f"Country: {customer_country} ≠ {shell_country}")
-        
-        # State match (+30 points)
-        customer_state = customer_data.get('BillingState', '').strip().lower()
-        shell_state = shell_data.get('ZI_Company_State__c', '').strip().lower()
-        
-        if customer_state and shell_state:
-            if customer_state == shell_state:
-                score += 30
-                matches.append(f"State: {customer_state}")
-            else:
-                mismatches.append(f"State: {customer_state} ≠ {shell_state}")
-        
-        # City match (+30 points)
-        customer_city = customer_data.get('BillingCity', '').strip().lower()
-        shell_city = shell_data.get('ZI_Company_City__c', '').strip().lower()
-        
-        if customer_city and shell_city:
-            if customer_city == shell_city:
-                score += 30
-                matches.append(f"City: {customer_city}")
-            else:
-                mismatches.append(f"City: {customer_city} ≠ {shell_city}")
-        
-        # Postal code match (+10 points)
-        customer_postal = customer_data.get('BillingPostalCode', '').strip().lower()
-        shell_postal = shell_data.get('ZI_Company_Postal_Code__c', '').strip().lower()
-        
-        if customer_postal and shell_postal:
-            if customer_postal == shell_postal:
-                score += 10
-                matches.append(f"Postal: {customer_postal}")
-        else:
-                mismatches.append(f"Postal: {customer_postal} ≠ {shell_postal}")
-        
-        # Create explanation
-        explanation_parts = []
-        if matches:
-            explanation_parts.append(f"Matches: {', '.join(matches)}")
-        if mismatches:
-            explanation_parts.append(f"Mismatches: {', '.join(mismatches)}")
-        
-        explanation = '; '.join(explanation_parts) if explanation_parts else "No address data to compare"
-        
-        return score, explanation
+        customer_address = customer_address or self.customer_address(customer_data)
+        shell_address = shell_address or self.shell_address(shell_data)
+        return _score_address_parts(customer_address, shell_address)
     
     # CORE MATCHING ALGORITHM - TWO STAGE RETRIEVAL
     
@@ -235,9 +495,13 @@ class FuzzyMatchingService:
         """
         website_buckets = {}
         name_buckets = {}
+        qgram_buckets = {}
+        qgram_counts = {}
+        normalized_names = {}
         
         for shell in shell_accounts:
             shell_id = shell.get('Id', '')
+            shell_grams = set()
             
             # Website hash bucket
             zi_website = shell.get('ZI_Website__c', '')
@@ -249,12 +513,15 @@ class FuzzyMatchingService:
                         if domain_company not in website_buckets:
                             website_buckets[domain_company] = []
                         website_buckets[domain_company].append(shell)
+                        shell_grams |= _qgrams(domain_company)
             
             # Name hash bucket
             zi_name = shell.get('ZI_Company_Name__c', '')
             if zi_name:
                 normalized_name = self.normalize_company_name(zi_name)
                 if normalized_name:
+                    normalized_names[shell['Id']] = normalized_name
+                    shell_grams |= _qgrams(normalized_name)
                     # Create multiple hash keys from name tokens
                     name_tokens = normalized_name.split()
                     for token in name_tokens:
@@ -262,103 +529,185 @@ class FuzzyMatchingService:
                             if token not in name_buckets:
                                 name_buckets[token] = []
                             name_buckets[token].append(shell)
+            
+            # Q-gram buckets (each shell at most once per gram) for the looser blocking stage
+            for gram in shell_grams:
+                qgram_buckets.setdefault(gram, []).append(shell)
+            if shell_grams:
+                qgram_counts[shell['Id']] = len(shell_grams)
+        
+        # Every bucketed shell once, in bucket order, so candidate lookup doesn't rescan the buckets
+        bucketed_shells = []
+        seen_ids = set()
+        for buckets in (website_buckets, name_buckets, qgram_buckets):
+            for bucket_list in buckets.values():
+                for shell in bucket_list:
+                    if shell['Id'] not in seen_ids:
+                        bucketed_shells.append(shell)
+                        seen_ids.add(shell['Id'])
         
         return {
             'website_buckets': website_buckets,
-            'name_buckets': name_buckets
+            'name_buckets': name_buckets,
+            'name_bucket_ids': {token: [shell['Id'] for shell in bucket] for token, bucket in name_buckets.items()},
+            'qgram_buckets': qgram_buckets,
+            'qgram_counts': qgram_counts,
+            'normalized_names': normalized_names,
+            'bucketed_shells': bucketed_shells,
+            'by_id': {shell['Id']: shell for shell in bucketed_shells},
+            'bucket_order': {shell['Id']: position for position, shell in enumerate(bucketed_shells)}
         }
     
-    def fast_filter_candidates(self, customer: dict, hash_buckets: Dict[str, Dict[str, List[dict]]]) -> List[dict]:
+    def _shells_in_bucket_order(self, candidate_ids: Iterable[str], hash_buckets: Dict) -> List[dict]:
+        """Candidate shells in bucketed_shells order (keeps score ties stable) without scanning every shell"""
+        by_id = hash_buckets['by_id']
+        return [by_id[shell_id] for shell_id in sorted(candidate_ids, key=hash_buckets['bucket_order'].__getitem__)]
+    
+    def _closest_names(self, normalized_name: str, candidate_ids: List[str], hash_buckets: Dict,
+                       limit: int) -> List[str]:
+        """
+        The limit candidate IDs whose normalized ZI names are most similar to normalized_name
+        (string_similarity, one rapidfuzz call); ties keep bucket order
+        """
+        if len(candidate_ids) <= limit:
+            return candidate_ids
+        if limit <= 0:
+            return []
+        candidate_ids = sorted(candidate_ids, key=hash_buckets['bucket_order'].__getitem__)
+        shell_names = [hash_buckets['normalized_names'].get(shell_id, '') for shell_id in candidate_ids]
+        similarities = batch_similarities(normalized_name, shell_names)
+        if similarities is None:
+            similarities = [
+                string_similarity(normalized_name, shell_name) if normalized_name and shell_name else 0.0
+                for shell_name in shell_names
+            ]
+        ranked = sorted(range(len(candidate_ids)), key=lambda position: -similarities[position])
+        return [candidate_ids[position] for position in ranked[:limit]]
+    
+    def fast_filter_candidates(self, customer: dict, hash_buckets: Dict[str, Dict[str, List[dict]]],
+                               max_candidates: Optional[int] = None) -> List[dict]:
         """
         Fast filter stage: Use hash buckets to quickly identify potential shell candidates
         Data precedence: Website > Account Name for entity identity
+        Shells in the customer's exact domain bucket are kept ahead of shells sharing a name token;
+        at most max_candidates shells are kept, the rest chosen by name similarity to the customer
         """
-        candidates = set()
         website_buckets = hash_buckets['website_buckets']
-        name_buckets = hash_buckets['name_buckets']
+        name_bucket_ids = hash_buckets['name_bucket_ids']
+        max_candidates = self.max_candidates if max_candidates is None else max_candidates
+        normalized_name = self.normalize_company_name(customer.get('Name', ''))
         
         # STEP 1: Website-based filtering (highest precedence)
+        domain_ids = []
         customer_website = customer.get('Website', '')
         if customer_website:
             domain = self.extract_domain_from_url(customer_website)
             if domain:
                 domain_company = self.extract_company_name_from_domain(domain)
                 if domain_company and domain_company in website_buckets:
-                    for shell in website_buckets[domain_company]:
-                        candidates.add(shell['Id'])
-        
-        # STEP 2: Name-based filtering (if website filtering yielded few results)
-        customer_name = customer.get('Name', '')
-        if customer_name and len(candidates) < 10:  # Threshold for adding name-based candidates
-            normalized_name = self.normalize_company_name(customer_name)
-            if normalized_name:
-                name_tokens = normalized_name.split()
-                for token in name_tokens:
-                    if len(token) > 2 and token in name_buckets:
-                        for shell in name_buckets[token]:
-                            candidates.add(shell['Id'])
-        
-        # Convert candidate IDs back to shell account objects
-        candidate_shells = []
-        candidate_id_set = {shell['Id'] for shell in hash_buckets['website_buckets'].get('', []) + 
-                           sum(hash_buckets['name_buckets'].values(), [])}
-        
-        # Get shell objects for candidates
-        all_shells = []
-        for bucket_list in website_buckets.values():
-            all_shells.extend(bucket_list)
-        for bucket_list in name_buckets.values():
-            all_shells.extend(bucket_list)
-        
-        # Deduplicate and filter
-        seen_ids = set()
-        for shell in all_shells:
-            if shell['Id'] in candidates and shell['Id'] not in seen_ids:
-                candidate_shells.append(shell)
-                seen_ids.add(shell['Id'])
-        
-        return candidate_shells
+                    domain_ids = list(dict.fromkeys(shell['Id'] for shell in website_buckets[domain_company]))
+        
+        # STEP 2: Name-based filtering (shells sharing a name token, alongside any domain hits)
+        name_ids = set()
+        if normalized_name:
+            for token in normalized_name.split():
+                if len(token) > 2 and token in name_bucket_ids:
+                    name_ids.update(name_bucket_ids[token])
+        name_ids.difference_update(domain_ids)
+        
+        # STEP 3: Keep the closest names when there are more candidates than max_candidates
+        candidate_ids = self._closest_names(normalized_name, domain_ids, hash_buckets, max_candidates)
+        candidate_ids += self._closest_names(normalized_name, list(name_ids), hash_buckets,
+                                             max_candidates - len(candidate_ids))
+        
+        # Convert candidate IDs back to shell account objects (bucketed shells are already deduplicated)
+        return self._shells_in_bucket_order(candidate_ids, hash_buckets)
+    
+    def qgram_filter_candidates(self, customer: dict, hash_buckets: Dict[str, Dict[str, List[dict]]]) -> List[dict]:
+        """
+        Looser blocking stage for customers with no exact domain/name-token hit:
+        shells sharing at least QGRAM_MIN_SHARED of the 3-grams of the customer's domain name
+        or normalized name (spaces removed, so "AcmeCorp" still reaches "Acme Corp")
+        The threshold is taken against the smaller gram set of the pair
+        """
+        domain = self.extract_domain_from_url(customer.get('Website', '')) if customer.get('Website') else None
+        domain_company = self.extract_company_name_from_domain(domain) if domain else None
+        normalized_name = self.normalize_company_name(customer.get('Name', ''))
+        
+        qgram_buckets = hash_buckets['qgram_buckets']
+        qgram_counts = hash_buckets['qgram_counts']
+        candidate_ids = set()
+        for key in (domain_company, normalized_name):
+            grams = _qgrams(key) if key else set()
+            if not grams:
+                continue
+            shared = Counter(shell['Id'] for gram in grams for shell in qgram_buckets.get(gram, ()))
+            candidate_ids.update(
+                shell_id for shell_id, count in shared.items()
+                if count >= math.ceil(min(len(grams), qgram_counts[shell_id]) * QGRAM_MIN_SHARED)
+            )
+        
+        return self._shells_in_bucket_order(candidate_ids, hash_buckets)
+    
+    def customer_features(self, customer: dict) -> Dict:
+        """Precompute normalized website/name/address fields for a customer account"""
+        return {
+            'website': self.website_features(customer.get('Website', '')),
+            'name': self.name_features(customer.get('Name', '')),
+            'address': self.customer_address(customer)
+        }
+    
+    def shell_features(self, shell: dict) -> Dict:
+        """Precompute normalized ZI website/name/address fields for a shell account"""
+        return {
+            'website': self.website_features(shell.get('ZI_Website__c', '')),
+            'name': self.name_features(shell.get('ZI_Company_Name__c', '')),
+            'address': self.shell_address(shell)
+        }
     
-    def compute_overall_similarity(self, customer: dict, shell: dict) -> Dict[str, float]:
+    def compute_overall_similarity(self, customer: dict, shell: dict,
+                                   customer_features: Optional[Dict] = None,
+                                   shell_features: Optional[Dict] = None,
+                                   website_similarity: Optional[float] = None,
+                                   name_similarity: Optional[float] = None,
+                                   explain: bool = True) -> Dict[str, float]:
         """
         Compute overall similarity scores for re-ranking stage
+        customer_features/shell_features may be passed in to skip re-normalizing per pair,
+        and website_similarity/name_similarity when already batch-scored
+        explain=False leaves 'explanations' as None (for candidates that are only ranked)
         Returns dict with individual signal scores and overall score
         """
+        customer_features = customer_features or self.customer_features(customer)
+        shell_features = shell_features or self.shell_features(shell)
+        
         # Compute individual signals
-        website_score, website_explanation = self.compute_website_match(
-            customer.get('Website', ''), 
-            shell.get('ZI_Website__c', '')
+        website_score, website_explanation = self.website_match_from_features(
+            customer_features['website'],
+            shell_features['website'],
+            website_similarity,
+            explain
         )
         
-        name_score, name_explanation = self.compute_name_match(
-            customer.get('Name', ''), 
-            shell.get('ZI_Company_Name__c', '')
+        name_score, name_explanation = self.name_match_from_features(
+            customer_features['name'],
+            shell_features['name'],
+            name_similarity,
+            explain
         )
         
         address_score, address_explanation = self.compute_address_consistency_score(
-            customer, shell
+            customer, shell,
+            customer_address=customer_features['address'],
+            shell_address=shell_features['address']
         )
         
-        # Data precedence: Website > Account Name for entity identity
-        # If website and name conflict, website wins
-        primary_score = 0.0
-        if customer.get('Website') and shell.get('ZI_Website__c'):
-            primary_score = website_score * 0.6  # Website gets higher weight when available
-            secondary_score = name_score * 0.3
-        elif customer.get('Name') and shell.get('ZI_Company_Name__c'):
-            # Fall back to name match if no website
-            primary_score = name_score * 0.6
-            secondary_score = 0.0
-        else:
-            # If both website and name null, use address signals
-            primary_score = address_score * 0.6 / 100  # Address score is 0-100, normalize to 0-1
-            secondary_score = 0.0
-        
-        # Address consistency always contributes
-        geo_score = address_score * 0.1 / 100  # Normalize and weight
-        
-        # Overall score combines all signals
-        overall_score = primary_score + secondary_score + geo_score
+        # Overall score combines all signals, weighted by which fields both sides have
+        overall_scorer = pick_overall_scorer(
+            bool(customer.get('Website') and shell.get('ZI_Website__c')),
+            bool(customer.get('Name') and shell.get('ZI_Company_Name__c'))
+        )
+        overall_score = overall_scorer(website_score, name_score, address_score)
         
         return {
             'website_match': website_score,
@@ -369,18 +718,41 @@ class FuzzyMatchingService:
                 'website': website_explanation,
                 'name': name_explanation,
                 'address': address_explanation
-            }
+            } if explain else None
         }
     
-    def rank_shell_candidates(self, customer: dict, candidates: List[dict]) -> List[Dict]:
+    def rank_shell_candidates(self, customer: dict, candidates: List[dict],
+                              shell_index: Optional[ShellIndex] = None, explain: bool = True) -> List[Dict]:
         """
         Re-rank candidates with richer similarity computation
+        Uses the shell_index's precomputed shell fields when provided
+        explain=False ranks without building per-candidate explanations
         Returns list of candidates ranked by overall similarity score
         """
         scored_candidates = []
+        customer_features = self.customer_features(customer)
+        shell_feature_map = shell_index.features if shell_index else {}
+        candidate_features = [shell_feature_map.get(id(shell)) or self.shell_features(shell) for shell in candidates]
+        
+        # Website and name similarities against all candidates in one scorer call each
+        website_similarities = batch_similarities(
+            customer_features['website']['normalized'],
+            [features['website']['normalized'] for features in candidate_features]
+        )
+        name_similarities = batch_similarities(
+            customer_features['name']['normalized'],
+            [features['name']['normalized'] for features in candidate_features]
+        )
         
-        for shell in candidates:
-            similarity_data = self.compute_overall_similarity(customer, shell)
+        for position, (shell, shell_features) in enumerate(zip(candidates, candidate_features)):
+            similarity_data = self.compute_overall_similarity(
+                customer, shell,
+                customer_features=customer_features,
+                shell_features=shell_features,
+                website_similarity=website_similarities[position] if website_similarities else None,
+                name_similarity=name_similarities[position] if name_similarities else None,
+                explain=explain
+            )
             
             candidate_result = {
                 'shell_account': shell,
@@ -394,11 +766,28 @@ class FuzzyMatchingService:
         
         return scored_candidates
     
-    def find_best_shell_match(self, customer: dict, shell_accounts: List[dict]) -> Dict:
+    def prepare_shell_index(self, shell_accounts: List[dict]) -> ShellIndex:
+        """
+        Build hash buckets and normalized website/name/address fields for all shells once,
+        so matching N customers doesn't redo the same shell work N times
+        """
+        return ShellIndex(
+            shell_accounts,
+            self.create_hash_buckets(shell_accounts),
+            {id(shell): self.shell_features(shell) for shell in shell_accounts}
+        )
+    
+    def find_best_shell_match(self, customer: dict, shell_accounts: Union[ShellIndex, List[dict]]) -> Dict:
         """
         Main method: Find the best shell match for a customer account using two-stage retrieval
+        A plain shell list is indexed on every call, so callers with more than one customer
+        should use find_best_shell_matches (or pass a ShellIndex from prepare_shell_index)
         Returns best match with scores and explanations
         """
+        shell_index = shell_accounts if isinstance(shell_accounts, ShellIndex) else None
+        if shell_index is not None:
+            shell_accounts = shell_index.shell_accounts
+        
         if not shell_accounts:
             return {
                 'success': False,
@@ -406,16 +795,22 @@ class FuzzyMatchingService:
                 'best_match': None
             }
         
+        if shell_index is None:
+            shell_index = self.prepare_shell_index(shell_accounts)
+        
         # STAGE 1: Fast filter by website/name hash buckets
-        hash_buckets = self.create_hash_buckets(shell_accounts)
-        candidates = self.fast_filter_candidates(customer, hash_buckets)
+        candidates = self.fast_filter_candidates(customer, shell_index.hash_buckets)
+        
+        # No exact hit: for large shell lists try q-gram blocking before scoring every shell
+        if not candidates and len(shell_accounts) > self.full_scan_limit:
+            candidates = self.qgram_filter_candidates(customer, shell_index.hash_buckets)
         
         # If fast filter found no candidates, fall back to all shells
         if not candidates:
             candidates = shell_accounts
         
-        # STAGE 2: Re-rank with richer similarity
-        ranked_candidates = self.rank_shell_candidates(customer, candidates)
+        # STAGE 2: Re-rank with richer similarity (only the reported best match is explained)
+        ranked_candidates = self.rank_shell_candidates(customer, candidates, shell_index, explain=False)
         
         if not ranked_candidates:
             return {
@@ -426,6 +821,10 @@ class FuzzyMatchingService:
         
         # Return best match
         best_candidate = ranked_candidates[0]
+        best_shell = best_candidate['shell_account']
+        best_candidate['scores'] = self.compute_overall_similarity(
+            customer, best_shell, shell_features=shell_index.features.get(id(best_shell))
+        )
         
         return {
             'success': True,
@@ -441,4 +840,45 @@ class FuzzyMatchingService:
             },
             'candidate_count': len(candidates),
             'total_shells': len(shell_accounts)
-        } 
\ No newline at end of file
+        } 
+    
+    def find_best_shell_matches(self, customers: List[dict], shell_accounts: Union[ShellIndex, List[dict]],
+                                max_workers: Optional[int] = None, parallel_threshold: int = 32) -> List[Dict]:
+        """
+        Find the best shell match for each customer account (the batch form of find_best_shell_match)
+        Shells are indexed once for the whole batch; pass a ShellIndex to reuse one across batches
+        Large batches are scored across a process pool since fuzzy scoring is CPU-bound
+        Returns list of match results in the same order as customers
+        """
+        shell_index = shell_accounts if isinstance(shell_accounts, ShellIndex) else None
+        if shell_index is not None:
+            shell_accounts = shell_index.shell_accounts
+        workers = max_workers or os.cpu_count() or 1
+        
+        # Small batches are not worth shipping the shells to the process pool
+        if len(customers) < parallel_threshold or workers <= 1:
+            if shell_index is None:
+                shell_index = self.prepare_shell_index(shell_accounts)
+            return [self.find_best_shell_match(customer, shell_index) for customer in customers]
+        
+        # One chunk per worker, so each worker receives and indexes the shells about once per batch
+        chunk_size = math.ceil(len(customers) / workers)
+        chunks = [customers[i:i + chunk_size] for i in range(0, len(customers), chunk_size)]
+        batch_id = next(_fuzzy_batch_ids)
+        pool = None
+        try:
+            pool = _get_fuzzy_pool(workers)
+            chunk_results = pool.map(
+                _score_customer_chunk,
+                itertools.repeat(batch_id), itertools.repeat(shell_accounts),
+                itertools.repeat(self.full_scan_limit), itertools.repeat(self.max_candidates),
+                chunks
+            )
+            return [result for chunk in chunk_results for result in chunk]
+        except Exception as e:
+            if pool is not None:
+                _discard_fuzzy_pool(pool)
+            logger.warning(f"⚠️ Parallel fuzzy matching failed ({str(e)}), falling back to sequential matching")
+            if shell_index is None:
+                shell_index = self.prepare_shell_index(shell_accounts)
+            return [self.find_best_shell_match(customer, shell_index) for customer in customers]
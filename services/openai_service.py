@@ -1,13 +1,45 @@
 import openai
 import json
-import time
+import logging
+import orjson
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+import contextlib
+import hashlib
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
 from config.config import Config
 
+try:
+    import uvloop  # libuv-backed event loop, faster socket I/O for concurrent OpenAI calls
+except ImportError:
+    uvloop = None
+
+try:
+    import tiktoken  # exact BPE token counts for TPM budgeting
+except ImportError:
+    tiktoken = None
+
+try:
+    # aiohttp transport for AsyncOpenAI (pip install "openai[aiohttp]"), lower per-request overhead than httpx
+    import httpx_aiohttp  # noqa: F401 - only checked for availability
+    aiohttp_transport_available = True
+except ImportError:
+    aiohttp_transport_available = False
+
+# Progress logs at INFO and per-call diagnostics at DEBUG (LOG_LEVEL=DEBUG to see them); the app
+# hands records to a background thread, so logging never blocks the assessment loop
+logger = logging.getLogger(__name__)
+
 # configure openAI access 
 openai.api_key = Config.OPENAI_API_KEY
-client = openai.OpenAI()  # creating client instance 
+# Explicit timeouts instead of the SDK's 10 minute default: fail fast on connect, bound slow completions
+OPENAI_TIMEOUT = openai.Timeout(Config.OPENAI_TIMEOUT, connect=5.0)
+# One thread-safe client shared by every sync call (the SDK pools up to 1000 connections and retries 429/5xx with backoff)
+client = openai.OpenAI(max_retries=Config.OPENAI_MAX_RETRIES, timeout=OPENAI_TIMEOUT)
 
 def get_system_prompt():
     """Get the exact system prompt from data_interpretation.md for dual-file matching validation"""
@@ -94,30 +126,96 @@ Assign higher scores for:
 Each explanation bullet should: 
 
 * Be concise (<= 25 words)   
-* Include an emoji cue:   
-  * ✅ strong alignment  
-  * ⚠️ partial match or uncertainty  
-  * ❌ mismatch or contradiction  
+* Include an icon cue (the number is rendered as the emoji shown):   
+  * 0 = ✅ strong alignment  
+  * 1 = ⚠️ partial match or uncertainty  
+  * 2 = ❌ mismatch or contradiction  
 * Summarize a signal that raised or lowered the confidence score   
 * You must explicitly state whether external world knowledge was used and what it confirms (e.g., Waymo is a known subsidiary of Alphabet)   
 * If world knowledge was not available, you must state this and explain that the decision is based solely on field-level confidence 
 
 Examples:   
-✅ Website carlosreyes.zumba.com shows direct affiliation with shell domain zumba.com  
-❌ Billing address differs significantly from shell and no match found in public directories  
-⚠️ Shell name and customer name share low similarity but share a ZoomInfo org
+{"icon": 0, "text": "Website carlosreyes.zumba.com shows direct affiliation with shell domain zumba.com"}  
+{"icon": 2, "text": "Billing address differs significantly from shell and no match found in public directories"}  
+{"icon": 1, "text": "Shell name and customer name share low similarity but share a ZoomInfo org"}
 
 ## 6 Output Format (Strict JSON) 
 
 {  
   "confidence_score": <int 0–100>,  
   "explanation_bullets": [  
-    "✅ explanation 1",  
-    "⚠️ explanation 2",  
-    "❌ explanation 3"  
+    {"icon": 0, "text": "explanation 1"},  
+    {"icon": 1, "text": "explanation 2"},  
+    {"icon": 2, "text": "explanation 3"}  
   ]  
 }"""
 
+# Built once and sent byte-identical as the first message of every call, so OpenAI's
+# automatic prompt caching (stable prefixes of 1024+ tokens) can reuse its prefill
+SYSTEM_PROMPT = get_system_prompt()
+PROMPT_CACHE_KEY = 'sfdc_account_matching_v2'  # routes these requests to the same prompt cache
+
+# Prompt tokens sent vs served from OpenAI's prompt cache, for batch logging
+_prompt_usage = {'prompt_tokens': 0, 'cached_tokens': 0}
+_prompt_usage_lock = threading.Lock()
+
+def _record_prompt_usage(completion):
+    """Tally a completion's prompt tokens and prompt-cache hits"""
+    usage = getattr(completion, 'usage', None)
+    if usage is None:
+        return
+    details = getattr(usage, 'prompt_tokens_details', None)
+    with _prompt_usage_lock:
+        _prompt_usage['prompt_tokens'] += usage.prompt_tokens or 0
+        _prompt_usage['cached_tokens'] += getattr(details, 'cached_tokens', 0) or 0
+
+# Borderline pairs go to ASSESSMENT_MODEL; clear-cut ones to Config.OPENAI_FAST_MODEL (empty disables routing)
+ASSESSMENT_MODEL = 'gpt-4o'
+FAST_MODEL_MIN_SCORE = 90  # every computed score above this is a clear match
+# Routing key for pairs local_assessment assesses without any model
+LOCAL_ASSESSMENT_ROUTE = 'computed_scores'
+# Clear mismatches (every score below Config.OPENAI_FAST_MODEL_LOW_SCORE) also take the fast model, but
+# when Config.AI_SKIP_LOW_SCORE is set, local_assessment takes those below it first - only the band between the two reaches it
+
+# Match pairs sent to each model, reported by get_openai_config
+_model_routing = {}
+_model_routing_lock = threading.Lock()
+
+if Config.OPENAI_FAST_MODEL and 0 < Config.OPENAI_FAST_MODEL_LOW_SCORE <= Config.AI_SKIP_LOW_SCORE:
+    logger.warning(
+        f"⚠️ OPENAI_FAST_MODEL_LOW_SCORE ({Config.OPENAI_FAST_MODEL_LOW_SCORE:g}) is not above AI_SKIP_LOW_SCORE "
+        f"({Config.AI_SKIP_LOW_SCORE:g}), so low-scoring pairs are never routed to the fast model"
+    )
+
+def choose_model(match_scores: dict) -> str:
+    """
+    Pick the model for one pair: the fast model when website, name and address scores all agree
+    Only sees pairs local_assessment did not take, so the low band starts at AI_SKIP_LOW_SCORE when that is set
+    """
+    if not Config.OPENAI_FAST_MODEL:
+        return ASSESSMENT_MODEL
+    scores = (
+        match_scores.get('website_match', 0),
+        match_scores.get('name_match', 0),
+        match_scores.get('address_consistency', 0)
+    )
+    if min(scores) > FAST_MODEL_MIN_SCORE or max(scores) < Config.OPENAI_FAST_MODEL_LOW_SCORE:
+        return Config.OPENAI_FAST_MODEL
+    return ASSESSMENT_MODEL
+
+def _record_model_routing(model: str, pairs: int = 1):
+    """Tally how many match pairs were assessed by a model"""
+    with _model_routing_lock:
+        _model_routing[model] = _model_routing.get(model, 0) + pairs
+
+# Address fields in prompt order (city, state, country, postal code)
+CUSTOMER_ADDRESS_FIELDS = ('BillingCity', 'BillingState', 'BillingCountry', 'BillingPostalCode')
+SHELL_ADDRESS_FIELDS = ('ZI_Company_City__c', 'ZI_Company_State__c', 'ZI_Company_Country__c', 'ZI_Company_Postal_Code__c')
+
+def _format_address(data: dict, fields: tuple):
+    """Comma-joined non-empty address parts, or None"""
+    return ', '.join([data[field] for field in fields if data.get(field)]) or None
+
 def format_match_data_for_openai(customer_data: dict, shell_data: dict, match_scores: dict) -> dict:
     """
     Format customer and shell data for OpenAI dual-file matching validation
@@ -128,39 +226,13 @@ def format_match_data_for_openai(customer_data: dict, shell_data: dict, match_sc
     Returns:
         Formatted data dict for OpenAI prompt
     """
-    # Helper function to format billing address
-    def format_customer_billing_address(data):
-        address_parts = []
-        if data.get('BillingCity'):
-            address_parts.append(data['BillingCity'])
-        if data.get('BillingState'):
-            address_parts.append(data['BillingState'])
-        if data.get('BillingCountry'):
-            address_parts.append(data['BillingCountry'])
-        if data.get('BillingPostalCode'):
-            address_parts.append(data['BillingPostalCode'])
-        return ', '.join(address_parts) if address_parts else None
-    
-    # Helper function to format shell ZI billing address
-    def format_shell_billing_address(data):
-        address_parts = []
-        if data.get('ZI_Company_City__c'):
-            address_parts.append(data['ZI_Company_City__c'])
-        if data.get('ZI_Company_State__c'):
-            address_parts.append(data['ZI_Company_State__c'])
-        if data.get('ZI_Company_Country__c'):
-            address_parts.append(data['ZI_Company_Country__c'])
-        if data.get('ZI_Company_Postal_Code__c'):
-            address_parts.append(data['ZI_Company_Postal_Code__c'])
-        return ', '.join(address_parts) if address_parts else None
-    
     formatted_data = {
         "Customer Name": customer_data.get('Name'),
         "Customer Website": customer_data.get('Website'),
-        "Customer Billing Address": format_customer_billing_address(customer_data),
+        "Customer Billing Address": _format_address(customer_data, CUSTOMER_ADDRESS_FIELDS),
         "Shell Name": shell_data.get('ZI_Company_Name__c'),
         "Shell Website": shell_data.get('ZI_Website__c'),
-        "Shell Billing Address": format_shell_billing_address(shell_data),
+        "Shell Billing Address": _format_address(shell_data, SHELL_ADDRESS_FIELDS),
         "Website_Match": {
             "score": match_scores.get('website_match', 0),
             "explanation": match_scores.get('explanations', {}).get('website', '')
@@ -177,6 +249,274 @@ def format_match_data_for_openai(customer_data: dict, shell_data: dict, match_sc
     
     return formatted_data
 
+# Part of every assessment cache key - bump when SYSTEM_PROMPT or the response format changes
+ASSESSMENT_CACHE_VERSION = 1
+
+class AssessmentCache:
+    """
+    TTL/LRU cache of successful AI assessments keyed by model and prompt content (thread-safe)
+    With a path, assessments are also kept in a SQLite file shared across workers and restarts
+    """
+    
+    def __init__(self, maxsize: int = 5000, ttl: float = 86400, path: str = ''):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()  # key -> (expires_at, assessment)
+        self._lock = threading.Lock()
+        self._db = None
+        if path and ttl > 0:
+            try:
+                self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+                self._db.execute('PRAGMA journal_mode=WAL')
+                self._db.execute(
+                    'CREATE TABLE IF NOT EXISTS assessments (key TEXT PRIMARY KEY, expires_at REAL, assessment TEXT)'
+                )
+                self._db.execute('DELETE FROM assessments WHERE expires_at <= ?', (time.time(),))
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ AI assessment disk cache unavailable ({str(e)}), using memory only")
+                self._db = None
+            # Files written before failures were kept out of the cache can still hold them
+            self.purge_errors()
+    
+    @staticmethod
+    def is_cacheable(assessment: dict) -> bool:
+        """Only real answers are cached - never failures or the "❌ Error" fallback of a failed call"""
+        if not assessment.get('success') or assessment.get('error'):
+            return False
+        return not any(
+            isinstance(bullet, str) and bullet.startswith("❌ Error")
+            for bullet in assessment.get('explanation_bullets', [])
+        )
+    
+    @staticmethod
+    def key_for(pair_data: dict) -> str:
+        """
+        Hash of ASSESSMENT_CACHE_VERSION, the model and the prompt sent to OpenAI - any change to
+        the accounts, scores or routed model is a miss, except letter case and whitespace in the prompt
+        """
+        user_prompt = _build_assessment_prompt(
+            pair_data['customer_account'],
+            pair_data['shell_account'],
+            pair_data['match_scores']
+        )
+        canonical_prompt = ' '.join(user_prompt.casefold().split())
+        key_source = f"v{ASSESSMENT_CACHE_VERSION}\n{choose_model(pair_data['match_scores'])}\n{canonical_prompt}"
+        return hashlib.blake2b(key_source.encode('utf-8'), digest_size=16).hexdigest()
+    
+    def get(self, key: str):
+        """Return a copy of the cached assessment, or None"""
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    return dict(entry[1])
+                del self._entries[key]
+            
+            assessment = self._disk_get(key)
+            if assessment is not None:
+                self._remember(key, assessment)
+            return assessment
+    
+    def put(self, key: str, assessment: dict):
+        """Store a successful assessment, evicting least recently used entries"""
+        if self.ttl <= 0 or not self.is_cacheable(assessment):
+            return
+        with self._lock:
+            self._remember(key, assessment)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        'INSERT OR REPLACE INTO assessments VALUES (?, ?, ?)',
+                        (key, time.time() + self.ttl, json.dumps(assessment))
+                    )
+                except sqlite3.Error as e:
+                    logger.warning(f"⚠️ Failed to persist AI assessment: {str(e)}")
+    
+    def purge_errors(self) -> int:
+        """Drop cached error assessments from memory and the SQLite file; returns how many were removed"""
+        removed = 0
+        with self._lock:
+            for key in [key for key, (_, assessment) in self._entries.items() if not self.is_cacheable(assessment)]:
+                del self._entries[key]
+                removed += 1
+            if self._db is not None:
+                try:
+                    rows = self._db.execute('SELECT key, assessment FROM assessments').fetchall()
+                    error_keys = [(key,) for key, assessment in rows if not self.is_cacheable(json.loads(assessment))]
+                    self._db.executemany('DELETE FROM assessments WHERE key = ?', error_keys)
+                    removed += len(error_keys)
+                except (sqlite3.Error, ValueError) as e:
+                    logger.warning(f"⚠️ Failed to purge AI assessment cache errors: {str(e)}")
+        if removed:
+            logger.info(f"🧹 Purged {removed} cached AI error assessments")
+        return removed
+    
+    def _remember(self, key: str, assessment: dict):
+        """Add to the in-memory LRU (caller holds the lock)"""
+        self._entries[key] = (time.monotonic() + self.ttl, dict(assessment))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    def _disk_get(self, key: str):
+        """Unexpired assessment from the SQLite file, or None (caller holds the lock)"""
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute(
+                'SELECT assessment FROM assessments WHERE key = ? AND expires_at > ?', (key, time.time())
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Failed to read AI assessment cache: {str(e)}")
+            return None
+        if not row:
+            return None
+        assessment = json.loads(row[0])
+        # Workers still running older code may have written an error fallback
+        return assessment if self.is_cacheable(assessment) else None
+
+class AsyncRateLimiter:
+    """Token bucket of requests (or prompt tokens) per minute shared by the tasks on one event loop"""
+    
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0  # tokens refilled per second
+        self.capacity = max(1.0, self.rate)  # at most one second's worth of burst
+        self.available = self.capacity
+        self._updated = time.monotonic()
+    
+    async def acquire(self, amount: float = 1.0):
+        """
+        Wait until amount tokens are available, then take them (no-op when unlimited)
+        Amounts above the burst capacity wait for a full bucket and leave it in debt
+        """
+        if self.rate <= 0:
+            return
+        needed = min(amount, self.capacity)
+        while True:
+            now = time.monotonic()
+            self.available = min(self.capacity, self.available + (now - self._updated) * self.rate)
+            self._updated = now
+            if self.available >= needed:
+                self.available -= amount
+                return
+            await asyncio.sleep((needed - self.available) / self.rate)
+
+# Reply tokens budgeted per assessment (3-5 short bullets plus the score); OpenAI counts replies against TPM too
+ASSESSMENT_REPLY_TOKENS = 200
+
+_token_encoding = None
+_token_encoding_loaded = False
+_token_encoding_lock = threading.Lock()
+
+def _get_token_encoding():
+    """
+    gpt-4o tiktoken encoding, loaded on first use - tiktoken downloads its BPE file the first time,
+    so a host without network access falls back to the character estimate instead of failing at import
+    """
+    global _token_encoding, _token_encoding_loaded
+    if not _token_encoding_loaded:
+        with _token_encoding_lock:
+            if not _token_encoding_loaded:
+                if tiktoken is not None:
+                    try:
+                        _token_encoding = tiktoken.encoding_for_model("gpt-4o")
+                    except Exception as e:
+                        logger.warning(f"⚠️ tiktoken encoding unavailable ({str(e)}), estimating ~4 characters per token")
+                _token_encoding_loaded = True
+    return _token_encoding
+
+def _count_tokens(text: str) -> int:
+    """gpt-4o token count with tiktoken, or ~4 characters per token for English/JSON without it"""
+    encoding = _get_token_encoding()
+    if encoding is not None:
+        try:
+            return len(encoding.encode(text))
+        except Exception:
+            pass
+    return len(text) // 4 + 1
+
+_system_prompt_tokens = None
+
+def _estimate_prompt_tokens(system_prompt: str, user_prompt: str, replies: int = 1) -> int:
+    """Token count charged to the TPM budget for one request: prompt plus the expected replies"""
+    global _system_prompt_tokens
+    if system_prompt is SYSTEM_PROMPT:
+        # The system prompt never changes, so tokenize it once
+        if _system_prompt_tokens is None:
+            _system_prompt_tokens = _count_tokens(SYSTEM_PROMPT)
+        system_tokens = _system_prompt_tokens
+    else:
+        system_tokens = _count_tokens(system_prompt)
+    return system_tokens + _count_tokens(user_prompt) + replies * ASSESSMENT_REPLY_TOKENS
+
+# Reruns over the same customer/shell pairs reuse earlier assessments instead of re-billing them
+assessment_cache = AssessmentCache(
+    Config.AI_ASSESSMENT_CACHE_SIZE, Config.AI_ASSESSMENT_CACHE_TTL, Config.AI_ASSESSMENT_CACHE_PATH
+)
+
+def _build_assessment_prompt(customer_data: dict, shell_data: dict, match_scores: dict) -> str:
+    """Build the user prompt for a single customer-to-shell assessment"""
+    # Format data according to system prompt specification
+    formatted_data = format_match_data_for_openai(customer_data, shell_data, match_scores)
+    
+    return f"Please assess this customer-to-shell account match recommendation:\n\n{orjson.dumps(formatted_data, option=orjson.OPT_INDENT_2).decode()}"
+
+def _parse_ai_assessment(response: str) -> dict:
+    """
+    Convert the JSON string returned by ask_openai into an assessment result dict
+    Error fallbacks from _openai_error_response come back with success False (and are never cached)
+    """
+    try:
+        ai_assessment = json.loads(response)
+        if ai_assessment.get('error'):
+            return {
+                'success': False,
+                'error': f"Error calling OpenAI: {ai_assessment['error']}",
+                'confidence_score': ai_assessment.get('confidence_score', 0),
+                'explanation_bullets': ai_assessment.get('explanation_bullets', []),
+                'raw_response': response
+            }
+        return {
+            'success': True,
+            'confidence_score': ai_assessment.get('confidence_score', 0),
+            'explanation_bullets': ai_assessment.get('explanation_bullets', []),
+            'raw_response': response
+        }
+    except json.JSONDecodeError as e:
+        return {
+            'success': False,
+            'error': f"Failed to parse AI response as JSON: {str(e)}",
+            'raw_response': response
+        }
+
+def local_assessment(match_scores: dict):
+    """
+    Assessment of an obviously-bad pair without calling OpenAI, or None when the model is needed
+    Only applies when website, name and address are all below AI_SKIP_LOW_SCORE (0, the default, disables it);
+    the confidence is the pair's computed match score
+    """
+    website = match_scores.get('website_match', 0)
+    name = match_scores.get('name_match', 0)
+    address = match_scores.get('address_consistency', 0)
+    
+    low = Config.AI_SKIP_LOW_SCORE
+    if low > 0 and max(website, name) < low and address < low:
+        _record_model_routing(LOCAL_ASSESSMENT_ROUTE)
+        return {
+            'success': True,
+            'confidence_score': round(match_scores.get('confidence_score', max(website, name, address))),
+            'explanation_bullets': [
+                f"Website, name and address scores are all below {low:g}",
+                "⚠️ AI assessment skipped (AI_SKIP_LOW_SCORE); confidence is the computed match score"
+            ],
+            'raw_response': None
+        }
+    
+    return None
+
 def get_ai_match_assessment(customer_data: dict, shell_data: dict, match_scores: dict) -> dict:
     """
     Get AI-powered confidence assessment for customer-to-shell match recommendation
@@ -187,34 +527,62 @@ def get_ai_match_assessment(customer_data: dict, shell_data: dict, match_scores:
     Returns:
         Dict with success status, confidence score, explanation bullets, and raw response
     """
+    # Clear-cut pairs don't need the model
+    local = local_assessment(match_scores)
+    if local is not None:
+        return local
+    
     try:
-        # Format data according to system prompt specification
-        formatted_data = format_match_data_for_openai(customer_data, shell_data, match_scores)
-        
         # Get system prompt
-        system_prompt = get_system_prompt()
+        system_prompt = SYSTEM_PROMPT
 
         # Create user prompt with formatted data
-        user_prompt = f"Please assess this customer-to-shell account match recommendation:\n\n{json.dumps(formatted_data, indent=2)}"
+        user_prompt = _build_assessment_prompt(customer_data, shell_data, match_scores)
         
-        # Call OpenAI
-        response = ask_openai(client, system_prompt, user_prompt)
+        # Call OpenAI (clear-cut pairs use the cheaper model)
+        model = choose_model(match_scores)
+        response = ask_openai(client, system_prompt, user_prompt, model)
         
-        # Parse JSON response
-        try:
-            ai_assessment = json.loads(response)
-            return {
-                'success': True,
-                'confidence_score': ai_assessment.get('confidence_score', 0),
-                'explanation_bullets': ai_assessment.get('explanation_bullets', []),
-                'raw_response': response
-            }
-        except json.JSONDecodeError as e:
-            return {
-                'success': False,
-                'error': f"Failed to parse AI response as JSON: {str(e)}",
-                'raw_response': response
-            }
+        # Parse JSON response (failed calls are left out of the routing stats)
+        result = _parse_ai_assessment(response)
+        if result['success']:
+            _record_model_routing(model)
+        return result
+            
+    except Exception as e:
+        return {
+            'success': False,
+            'error': f"Error calling OpenAI: {str(e)}"
+        }
+
+async def get_ai_match_assessment_async(async_client, customer_data: dict, shell_data: dict, match_scores: dict,
+                                        token_limiter: AsyncRateLimiter = None) -> dict:
+    """
+    Async variant of get_ai_match_assessment for concurrent batch processing
+    Args:
+        async_client: openai.AsyncOpenAI instance shared by the batch
+        customer_data: Customer account data from Salesforce
+        shell_data: Best matched shell account data from Salesforce
+        match_scores: Computed matching scores from FuzzyMatchingService
+        token_limiter: Optional tokens-per-minute budget charged with the estimated prompt and reply tokens
+    Returns:
+        Dict with success status, confidence score, explanation bullets, and raw response
+    """
+    try:
+        system_prompt = SYSTEM_PROMPT
+        user_prompt = _build_assessment_prompt(customer_data, shell_data, match_scores)
+        
+        if token_limiter is not None:
+            await token_limiter.acquire(_estimate_prompt_tokens(system_prompt, user_prompt))
+        
+        model = choose_model(match_scores)
+        response = await ask_openai_async(async_client, system_prompt, user_prompt, model)
+        
+        # Failed calls are left out of the routing stats (a split group's retry lands here)
+        result = _parse_ai_assessment(response)
+        if result['success']:
+            _record_model_routing(model)
+        return result
             
     except Exception as e:
         return {
@@ -222,59 +590,254 @@ def get_ai_match_assessment(customer_data: dict, shell_data: dict, match_scores:
             'error': f"Error calling OpenAI: {str(e)}"
         }
 
-def get_ai_match_assessments_batch(match_pairs: list, batch_size: int = 10, delay_between_calls: float = 1.0) -> list:
+def _build_grouped_assessment_prompt(match_pairs: list) -> str:
+    """Build one user prompt asking for an array of assessments, one per pair in order"""
+    formatted_pairs = [
+        format_match_data_for_openai(pair['customer_account'], pair['shell_account'], pair['match_scores'])
+        for pair in match_pairs
+    ]
+    return (
+        f"Please assess each of these {len(formatted_pairs)} customer-to-shell account match recommendations independently. "
+        f"Return ONLY a JSON object whose \"assessments\" array holds {len(formatted_pairs)} assessment objects, in the same order, "
+        f"each in the response format specified above:\n\n{orjson.dumps(formatted_pairs, option=orjson.OPT_INDENT_2).decode()}"
+    )
+
+async def get_ai_match_assessments_grouped_async(async_client, match_pairs: list, token_limiter: AsyncRateLimiter = None) -> list:
     """
-    Process multiple AI assessments with rate limiting and batch processing
+    Assess several pairs with one chat completion, sharing the system prompt and round trip
     Args:
+        async_client: openai.AsyncOpenAI instance shared by the batch
         match_pairs: List of dicts with 'customer_account', 'shell_account', and 'match_scores'
-        batch_size: Number of concurrent requests (default 10 to respect rate limits)
-        delay_between_calls: Delay in seconds between API calls (default 1.0)
+        token_limiter: Optional tokens-per-minute budget charged with the estimated prompt and reply tokens
+    Returns:
+        List of AI assessment results in same order as match_pairs
+    Raises on API errors or when the reply does not hold one assessment per pair
+    """
+    system_prompt = SYSTEM_PROMPT
+    user_prompt = _build_grouped_assessment_prompt(match_pairs)
+    
+    if token_limiter is not None:
+        await token_limiter.acquire(_estimate_prompt_tokens(system_prompt, user_prompt, len(match_pairs)))
+    
+    # One completion serves the whole group, so it only downshifts when every pair is clear-cut
+    models = {choose_model(pair['match_scores']) for pair in match_pairs}
+    model = models.pop() if len(models) == 1 else ASSESSMENT_MODEL
+    
+    responses = await ask_openai_grouped_async(async_client, system_prompt, user_prompt, len(match_pairs), model)
+    # Recorded only once the group succeeds, so pairs of a failed group are counted by the halves that retry them
+    _record_model_routing(model, len(match_pairs))
+    return [_parse_ai_assessment(response) for response in responses]
+
+def _new_async_client():
+    """AsyncOpenAI client with the module's retry/timeout settings (aiohttp transport when installed)"""
+    http_client = openai.DefaultAioHttpClient() if aiohttp_transport_available else None
+    return openai.AsyncOpenAI(max_retries=Config.OPENAI_MAX_RETRIES, timeout=OPENAI_TIMEOUT, http_client=http_client)
+
+async def get_ai_match_assessments_async(match_pairs: list, concurrency: int = 10, requests_per_minute: float = 0,
+                                         on_result=None, tokens_per_minute: float = 0, pairs_per_request: int = 1,
+                                         async_client=None) -> list:
+    """
+    Run AI assessments concurrently on one event loop instead of blocking worker threads
+    Rate-limited (429) and 5xx responses are retried by the SDK with exponential backoff
+    Args:
+        match_pairs: List of dicts with 'customer_account', 'shell_account', and 'match_scores'
+        concurrency: Maximum number of in-flight OpenAI requests
+        requests_per_minute: Request rate shared by all in-flight slots (0 for no limit)
+        on_result: Optional callback(index, result) invoked as each assessment completes
+        tokens_per_minute: Estimated prompt and reply tokens per minute across all slots (0 for no limit)
+        pairs_per_request: Pairs assessed by each chat completion (groups that fail are split in half)
+        async_client: Long-lived openai.AsyncOpenAI to reuse (default: a client scoped to this batch)
     Returns:
         List of AI assessment results in same order as input
     """
-    def process_single_assessment(pair_data):
-        """Process a single assessment with error handling"""
-        try:
-            customer = pair_data['customer_account']
-            shell = pair_data['shell_account'] 
-            scores = pair_data['match_scores']
-            
-            # Add small delay to respect rate limits
-            time.sleep(delay_between_calls)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    rate_limiter = AsyncRateLimiter(requests_per_minute)
+    token_limiter = AsyncRateLimiter(tokens_per_minute)
+    
+    client_context = _new_async_client() if async_client is None else contextlib.nullcontext(async_client)
+    async with client_context as async_client:
+        async def process_single_assessment(pair_data):
+            """Process a single assessment with error handling"""
+            try:
+                # Respect the account's request rate without idling the slot between calls
+                await rate_limiter.acquire()
+                
+                return await get_ai_match_assessment_async(
+                    async_client,
+                    pair_data['customer_account'],
+                    pair_data['shell_account'],
+                    pair_data['match_scores'],
+                    token_limiter
+                )
+            except Exception as e:
+                return {
+                    'success': False,
+                    'error': f"Batch processing error: {str(e)}"
+                }
+        
+        async def process_pair_group(pair_group):
+            """Assess a group of pairs in one request; a failed or malformed reply is split in half"""
+            if len(pair_group) == 1:
+                return [await process_single_assessment(pair_group[0])]
+            try:
+                await rate_limiter.acquire()
+                return await get_ai_match_assessments_grouped_async(async_client, pair_group, token_limiter)
+            except Exception as e:
+                logger.warning(f"⚠️ Grouped AI assessment of {len(pair_group)} pairs failed ({str(e)}), splitting the group")
+                half = len(pair_group) // 2
+                return await process_pair_group(pair_group[:half]) + await process_pair_group(pair_group[half:])
+        
+        group_size = max(1, pairs_per_request)
+        
+        async def process_slot(start):
+            """Assess match_pairs[start:start + group_size] in one request slot"""
+            async with semaphore:
+                results = await process_pair_group(match_pairs[start:start + group_size])
             
-            return get_ai_match_assessment(customer, shell, scores)
-        except Exception as e:
-            return {
-                'success': False,
-                'error': f"Batch processing error: {str(e)}"
-            }
+            if on_result:
+                for offset, result in enumerate(results):
+                    on_result(start + offset, result)
+            return results
+        
+        # gather preserves input order, so results line up with match_pairs
+        slot_results = await asyncio.gather(*(process_slot(start) for start in range(0, len(match_pairs), group_size)))
+        return [result for results in slot_results for result in results]
+
+# One event loop thread and AsyncOpenAI client per process, reused by every batch so keep-alive
+# connections (and their TCP/TLS handshakes) survive from one request to the next
+_background_loop = None
+_background_loop_pid = None
+_background_loop_lock = threading.Lock()
+_shared_async_client = None
+
+def _get_background_loop():
+    """Event loop (uvloop when installed) running on a daemon thread, started once per process"""
+    global _background_loop, _background_loop_pid, _shared_async_client
+    with _background_loop_lock:
+        # Forked workers don't inherit the parent's loop thread, so each process starts its own
+        if _background_loop is None or _background_loop_pid != os.getpid():
+            loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name='openai-event-loop', daemon=True).start()
+            _background_loop, _background_loop_pid = loop, os.getpid()
+            _shared_async_client = None
+        return _background_loop
+
+async def _assess_with_shared_client(match_pairs: list, *args, **kwargs) -> list:
+    """get_ai_match_assessments_async on the background loop's long-lived client"""
+    global _shared_async_client
+    if _shared_async_client is None:
+        _shared_async_client = _new_async_client()
+    return await get_ai_match_assessments_async(match_pairs, *args, async_client=_shared_async_client, **kwargs)
+
+def iter_ai_match_assessments(match_pairs: list, batch_size: int = 10, requests_per_minute: float = 500,
+                              tokens_per_minute: float = 0, pairs_per_request: int = 1):
+    """
+    Yield AI assessments as they complete, for streaming responses
+    Cached assessments are yielded first; the rest run on a background event loop,
+    with pairs that would send an identical prompt assessed once and fanned back out
+    Args:
+        match_pairs: List of dicts with 'customer_account', 'shell_account', and 'match_scores'
+        batch_size: Number of concurrent requests (default 10 to respect rate limits)
+        requests_per_minute: OpenAI request rate across all concurrent requests (0 for no limit)
+        tokens_per_minute: Estimated prompt and reply tokens per minute across all concurrent requests (0 for no limit)
+        pairs_per_request: Pairs assessed by each chat completion (default 1)
+    Yields:
+        Tuples of (index into match_pairs, AI assessment result) in completion order
+    """
+    if not match_pairs:
+        return
     
-    # Process in batches to manage memory and rate limits
-    all_results = []
-    total_batches = (len(match_pairs) + batch_size - 1) // batch_size
+    # Settle clear-cut pairs locally and serve previously assessed pairs from cache;
+    # only the rest go to OpenAI, once per distinct prompt
+    miss_indices_by_key = {}
+    local_count = 0
+    cached_count = 0
+    for i, pair in enumerate(match_pairs):
+        local = local_assessment(pair['match_scores'])
+        if local is not None:
+            local_count += 1
+            yield i, local
+            continue
+        
+        key = AssessmentCache.key_for(pair)
+        cached = assessment_cache.get(key)
+        if cached is None:
+            miss_indices_by_key.setdefault(key, []).append(i)
+        else:
+            cached_count += 1
+            yield i, cached
     
-    print(f"🤖 Processing {len(match_pairs)} AI assessments in {total_batches} batches...")
+    miss_keys = list(miss_indices_by_key)
+    duplicate_count = len(match_pairs) - local_count - cached_count - len(miss_keys)
+    duplicate_note = f", {duplicate_count} duplicate" if duplicate_count else ""
+    local_note = f", {local_count} skipped by AI_SKIP_LOW_SCORE" if local_count else ""
+    logger.info(f"🤖 Processing {len(miss_keys)} AI assessments with up to {batch_size} concurrent requests ({cached_count} cached{duplicate_note}{local_note})...")
     
-    for batch_num in range(total_batches):
-        start_idx = batch_num * batch_size
-        end_idx = min(start_idx + batch_size, len(match_pairs))
-        batch_pairs = match_pairs[start_idx:end_idx]
+    if miss_keys:
+        completed = queue.Queue()
+        with _prompt_usage_lock:
+            usage_before = dict(_prompt_usage)
         
-        # Use ThreadPoolExecutor for controlled concurrency
-        with ThreadPoolExecutor(max_workers=min(batch_size, len(batch_pairs))) as executor:
-            batch_results = list(executor.map(process_single_assessment, batch_pairs))
+        def report_failure(future):
+            # Fail whatever has not completed yet rather than leaving the consumer waiting
+            if future.cancelled():
+                completed.put(RuntimeError("AI assessment batch was cancelled"))
+            elif future.exception() is not None:
+                completed.put(future.exception())
         
-        all_results.extend(batch_results)
+        # The event loop runs on its own thread so this generator can hand back each result as it lands
+        future = asyncio.run_coroutine_threadsafe(_assess_with_shared_client(
+            [match_pairs[miss_indices_by_key[key][0]] for key in miss_keys],
+            batch_size,
+            requests_per_minute,
+            on_result=lambda miss_index, result: completed.put((miss_index, result)),
+            tokens_per_minute=tokens_per_minute,
+            pairs_per_request=pairs_per_request
+        ), _get_background_loop())
+        future.add_done_callback(report_failure)
         
-        # Log progress for large datasets
-        if total_batches > 1:
-            print(f"✅ Processed AI batch {batch_num + 1}/{total_batches} ({len(batch_pairs)} assessments)")
-        
-        # Add delay between batches for rate limiting
-        if batch_num < total_batches - 1:  # Don't delay after last batch
-            time.sleep(delay_between_calls * 2)  # Longer delay between batches
+        pending = set(range(len(miss_keys)))
+        while pending:
+            item = completed.get()
+            if isinstance(item, Exception):
+                for i in sorted(i for miss_index in pending for i in miss_indices_by_key[miss_keys[miss_index]]):
+                    yield i, {'success': False, 'error': f"Batch processing error: {str(item)}"}
+                break
+            
+            miss_index, result = item
+            pending.discard(miss_index)
+            key = miss_keys[miss_index]
+            assessment_cache.put(key, result)
+            # Duplicates get their own copy so callers can't mutate each other's result
+            for position, i in enumerate(miss_indices_by_key[key]):
+                yield i, result if position == 0 else dict(result)
     
-    return all_results
+        with _prompt_usage_lock:
+            prompt_tokens = _prompt_usage['prompt_tokens'] - usage_before['prompt_tokens']
+            cached_tokens = _prompt_usage['cached_tokens'] - usage_before['cached_tokens']
+        if prompt_tokens:
+            logger.info(f"🧠 OpenAI prompt cache served {cached_tokens}/{prompt_tokens} prompt tokens ({cached_tokens / prompt_tokens:.0%})")
+    
+    logger.info(f"✅ Completed {len(match_pairs)} AI assessments")
+
+def get_ai_match_assessments_batch(match_pairs: list, batch_size: int = 10, requests_per_minute: float = 500,
+                                   tokens_per_minute: float = 0, pairs_per_request: int = 1) -> list:
+    """
+    Process multiple AI assessments concurrently with rate limiting
+    Args:
+        match_pairs: List of dicts with 'customer_account', 'shell_account', and 'match_scores'
+        batch_size: Number of concurrent requests (default 10 to respect rate limits)
+        requests_per_minute: OpenAI request rate across all concurrent requests (0 for no limit)
+        tokens_per_minute: Estimated prompt and reply tokens per minute across all concurrent requests (0 for no limit)
+        pairs_per_request: Pairs assessed by each chat completion (default 1)
+    Returns:
+        List of AI assessment results in same order as input
+    """
+    results = [None] * len(match_pairs)
+    for i, result in iter_ai_match_assessments(match_pairs, batch_size, requests_per_minute, tokens_per_minute, pairs_per_request):
+        results[i] = result
+    
+    return results
 
 def test_openai_connection():
     """Test OpenAI connection by listing available models"""
@@ -307,85 +870,234 @@ def test_openai_completion(prompt="Hello! Please respond with 'OpenAI connection
     except Exception as e:
         return None, f"OpenAI completion test failed: {str(e)}"
 
-def ask_openai(openai_client, system_prompt, user_prompt):
+_json_decoder = json.JSONDecoder()
+
+def _first_json_object(text):
     """
-    Calls OpenAI with proper error handling and response validation
+    Decode the first complete JSON object in text, ignoring anything around it (e.g. code fences)
+    One linear pass that stops at the object's closing brace; raises ValueError if there is none
+    """
+    start = text.find('{')
+    if start < 0:
+        raise ValueError("No JSON object found in response")
+    try:
+        return _json_decoder.raw_decode(text, start)[0]
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON in response: {str(e)}")
+
+def _validate_openai_response(response):
+    """
+    Validate raw completion text and normalize it to a JSON string
     Returns a valid JSON string or raises an exception with a clear error message
     """
+    # Debug logging
+    logger.debug("OpenAI Raw Response: %s", response)
+    
+    # Validate that we got a response
+    if not response or not response.strip():
+        raise ValueError("Empty response from OpenAI")
+        
+    # Structured Outputs constrain the reply to ASSESSMENT_SCHEMA; the slice fallback only guards against stray text
     try:
-        completion = openai_client.chat.completions.create(
-            model="gpt-4o",
-            temperature=0,
-            messages=[
-                {
-                    "role": "system",
-                    "content": system_prompt
+        parsed = json.loads(response)
+    except json.JSONDecodeError as e:
+        logger.debug("JSON Parse Error: %s", e)
+        parsed = _first_json_object(response)
+    
+    # Validate required fields and return the valid JSON string
+    return orjson.dumps(_validate_assessment_fields(parsed), option=orjson.OPT_INDENT_2).decode()
+
+# Emoji for each bullet icon id in ASSESSMENT_SCHEMA (the model emits the id, saving output tokens)
+_ICONS = ["✅", "⚠️", "❌"]
+
+def _render_bullet(bullet):
+    """Turn an {"icon": id, "text": ...} bullet into the "<emoji> text" string shown to users"""
+    if not isinstance(bullet, dict):
+        return bullet
+    icon = bullet.get('icon')
+    emoji = _ICONS[icon] if isinstance(icon, int) and 0 <= icon < len(_ICONS) else _ICONS[1]
+    return f"{emoji} {bullet.get('text', '')}"
+
+def _validate_assessment_fields(parsed):
+    """Check one parsed assessment has the required fields and render its bullets; returns it or raises ValueError"""
+    if not isinstance(parsed, dict):
+        raise ValueError("Assessment must be a JSON object")
+    if 'confidence_score' not in parsed:
+        raise ValueError("Missing required field: confidence_score")
+    if 'explanation_bullets' not in parsed:
+        raise ValueError("Missing required field: explanation_bullets")
+    if not isinstance(parsed['explanation_bullets'], list):
+        raise ValueError("explanation_bullets must be a list")
+    parsed['explanation_bullets'] = [_render_bullet(bullet) for bullet in parsed['explanation_bullets']]
+    return parsed
+
+def _validate_openai_grouped_response(response, count):
+    """
+    Validate a grouped completion and split it into one JSON string per assessment
+    Returns a list of count valid JSON strings or raises ValueError
+    """
+    if not response or not response.strip():
+        raise ValueError("Empty response from OpenAI")
+    
+    try:
+        parsed = json.loads(response)
+    except json.JSONDecodeError:
+        parsed = _first_json_object(response)
+    
+    # Structured Outputs require an object at the top level, so the array arrives as {"assessments": [...]}
+    if isinstance(parsed, dict):
+        parsed = parsed.get('assessments')
+    if not isinstance(parsed, list) or len(parsed) != count:
+        raise ValueError(f"Expected an assessments array of {count} items")
+    
+    return [orjson.dumps(_validate_assessment_fields(item), option=orjson.OPT_INDENT_2).decode() for item in parsed]
+
+def _openai_error_response(e):
+    """Build the fallback JSON string returned when an OpenAI call fails"""
+    error_msg = str(e)
+    logger.warning(f"OpenAI Error: {error_msg}")
+    # Return a valid JSON string with error information; the "error" key marks it as a failure, not an answer
+    return json.dumps({
+        "error": error_msg,
+        "confidence_score": 0,
+        "explanation_bullets": [
+            f"❌ Error: {error_msg}",
+            "⚠️ Using computed scores only due to AI service error",
+            "✅ Basic relationship checks still performed"
+        ]
+    }, indent=2)
+
+# Structured Outputs schema for one assessment; strict mode guarantees the reply parses and validates
+ASSESSMENT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "confidence_score": {"type": "integer", "minimum": 0, "maximum": 100},
+        "explanation_bullets": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "icon": {"type": "integer", "enum": [0, 1, 2]},
+                    "text": {"type": "string"}
                 },
-                {
-                    "role": "user",
-                    "content": user_prompt
-                }
-            ]
-        )
-        
-        response = completion.choices[0].message.content
-        
-        # Debug logging
-        print(f"OpenAI Raw Response: {response}")
-        
-        # Validate that we got a response
-        if not response or not response.strip():
-            raise ValueError("Empty response from OpenAI")
-            
-        # Try to extract JSON from response (in case there's extra text)
-        import json
-        import re
+                "required": ["icon", "text"],
+                "additionalProperties": False
+            },
+            "minItems": 3,
+            "maxItems": 5
+        }
+    },
+    "required": ["confidence_score", "explanation_bullets"],
+    "additionalProperties": False
+}
+
+ASSESSMENT_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "assessment", "strict": True, "schema": ASSESSMENT_SCHEMA}
+}
+
+def _grouped_response_format(count):
+    """Structured Outputs format for a grouped reply: an object holding exactly count assessments"""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "assessments",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "assessments": {"type": "array", "items": ASSESSMENT_SCHEMA, "minItems": count, "maxItems": count}
+                },
+                "required": ["assessments"],
+                "additionalProperties": False
+            }
+        }
+    }
+
+def _chat_completion_kwargs(system_prompt, user_prompt, response_format=ASSESSMENT_RESPONSE_FORMAT, model=ASSESSMENT_MODEL):
+    """Request parameters shared by every assessment call (prompt_cache_key via extra_body works on any SDK version)"""
+    return {
+        "model": model,
+        "temperature": 0,
+        "messages": _build_chat_messages(system_prompt, user_prompt),
+        "response_format": response_format,
+        "extra_body": {"prompt_cache_key": PROMPT_CACHE_KEY}
+    }
+
+def _build_chat_messages(system_prompt, user_prompt):
+    """Build the chat messages payload shared by sync and async calls"""
+    return [
+        {
+            "role": "system",
+            "content": system_prompt
+        },
+        {
+            "role": "user",
+            "content": user_prompt
+        }
+    ]
+
+def ask_openai(openai_client, system_prompt, user_prompt, model=ASSESSMENT_MODEL):
+    """
+    Calls OpenAI with proper error handling and response validation
+    Returns a valid JSON string or raises an exception with a clear error message
+    """
+    try:
+        completion = openai_client.chat.completions.create(**_chat_completion_kwargs(system_prompt, user_prompt, model=model))
+        _record_prompt_usage(completion)
         
-        try:
-            # First try to parse the entire response as JSON
-            parsed = json.loads(response)
-        except json.JSONDecodeError:
-            # If that fails, try to extract JSON object from the response
-            json_match = re.search(r'\{[\s\S]*\}', response)
-            if json_match:
-                try:
-                    parsed = json.loads(json_match.group(0))
-                except json.JSONDecodeError as e:
-                    print(f"JSON Parse Error (extracted): {str(e)}")
-                    print(f"Extracted JSON: {json_match.group(0)}")
-                    raise ValueError(f"Invalid JSON in extracted response: {str(e)}")
-            else:
-                print("No JSON object found in response")
-                raise ValueError("No valid JSON found in response")
+        return _validate_openai_response(completion.choices[0].message.content)
         
-        # Validate required fields
-        if 'confidence_score' not in parsed:
-            raise ValueError("Missing required field: confidence_score")
-        if 'explanation_bullets' not in parsed:
-            raise ValueError("Missing required field: explanation_bullets")
-        if not isinstance(parsed['explanation_bullets'], list):
-            raise ValueError("explanation_bullets must be a list")
+    except Exception as e:
+        return _openai_error_response(e)
+
+async def ask_openai_async(async_client, system_prompt, user_prompt, model=ASSESSMENT_MODEL):
+    """
+    Async variant of ask_openai using an openai.AsyncOpenAI client
+    Returns a valid JSON string (error details are embedded on failure)
+    """
+    try:
+        completion = await async_client.chat.completions.create(**_chat_completion_kwargs(system_prompt, user_prompt, model=model))
+        _record_prompt_usage(completion)
         
-        # Return the valid JSON string
-        return json.dumps(parsed, indent=2)
+        return _validate_openai_response(completion.choices[0].message.content)
         
     except Exception as e:
-        error_msg = str(e)
-        print(f"OpenAI Error: {error_msg}")
-        # Return a valid JSON string with error information
-        return json.dumps({
-            "confidence_score": 0,
-            "explanation_bullets": [
-                f"❌ Error: {error_msg}",
-                "⚠️ Using computed scores only due to AI service error",
-                "✅ Basic relationship checks still performed"
-            ]
-        }, indent=2)
+        return _openai_error_response(e)
+
+async def ask_openai_grouped_async(async_client, system_prompt, user_prompt, count, model=ASSESSMENT_MODEL):
+    """
+    ask_openai_async for a grouped prompt of count pairs
+    Returns count valid JSON strings; unlike ask_openai_async, errors are raised so the caller can split the group
+    """
+    completion = await async_client.chat.completions.create(
+        **_chat_completion_kwargs(system_prompt, user_prompt, _grouped_response_format(count), model)
+    )
+    _record_prompt_usage(completion)
+    
+    return _validate_openai_grouped_response(completion.choices[0].message.content, count)
 
 def get_openai_config():
     """Get OpenAI configuration information"""
+    with _model_routing_lock:
+        model_routing = dict(_model_routing)
     return {
         "model": Config.OPENAI_MODEL,
         "max_tokens": Config.OPENAI_MAX_TOKENS,
-        "api_key_configured": bool(Config.OPENAI_API_KEY)
+        "api_key_configured": bool(Config.OPENAI_API_KEY),
+        "assessment_model": ASSESSMENT_MODEL,
+        "fast_model": Config.OPENAI_FAST_MODEL or None,
+        # Score bands each route covers, checked in this order
+        "routing_rules": {
+            LOCAL_ASSESSMENT_ROUTE: (
+                f"website, name and address all below {Config.AI_SKIP_LOW_SCORE:g}"
+                if Config.AI_SKIP_LOW_SCORE > 0 else None
+            ),
+            "fast_model": (
+                f"all scores above {FAST_MODEL_MIN_SCORE}, or all below {Config.OPENAI_FAST_MODEL_LOW_SCORE:g}"
+                if Config.OPENAI_FAST_MODEL else None
+            ),
+            "assessment_model": "everything else"
+        },
+        "model_routing": model_routing  # match pairs per model (or skipped by AI_SKIP_LOW_SCORE) since startup
     }
\ No newline at end of file
@@ -1,92 +1,401 @@
 from simple_salesforce.api import Salesforce
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import requests
 from config.config import Config
 from services.fuzzy_matching_service import FuzzyMatchingService
 from services.bad_domain_service import BadDomainService
-from services.openai_service import ask_openai, client, get_system_prompt
 from typing import Optional, Dict, Any
-import json
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import threading
+import csv
+import io
+import orjson
+import re
+import sqlite3
 import time
 
+# Account IDs: "001" key prefix, 15 case-sensitive chars with an optional 3-char checksum suffix
+SALESFORCE_ACCOUNT_ID_RE = re.compile(r'001[a-zA-Z0-9]{12}(?:[a-zA-Z0-9]{3})?')
+
+# simple-salesforce sends SOQL as a GET query string; ~28 URL-encoded chars per quoted ID
+# keeps 400 IDs comfortably under Salesforce's 16,384-char request URI limit
+MAX_IDS_PER_QUERY = 400
+
+# Bulk API 2.0 jobs POST their SOQL (no URI limit) but cap it at 100,000 chars; ~22 chars per quoted ID
+MAX_IDS_PER_BULK_JOB = 4000
+
+# SQLite bound-parameter limit is 999 on older builds; disk cache lookups stay under it
+MAX_IDS_PER_DISK_LOOKUP = 500
+
+# Account fields fetched for matching; records are rebuilt with exactly these keys (no 'attributes' metadata)
+CUSTOMER_ACCOUNT_FIELDS = ('Id', 'Name', 'Website', 'BillingCity', 'BillingState', 'BillingCountry', 'BillingPostalCode')
+SHELL_ACCOUNT_FIELDS = (
+    'Id', 'ZI_Id__c', 'ZI_Company_Name__c', 'ZI_Website__c',
+    'ZI_Company_City__c', 'ZI_Company_State__c', 'ZI_Company_Country__c', 'ZI_Company_Postal_Code__c'
+)
+
+# 15 -> 18 char ID checksum: each 5-char chunk's uppercase positions form a 5-bit index into _ID_SUFFIX_CHARS
+_ID_SUFFIX_CHARS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ012345"
+_UPPER_MASK = bytes(1 if 65 <= i <= 90 else 0 for i in range(256))  # 1 for ASCII A-Z
+# Suffix character for every 5-byte uppercase mask (b'\x00\x01\x00\x00\x00' -> 'C'), for bulk conversion
+_CHUNK_SUFFIX = {
+    bytes((value >> bit) & 1 for bit in range(5)): _ID_SUFFIX_CHARS[value]
+    for value in range(32)
+}
+
+
+@lru_cache(maxsize=1 << 16)
+def _convert_id_15_to_18(id_15: str) -> str:
+    """
+    18-character form of a 15-character ID (memoized: the same IDs recur across uploads,
+    validation, fetches and refine runs)
+    """
+    # Salesforce ID conversion algorithm, unrolled over a byte lookup table
+    # (non-ASCII characters can't appear in real IDs and count as lowercase)
+    b = id_15.encode('ascii', 'replace')
+    m = _UPPER_MASK
+    return (
+        id_15
+        + _ID_SUFFIX_CHARS[m[b[0]] | m[b[1]] << 1 | m[b[2]] << 2 | m[b[3]] << 3 | m[b[4]] << 4]
+        + _ID_SUFFIX_CHARS[m[b[5]] | m[b[6]] << 1 | m[b[7]] << 2 | m[b[8]] << 3 | m[b[9]] << 4]
+        + _ID_SUFFIX_CHARS[m[b[10]] | m[b[11]] << 1 | m[b[12]] << 2 | m[b[13]] << 3 | m[b[14]] << 4]
+    )
+
+
+@lru_cache(maxsize=1 << 16)
+def _is_account_id_format(account_id: str) -> bool:
+    """Memoized SALESFORCE_ACCOUNT_ID_RE check on a stripped ID"""
+    return SALESFORCE_ACCOUNT_ID_RE.fullmatch(account_id) is not None
+
+
+def _soql_id_list(account_ids: list) -> str:
+    """
+    Quoted SOQL IN list, e.g. ('001...', '001...'), built with a single join
+    Only pass IDs that passed _is_account_id_format - they can't contain quotes or other SOQL syntax
+    """
+    return "('" + "', '".join(account_ids) + "')"
+
+
+class OrjsonSalesforce(Salesforce):
+    """Salesforce client that decodes REST query pages with orjson instead of requests' stdlib json"""
+    
+    def parse_result_to_json(self, result: requests.Response) -> Any:
+        # Records are only read with .get(), so plain dicts stand in for the default OrderedDict hook
+        return orjson.loads(result.content)
+
+
+class AccountRecordCache:
+    """Per-ID TTL/LRU cache of Salesforce account records (thread-safe)
+    IDs stored with put_missing are remembered as not existing and looked up as None
+    With a path, records are also kept in a SQLite table for disk_ttl seconds, shared across workers and restarts"""
+    
+    def __init__(self, maxsize: int = 10000, ttl: float = 300, path: str = '', table: str = 'accounts',
+                 disk_ttl: float = 86400):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.disk_ttl = disk_ttl
+        self._records: OrderedDict = OrderedDict()  # account_id -> (expires_at, record)
+        self._lock = threading.Lock()
+        self._table = table
+        self._db = None
+        if path and ttl > 0 and disk_ttl > 0:
+            try:
+                self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+                self._db.execute('PRAGMA journal_mode=WAL')
+                self._db.execute(
+                    f'CREATE TABLE IF NOT EXISTS {table} (account_id TEXT PRIMARY KEY, expires_at REAL, record BLOB)'
+                )
+                self._db.execute(f'DELETE FROM {table} WHERE expires_at <= ?', (time.time(),))
+            except sqlite3.Error as e:
+                print(f"⚠️ Salesforce {table} disk cache unavailable ({str(e)}), using memory only")
+                self._db = None
+    
+    def get_many(self, account_ids: list) -> tuple[dict, list]:
+        """
+        Look up records for a list of account IDs
+        Returns:
+            Tuple of (found, missing)
+            - found: Dict of account_id -> copy of the cached record (None if known not to exist)
+            - missing: Account IDs not cached (or expired), in input order
+        """
+        found = {}
+        missing = []
+        if self.ttl <= 0:
+            return found, list(account_ids)
+        
+        now = time.monotonic()
+        with self._lock:
+            for account_id in account_ids:
+                entry = self._records.get(account_id)
+                if entry and entry[0] > now:
+                    self._records.move_to_end(account_id)
+                    found[account_id] = entry[1].copy() if entry[1] is not None else None
+                else:
+                    if entry:
+                        del self._records[account_id]
+                    missing.append(account_id)
+            
+            if missing and self._db is not None:
+                disk_records = self._disk_get_many(missing)
+                if disk_records:
+                    self._remember_many(disk_records.values())
+                    found.update((account_id, record.copy()) for account_id, record in disk_records.items())
+                    missing = [account_id for account_id in missing if account_id not in disk_records]
+        
+        return found, missing
+    
+    def put_many(self, records: list):
+        """Store records keyed by their Id field, evicting least recently used entries"""
+        if self.ttl <= 0:
+            return
+        
+        with self._lock:
+            self._remember_many(records)
+            if self._db is not None and records:
+                expires_at = time.time() + self.disk_ttl
+                try:
+                    self._db.executemany(
+                        f'INSERT OR REPLACE INTO {self._table} VALUES (?, ?, ?)',
+                        [(record['Id'], expires_at, orjson.dumps(record)) for record in records]
+                    )
+                except sqlite3.Error as e:
+                    print(f"⚠️ Failed to persist Salesforce {self._table} records: {str(e)}")
+    
+    def _remember_many(self, records):
+        """Add records to the in-memory LRU (caller holds the lock)"""
+        expires_at = time.monotonic() + self.ttl
+        for record in records:
+            self._records[record['Id']] = (expires_at, record.copy())
+            self._records.move_to_end(record['Id'])
+        while len(self._records) > self.maxsize:
+            self._records.popitem(last=False)
+    
+    def _disk_get_many(self, account_ids: list) -> dict:
+        """Unexpired records from the SQLite table keyed by account ID (caller holds the lock)"""
+        disk_records = {}
+        now = time.time()
+        try:
+            for i in range(0, len(account_ids), MAX_IDS_PER_DISK_LOOKUP):
+                chunk = account_ids[i:i + MAX_IDS_PER_DISK_LOOKUP]
+                placeholders = ', '.join('?' * len(chunk))
+                rows = self._db.execute(
+                    f'SELECT account_id, record FROM {self._table} WHERE account_id IN ({placeholders}) AND expires_at > ?',
+                    (*chunk, now)
+                ).fetchall()
+                disk_records.update((account_id, orjson.loads(record)) for account_id, record in rows)
+        except sqlite3.Error as e:
+            print(f"⚠️ Failed to read Salesforce {self._table} disk cache: {str(e)}")
+        return disk_records
+    
+    def put_missing(self, account_ids: list):
+        """Remember account IDs Salesforce returned no record for"""
+        if self.ttl <= 0:
+            return
+        
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            for account_id in account_ids:
+                self._records[account_id] = (expires_at, None)
+                self._records.move_to_end(account_id)
+            while len(self._records) > self.maxsize:
+                self._records.popitem(last=False)
+    
+    def clear(self):
+        """Drop all cached records, including the disk copy"""
+        with self._lock:
+            self._records.clear()
+            if self._db is not None:
+                try:
+                    self._db.execute(f'DELETE FROM {self._table}')
+                except sqlite3.Error as e:
+                    print(f"⚠️ Failed to clear Salesforce {self._table} disk cache: {str(e)}")
+
 
 class SalesforceService:
     """Service class for handling Salesforce operations"""
     
     def __init__(self):
-        self.sf: Optional[Salesforce] = None
+        self.sf: Optional[OrjsonSalesforce] = None
         self._is_connected = False
         self.fuzzy_matcher = FuzzyMatchingService()
         self._last_connection_time = 0
         self._connection_timeout = 3600  # 1 hour in seconds
+        self._connection_lock = threading.Lock()  # concurrent fetches share one login
         self.bad_domain_service = BadDomainService()
+        self._session = self._create_http_session()
+        # Per-ID record caches so repeat/refine runs skip SOQL for accounts fetched recently
+        # (optionally persisted to SF_RECORD_CACHE_PATH so restarts and other workers skip them too)
+        self._customer_cache = AccountRecordCache(
+            Config.SF_RECORD_CACHE_SIZE, Config.SF_RECORD_CACHE_TTL,
+            Config.SF_RECORD_CACHE_PATH, 'customer_accounts', Config.SF_RECORD_CACHE_DISK_TTL
+        )
+        self._shell_cache = AccountRecordCache(
+            Config.SF_RECORD_CACHE_SIZE, Config.SF_RECORD_CACHE_TTL,
+            Config.SF_RECORD_CACHE_PATH, 'shell_accounts', Config.SF_RECORD_CACHE_DISK_TTL
+        )
+        # Validation results (found and not found) so re-validating an upload skips SOQL for IDs seen recently
+        self._customer_validation_cache = AccountRecordCache(Config.SF_VALIDATION_CACHE_SIZE, Config.SF_RECORD_CACHE_TTL)
+        self._shell_validation_cache = AccountRecordCache(Config.SF_VALIDATION_CACHE_SIZE, Config.SF_RECORD_CACHE_TTL)
+    
+    def _create_http_session(self) -> requests.Session:
+        """
+        Create the pooled HTTP session shared by every Salesforce connection
+        Keeps TCP/TLS connections alive across queries and retries transient failures
+        """
+        session = requests.Session()
+        # Customer and shell fetches run side by side, each with up to SF_QUERY_WORKERS batch queries
+        # against the same instance host - size the per-host pool so no query waits on or discards a connection
+        adapter = HTTPAdapter(
+            pool_connections=4,  # Distinct hosts kept alive (login + instance)
+            pool_maxsize=max(Config.SF_HTTP_POOL_SIZE, 2 * Config.SF_QUERY_WORKERS),
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+        )
+        session.mount('https://', adapter)
+        return session
     
     def _convert_15_to_18_char_id(self, id_15):
         """Convert 15-character Salesforce ID to 18-character format"""
         if len(id_15) != 15:
             return id_15
+        return _convert_id_15_to_18(id_15)
+    
+    def _convert_ids_bulk(self, account_ids: list) -> list:
+        """
+        Strip IDs and convert every 15-character one to 18 characters (others are kept as-is)
+        Translates each ID to its uppercase mask in one C call and maps the three 5-byte chunks
+        through _CHUNK_SUFFIX, avoiding per-character work for large ID lists
+        """
+        chunk_suffix = _CHUNK_SUFFIX
+        converted = []
+        for account_id in account_ids:
+            account_id = str(account_id).strip()
+            if len(account_id) == 15:
+                mask = account_id.encode('ascii', 'replace').translate(_UPPER_MASK)
+                account_id += chunk_suffix[mask[:5]] + chunk_suffix[mask[5:10]] + chunk_suffix[mask[10:]]
+            converted.append(account_id)
+        return converted
+    
+    def _partition_account_ids(self, account_ids: list) -> tuple[list, list, Optional[dict]]:
+        """
+        Split account IDs by format before querying Salesforce
+        Args:
+            account_ids: Raw account IDs from the uploaded file
+        Returns:
+            Tuple of (query_account_ids, format_invalid_ids, id_mapping)
+            - query_account_ids: Well-formed IDs converted to 18-character format (input order)
+            - format_invalid_ids: IDs that can never match, rejected without a query
+            - id_mapping: Map of 18-char query ID to the original ID (None when every ID was already 18 chars)
+        """
+        format_valid_ids = []
+        format_invalid_ids = []
         
-        # Salesforce ID conversion algorithm
-        suffix = ""
-        for i in range(3):
-            chunk = id_15[i*5:(i+1)*5]
-            chunk_value = 0
-            for j, char in enumerate(chunk):
-                if char.isupper():
-                    chunk_value += 2 ** j
-            
-            # Convert to base-32 character
-            if chunk_value < 26:
-                suffix += chr(ord('A') + chunk_value)
+        for original_id in account_ids:
+            original_id_str = str(original_id).strip()
+            # Already stripped, so go straight to the memoized regex check
+            if _is_account_id_format(original_id_str):
+                format_valid_ids.append(original_id_str)
             else:
-                suffix += str(chunk_value - 26)
+                format_invalid_ids.append(original_id_str)
         
-        return id_15 + suffix
-    
-    def _convert_18_to_15_char_id(self, id_18):
-        """Convert 18-character Salesforce ID to 15-character format"""
-        if len(id_18) == 15:
-            return id_18
-        elif len(id_18) == 18:
-            return id_18[:15]
-        else:
-            return id_18  # Return as-is if invalid format
-    
-    def _are_same_account_id(self, id1: str, id2: str) -> bool:
-        """Check if two Salesforce IDs refer to the same account (handles 15/18 char conversion)"""
-        if not id1 or not id2:
-            return False
+        # Uploads that are already all 18-char IDs are queried as-is - the mapping would be the identity
+        if not any(len(account_id) == 15 for account_id in format_valid_ids):
+            return format_valid_ids, format_invalid_ids, None
         
-        # Convert both to 15-character format for comparison
-        id1_15 = self._convert_18_to_15_char_id(str(id1).strip())
-        id2_15 = self._convert_18_to_15_char_id(str(id2).strip())
+        query_account_ids = []
+        id_mapping = {}
+        for original_id in format_valid_ids:
+            query_id = self._convert_15_to_18_char_id(original_id) if len(original_id) == 15 else original_id
+            query_account_ids.append(query_id)
+            id_mapping[query_id] = original_id
         
-        return id1_15 == id2_15
+        return query_account_ids, format_invalid_ids, id_mapping
     
-    def _is_valid_salesforce_id_format(self, account_id: str) -> bool:
+    def _query_accounts_in_batches(self, fields: tuple, account_ids: list, batch_size: int, label: str) -> tuple[list, int]:
         """
-        Check if an account ID has valid Salesforce ID format (15 or 18 chars, alphanumeric)
+        With SF_BULK_API_THRESHOLD set (off by default), more IDs than that are queried as Bulk API 2.0 jobs instead
+        More than SF_BULK_API_THRESHOLD IDs are queried as Bulk API 2.0 jobs instead of REST SOQL calls
         Args:
-            account_id: The account ID string to validate
+            fields: Account fields for the SELECT clause, and the only keys kept on each record
+            account_ids: 18-character account IDs to query
+            batch_size: Number of IDs per SOQL query (capped at MAX_IDS_PER_QUERY; bulk jobs use MAX_IDS_PER_BULK_JOB)
+            label: Account type used in progress logs (e.g. "customer")
         Returns:
-            True if format is valid, False otherwise
+            Tuple of (account records with only the queried fields, in batch order, number of batches)
         """
-        if not account_id:
-            return False
+        # Only well-formed IDs reach the SOQL string, so IDs from request bodies can't inject SOQL
+        # (malformed IDs could never match an account anyway)
+        well_formed_ids = [account_id for account_id in account_ids if _is_account_id_format(account_id)]
+        if len(well_formed_ids) < len(account_ids):
+            print(f"⚠️ Skipped {len(account_ids) - len(well_formed_ids)} malformed {label} account IDs")
+            account_ids = well_formed_ids
         
-        account_id = str(account_id).strip()
-        
-        # Must be 15 or 18 characters
-        if len(account_id) not in [15, 18]:
-            return False
+        # Large fetches run as Bulk API 2.0 query jobs, which draw on a separate, larger quota than REST calls
+        use_bulk_api = 0 < Config.SF_BULK_API_THRESHOLD < len(account_ids)
+        if use_bulk_api:
+            batch_size = MAX_IDS_PER_BULK_JOB
+        else:
+            batch_size = max(1, min(batch_size, MAX_IDS_PER_QUERY))
+        select_fields = ", ".join(fields)
+        batches = [account_ids[i:i + batch_size] for i in range(0, len(account_ids), batch_size)]
+        total_batches = len(batches)
         
-        # Must be alphanumeric (Salesforce IDs contain letters and numbers only)
-        if not account_id.isalnum():
-            return False
+        def run_batch(batch_num: int) -> list:
+            query = f"SELECT {select_fields} FROM Account WHERE Id IN {_soql_id_list(batches[batch_num])}"
+            
+            assert self.sf is not None
+            if use_bulk_api:
+                records = self._bulk_query_records(query, fields)
+            else:
+                # query_all_iter follows nextRecordsUrl pages lazily, so no batch is ever truncated at 2000 rows;
+                # copying just the queried fields drops Salesforce's 'attributes' metadata along the way
+                records = [{field: record.get(field) for field in fields} for record in self.sf.query_all_iter(query)]
+            
+            # Log progress for large datasets
+            if total_batches > 1 or use_bulk_api:
+                batch_kind = "Bulk API job" if use_bulk_api else "batch"
+                print(f"✅ Processed {label} {batch_kind} {batch_num + 1}/{total_batches} ({len(batches[batch_num])} IDs)")
+            return records
         
-        # Must start with "001" (Account object prefix)
-        if not account_id.startswith('001'):
-            return False
+        if total_batches <= 1 or Config.SF_QUERY_WORKERS <= 1:
+            batch_results = [run_batch(batch_num) for batch_num in range(total_batches)]
+        else:
+            with ThreadPoolExecutor(max_workers=min(Config.SF_QUERY_WORKERS, total_batches)) as executor:
+                batch_results = list(executor.map(run_batch, range(total_batches)))
         
-        return True
+        return [record for records in batch_results for record in records], total_batches
+    
+    def _bulk_query_records(self, query: str, fields: tuple) -> list:
+        """
+        Run a SOQL query as a Bulk API 2.0 job and parse its CSV result pages
+        Returns records with only the queried fields, shaped like REST query records
+        """
+        assert self.sf is not None
+        records = []
+        for page in self.sf.bulk2.Account.query(query):
+            # Bulk API writes null fields as empty CSV values - map them back to None like the REST API
+            records.extend(
+                {field: row.get(field) or None for field in fields}
+                for row in csv.DictReader(io.StringIO(page))
+            )
+        return records
+    
+    def _cached_validation_records(self, validation_cache: AccountRecordCache, record_cache: AccountRecordCache,
+                                   query_account_ids: list) -> tuple[list, list]:
+        """
+        Look up 18-character IDs that were validated or fetched recently
+        Returns:
+            Tuple of (cached_records, unknown_ids)
+            - cached_records: Records of cached IDs that exist in Salesforce
+            - unknown_ids: Unique IDs neither cache has seen, still to be queried
+        """
+        cached, unknown_ids = validation_cache.get_many(list(dict.fromkeys(query_account_ids)))
+        # Accounts fetched for matching exist too, and carry every field validation reads
+        fetched, unknown_ids = record_cache.get_many(unknown_ids)
+        cached_records = [record for record in cached.values() if record is not None] + list(fetched.values())
+        return cached_records, unknown_ids
     
     # NEW METHODS FOR DUAL-FILE MATCHING SYSTEM
     
@@ -100,53 +409,35 @@ class SalesforceService:
             Tuple of (account_data_list, message)
         """
         try:
-            if not self.ensure_connection():
-                return None, "Failed to connect to Salesforce"
-            
             if not account_ids:
                 return [], "No account IDs provided"
             
             # Convert all Account IDs to 18-character format for querying
-            query_account_ids = []
-            for aid in account_ids:
-                if len(str(aid).strip()) == 15:
-                    query_account_ids.append(self._convert_15_to_18_char_id(str(aid).strip()))
-                else:
-                    query_account_ids.append(str(aid).strip())
+            query_account_ids = list(dict.fromkeys(self._convert_ids_bulk(account_ids)))
+            
+            # Serve recently fetched accounts from cache and only query the rest
+            cached_accounts, missing_ids = self._customer_cache.get_many(query_account_ids)
+            
+            # Validation queried the same fields, and IDs it found missing can't return a record either
+            validated, missing_ids = self._customer_validation_cache.get_many(missing_ids)
+            cached_accounts.update((account_id, record) for account_id, record in validated.items() if record is not None)
+            
+            # Only connect when there is something to look up
+            if missing_ids and not self.ensure_connection():
+                return None, "Failed to connect to Salesforce"
             
             # Process in batches to avoid SOQL limits
-            all_customer_accounts = []
-            total_batches = (len(query_account_ids) + batch_size - 1) // batch_size
+            all_customer_accounts, total_batches = self._query_accounts_in_batches(
+                CUSTOMER_ACCOUNT_FIELDS,
+                missing_ids,
+                batch_size,
+                "customer"
+            )
+            self._customer_cache.put_many(all_customer_accounts)
             
-            for batch_num in range(total_batches):
-                start_idx = batch_num * batch_size
-                end_idx = min(start_idx + batch_size, len(query_account_ids))
-                batch_ids = query_account_ids[start_idx:end_idx]
-                
-                # Build batch query for customer account fields
-                ids_string = "', '".join(batch_ids)
-                customer_query = f"""
-                SELECT Id, Name, Website, 
-                       BillingCity, BillingState, BillingCountry, BillingPostalCode
-                FROM Account
-                WHERE Id IN ('{ids_string}')
-                """
-                
-                assert self.sf is not None
-                result = self.sf.query(customer_query)
-                
-                # Process batch results
-                for record in result['records']:
-                    # Remove Salesforce metadata if present
-                    if 'attributes' in record:
-                        del record['attributes']
-                    all_customer_accounts.append(record)
-                
-                # Log progress for large datasets
-                if total_batches > 1:
-                    print(f"✅ Processed customer batch {batch_num + 1}/{total_batches} ({len(batch_ids)} IDs)")
+            all_customer_accounts = list(cached_accounts.values()) + all_customer_accounts
             
-            return all_customer_accounts, f"Successfully retrieved {len(all_customer_accounts)} customer accounts across {total_batches} batches"
+            return all_customer_accounts, f"Successfully retrieved {len(all_customer_accounts)} customer accounts across {total_batches} batches ({len(cached_accounts)} from cache)"
             
         except Exception as e:
             return None, f"Error querying customer accounts: {str(e)}"
@@ -161,53 +452,35 @@ class SalesforceService:
             Tuple of (account_data_list, message)
         """
         try:
-            if not self.ensure_connection():
-                return None, "Failed to connect to Salesforce"
-            
             if not account_ids:
                 return [], "No account IDs provided"
             
             # Convert all Account IDs to 18-character format for querying
-            query_account_ids = []
-            for aid in account_ids:
-                if len(str(aid).strip()) == 15:
-                    query_account_ids.append(self._convert_15_to_18_char_id(str(aid).strip()))
-                else:
-                    query_account_ids.append(str(aid).strip())
+            query_account_ids = list(dict.fromkeys(self._convert_ids_bulk(account_ids)))
+            
+            # Serve recently fetched accounts from cache and only query the rest
+            cached_accounts, missing_ids = self._shell_cache.get_many(query_account_ids)
+            
+            # Validation queried the same fields, and IDs it found missing can't return a record either
+            validated, missing_ids = self._shell_validation_cache.get_many(missing_ids)
+            cached_accounts.update((account_id, record) for account_id, record in validated.items() if record is not None)
+            
+            # Only connect when there is something to look up
+            if missing_ids and not self.ensure_connection():
+                return None, "Failed to connect to Salesforce"
             
             # Process in batches to avoid SOQL limits
-            all_shell_accounts = []
-            total_batches = (len(query_account_ids) + batch_size - 1) // batch_size
+            all_shell_accounts, total_batches = self._query_accounts_in_batches(
+                SHELL_ACCOUNT_FIELDS,
+                missing_ids,
+                batch_size,
+                "shell"
+            )
+            self._shell_cache.put_many(all_shell_accounts)
             
-            for batch_num in range(total_batches):
-                start_idx = batch_num * batch_size
-                end_idx = min(start_idx + batch_size, len(query_account_ids))
-                batch_ids = query_account_ids[start_idx:end_idx]
-                
-                # Build batch query for shell account ZI fields
-                ids_string = "', '".join(batch_ids)
-                shell_query = f"""
-                SELECT Id, ZI_Id__c, ZI_Company_Name__c, ZI_Website__c, 
-                       ZI_Company_City__c, ZI_Company_State__c, ZI_Company_Country__c, ZI_Company_Postal_Code__c
-                FROM Account 
-                WHERE Id IN ('{ids_string}')
-                """
-                
-                assert self.sf is not None
-                result = self.sf.query(shell_query)
-                
-                # Process batch results
-                for record in result['records']:
-                    # Remove Salesforce metadata if present
-                    if 'attributes' in record:
-                        del record['attributes']
-                    all_shell_accounts.append(record)
-                
-                # Log progress for large datasets
-                if total_batches > 1:
-                    print(f"✅ Processed shell batch {batch_num + 1}/{total_batches} ({len(batch_ids)} IDs)")
+            all_shell_accounts = list(cached_accounts.values()) + all_shell_accounts
             
-            return all_shell_accounts, f"Successfully retrieved {len(all_shell_accounts)} shell accounts across {total_batches} batches"
+            return all_shell_accounts, f"Successfully retrieved {len(all_shell_accounts)} shell accounts across {total_batches} batches ({len(cached_accounts)} from cache)"
             
         except Exception as e:
             return None, f"Error querying shell accounts: {str(e)}"
@@ -221,50 +494,50 @@ class SalesforceService:
             Tuple of (validation_result, message)
         """
         try:
-            if not self.ensure_connection():
-                return None, "Failed to connect to Salesforce"
-            
             if not account_ids:
                 return {'valid_account_ids': [], 'invalid_account_ids': []}, "No account IDs to validate"
             
-            # Separate valid format IDs from obviously invalid ones
-            format_valid_ids = []
-            format_invalid_ids = []
-            
-            for original_id in account_ids:
-                original_id_str = str(original_id).strip()
-                if self._is_valid_salesforce_id_format(original_id_str):
-                    format_valid_ids.append(original_id_str)
-                else:
-                    format_invalid_ids.append(original_id_str)
+            # Reject malformed IDs locally and convert the rest to 18-character format for querying
+            query_account_ids, format_invalid_ids, id_mapping = self._partition_account_ids(account_ids)
             
-            # Convert format-valid IDs to 18-character format for querying
-            query_account_ids = []
-            id_mapping = {}  # Map 18-char to original format
+            # IDs validated or fetched recently skip SOQL
+            records, unknown_ids = self._cached_validation_records(
+                self._customer_validation_cache, self._customer_cache, query_account_ids
+            )
             
-            for original_id in format_valid_ids:
-                if len(original_id) == 15:
-                    query_id = self._convert_15_to_18_char_id(original_id)
-                else:
-                    query_id = original_id
-                query_account_ids.append(query_id)
-                id_mapping[query_id] = original_id
+            # Only connect when there is something to look up
+            if unknown_ids and not self.ensure_connection():
+                return None, "Failed to connect to Salesforce"
             
             # Query to check which format-valid IDs actually exist in Salesforce
             valid_account_ids = []
             salesforce_invalid_ids = []
             
-            if query_account_ids:  # Only query if we have format-valid IDs
-                ids_string = "', '".join(query_account_ids)
-                validation_query = f"SELECT Id FROM Account WHERE Id IN ('{ids_string}')"
-                
-                assert self.sf is not None
-                result = self.sf.query(validation_query)
-                
+            if unknown_ids:  # Only query IDs not validated recently
+                # Chunked, concurrent IN-clause queries keep large uploads under SOQL length limits;
+                # fetching the full matching fields primes the record cache, so the matching run that
+                # follows the upload doesn't query these accounts a second time
+                queried_records, _ = self._query_accounts_in_batches(
+                    CUSTOMER_ACCOUNT_FIELDS,
+                    unknown_ids,  # No duplicates in the IN lists
+                    Config.SALESFORCE_BATCH_SIZE,
+                    "customer validation"
+                )
+                self._customer_cache.put_many(queried_records)
+                self._customer_validation_cache.put_many(queried_records)
+                queried_ids = {record['Id'] for record in queried_records}
+                self._customer_validation_cache.put_missing([query_id for query_id in unknown_ids if query_id not in queried_ids])
+                records += queried_records
+            
+            if query_account_ids:
                 # Get valid IDs (convert back to original format)
-                found_ids = {record['Id'] for record in result['records']}
-                valid_account_ids = [id_mapping[query_id] for query_id in query_account_ids if query_id in found_ids]
-                salesforce_invalid_ids = [id_mapping[query_id] for query_id in query_account_ids if query_id not in found_ids]
+                found_ids = {record['Id'] for record in records}
+                for query_id in query_account_ids:
+                    original_id = id_mapping[query_id] if id_mapping is not None else query_id
+                    if query_id in found_ids:
+                        valid_account_ids.append(original_id)
+                    else:
+                        salesforce_invalid_ids.append(original_id)
             
             # Combine format-invalid and Salesforce-invalid IDs
             invalid_account_ids = format_invalid_ids + salesforce_invalid_ids
@@ -296,34 +569,20 @@ class SalesforceService:
             Tuple of (validation_result, message)
         """
         try:
-            if not self.ensure_connection():
-                return None, "Failed to connect to Salesforce"
-            
             if not account_ids:
                 return {'valid_account_ids': [], 'invalid_account_ids': []}, "No account IDs to validate"
             
-            # Separate valid format IDs from obviously invalid ones
-            format_valid_ids = []
-            format_invalid_ids = []
-            
-            for original_id in account_ids:
-                original_id_str = str(original_id).strip()
-                if self._is_valid_salesforce_id_format(original_id_str):
-                    format_valid_ids.append(original_id_str)
-                else:
-                    format_invalid_ids.append(original_id_str)
+            # Reject malformed IDs locally and convert the rest to 18-character format for querying
+            query_account_ids, format_invalid_ids, id_mapping = self._partition_account_ids(account_ids)
             
-            # Convert format-valid IDs to 18-character format for querying
-            query_account_ids = []
-            id_mapping = {}  # Map 18-char to original format
+            # IDs validated or fetched recently skip SOQL
+            records, unknown_ids = self._cached_validation_records(
+                self._shell_validation_cache, self._shell_cache, query_account_ids
+            )
             
-            for original_id in format_valid_ids:
-                if len(original_id) == 15:
-                    query_id = self._convert_15_to_18_char_id(original_id)
-                else:
-                    query_id = original_id
-                query_account_ids.append(query_id)
-                id_mapping[query_id] = original_id
+            # Only connect when there is something to look up
+            if unknown_ids and not self.ensure_connection():
+                return None, "Failed to connect to Salesforce"
             
             # Query to check which format-valid IDs actually exist in Salesforce
             valid_account_ids = []
@@ -334,24 +593,33 @@ class SalesforceService:
                 'accounts_with_complete_zi_data': 0
             }
             
-            if query_account_ids:  # Only query if we have format-valid IDs
-                ids_string = "', '".join(query_account_ids)
-                validation_query = f"""
-                SELECT Id, ZI_Company_Name__c, ZI_Website__c 
-                FROM Account 
-                WHERE Id IN ('{ids_string}')
-                """
-                
-                assert self.sf is not None
-                result = self.sf.query(validation_query)
-                
+            if unknown_ids:  # Only query IDs not validated recently
+                # Chunked, concurrent IN-clause queries keep large uploads under SOQL length limits;
+                # the full matching fields (ZI fields included) prime the record cache for the matching run
+                queried_records, _ = self._query_accounts_in_batches(
+                    SHELL_ACCOUNT_FIELDS,
+                    unknown_ids,  # No duplicates in the IN lists
+                    Config.SALESFORCE_BATCH_SIZE,
+                    "shell validation"
+                )
+                self._shell_cache.put_many(queried_records)
+                self._shell_validation_cache.put_many(queried_records)
+                queried_ids = {record['Id'] for record in queried_records}
+                self._shell_validation_cache.put_missing([query_id for query_id in unknown_ids if query_id not in queried_ids])
+                records += queried_records
+            
+            if query_account_ids:
                 # Get valid IDs (accounts that exist, regardless of ZI data completeness)
-                found_ids = {record['Id'] for record in result['records']}
-                valid_account_ids = [id_mapping[query_id] for query_id in query_account_ids if query_id in found_ids]
-                salesforce_invalid_ids = [id_mapping[query_id] for query_id in query_account_ids if query_id not in found_ids]
+                found_ids = {record['Id'] for record in records}
+                for query_id in query_account_ids:
+                    original_id = id_mapping[query_id] if id_mapping is not None else query_id
+                    if query_id in found_ids:
+                        valid_account_ids.append(original_id)
+                    else:
+                        salesforce_invalid_ids.append(original_id)
                 
                 # Check ZI data completeness for reporting (but don't reject accounts)
-                for record in result['records']:
+                for record in records:
                     if record.get('ZI_Company_Name__c'):
                         zi_data_stats['accounts_with_zi_name'] += 1
                     if record.get('ZI_Website__c'):
@@ -406,15 +674,13 @@ class SalesforceService:
         clean_accounts = []
         flagged_accounts = []
         
-        for account in customer_accounts:
-            # Check for bad domains (only checks Website field for customer accounts)
-            bad_domain_result = self.compute_bad_domain_flag(account)
-            
-            # Add the bad domain flag to the account data
-            account_with_flag = account.copy()
-            account_with_flag['Bad_Domain'] = bad_domain_result
-            
-            if bad_domain_result['is_bad']:
+        # Only the Website field is checked for customer accounts, so check them all in one batch
+        websites = [account.get('Website', '') for account in customer_accounts]
+        results = self.bad_domain_service.check_batch(websites)
+        
+        for account, (is_bad, explanation) in zip(customer_accounts, results):
+            account_with_flag = {**account, 'Bad_Domain': {'is_bad': is_bad, 'explanation': explanation}}
+            if is_bad:
                 flagged_accounts.append(account_with_flag)
             else:
                 clean_accounts.append(account_with_flag)
@@ -428,15 +694,16 @@ class SalesforceService:
             Config.validate_salesforce_config()
             
             # Create Salesforce connection
-            self.sf = Salesforce(
+            self.sf = OrjsonSalesforce(
                 username=Config.SF_USERNAME,
                 password=Config.SF_PASSWORD,
                 security_token=Config.SF_SECURITY_TOKEN,
-                domain=Config.SF_DOMAIN
+                domain=Config.SF_DOMAIN,
+                session=self._session
             )
             
             self._is_connected = True
-            self._last_connection_time = time.time()
+            self._last_connection_time = time.monotonic()
             return True
         except Exception as e:
             print(f"Failed to connect to Salesforce: {str(e)}")
@@ -444,15 +711,16 @@ class SalesforceService:
             return False
     
     def ensure_connection(self):
-        """Ensure we have an active Salesforce connection"""
-        current_time = time.time()
-        
-        # If we have a connection and it's not timed out, use it
-        if self._is_connected and self.sf and (current_time - self._last_connection_time) < self._connection_timeout:
-            return True
+        """Ensure we have an active Salesforce connection (threads needing one at once log in only once)"""
+        with self._connection_lock:
+            current_time = time.monotonic()
             
-        # Otherwise, establish a new connection
-        return self.connect()
+            # If we have a connection and it's not timed out, use it
+            if self._is_connected and self.sf and (current_time - self._last_connection_time) < self._connection_timeout:
+                return True
+                
+            # Otherwise, establish a new connection
+            return self.connect()
     
     def test_connection(self):
         """Test if connection is working by running a simple query"""
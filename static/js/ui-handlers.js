@@ -185,7 +185,7 @@ async function handleValidateCustomerIds() {
         showLoading(responseDiv, 'Validating customer account IDs with Salesforce...');
         
         const formData = new FormData();
-        formData.append('file', fileInput.files[0]);
+        appendWorkbook(formData, workflowState.customerData.file, fileInput.files[0]);
         formData.append('sheet_name', sheetSelect.value);
         formData.append('account_id_column', columnSelect.value);
         
@@ -337,8 +337,8 @@ async function handleValidateShellIds() {
     try {
         showLoading(responseDiv, 'Validating shell account IDs with Salesforce...');
     
-    const formData = new FormData();
-    formData.append('file', fileInput.files[0]);
+        const formData = new FormData();
+        appendWorkbook(formData, workflowState.shellData.file, fileInput.files[0]);
         formData.append('sheet_name', sheetSelect.value);
         formData.append('account_id_column', columnSelect.value);
         
@@ -640,6 +640,16 @@ function handleResetProcess() {
 }
 
 // UTILITY FUNCTIONS
+function appendWorkbook(formData, parsedFile, file) {
+    // Reuse the workbook staged by /excel/parse instead of uploading it again
+    if (parsedFile && parsedFile.workbook_id) {
+        formData.append('workbook_id', parsedFile.workbook_id);
+        formData.append('file_name', file.name);
+    } else {
+        formData.append('file', file);
+    }
+}
+
 function populateDropdown(selectId, options) {
     const select = document.getElementById(selectId);
     select.innerHTML = '';
@@ -0,0 +1,38 @@
+import unittest
+
+from services.bad_domain_service import BadDomainService
+
+
+class BadDomainBatchCheckTest(unittest.TestCase):
+    """check_batch gives the same answer as checking each website on its own, in input order"""
+    
+    WEBSITES = [
+        'https://www.gmail.com',
+        'acme.com',
+        'gmail.comno',  # Malformed suffix on a bad domain
+        'mail.yahoo.com',  # Subdomain of a bad domain
+        '',
+        'acme.com',
+        'https://www.gmail.com',
+    ]
+    
+    def setUp(self):
+        self.service = BadDomainService()
+    
+    def test_matches_single_checks(self):
+        expected = [self.service.check_account_for_bad_domains({'Website': website}) for website in self.WEBSITES]
+        self.assertEqual(self.service.check_batch(self.WEBSITES), expected)
+    
+    def test_flags(self):
+        flags = [is_bad for is_bad, _ in self.service.check_batch(self.WEBSITES)]
+        self.assertEqual(flags, [True, False, True, True, False, False, True])
+    
+    def test_overlapping_bad_domains_resolve_to_most_specific(self):
+        self.assertEqual(self.service.extract_domain_from_url('mail.yahoo.com.au'), 'yahoo.com.au')
+    
+    def test_empty_batch(self):
+        self.assertEqual(self.service.check_batch([]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
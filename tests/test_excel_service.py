@@ -0,0 +1,96 @@
+import csv
+import io
+import os
+import unittest
+import zipfile
+from unittest import mock
+
+from openpyxl import load_workbook
+
+from services import excel_service
+from services.excel_service import ExcelService
+
+
+MATCHED_PAIRS = [{
+    'customer_account': {'Id': '001A0000006Vm9rIAC', 'Name': 'Acme Corp', 'Website': 'acme.com', 'BillingCity': 'Austin'},
+    'recommended_shell': {'Id': '001A0000006Vm9sIAC', 'ZI_Company_Name__c': 'Acme Corporation', 'ZI_Id__c': '42'},
+    'match_confidence': 91.5,
+    'website_match': 100.0,
+    'name_match': 80.0,
+    'address_consistency': 30.0,
+    'ai_assessment': {'confidence_score': 88, 'explanation_bullets': ["✅ Same domain", "⚠️ Different city"]},
+    'candidate_count': 3,
+    'total_shells': 10
+}]
+UNMATCHED = [{'customer_account': {'Id': '001A0000006Vm9tIAC', 'Name': 'Zeta LLC'}}]
+FLAGGED = [{'Id': '001A0000006Vm9uIAC', 'Name': 'Beta Inc', 'Website': 'gmail.com',
+            'Bad_Domain': {'explanation': "Website domain 'gmail.com' from Website matches bad domain list"}}]
+INVALID = ['001A0000006Vm9v']
+SUMMARY = {'total_customer_accounts': 4, 'clean_customer_accounts': 2, 'matched_pairs': 1,
+           'unmatched_customers': 1, 'flagged_customer_accounts': 1, 'total_shell_accounts': 10,
+           'execution_time': '0.10s'}
+
+# Rows sort by customer name
+EXPECTED_ORDER = [
+    ('Acme Corp', 'MATCHED'), ('Beta Inc', 'FLAGGED'), ('INVALID ACCOUNT ID', 'INVALID'), ('Zeta LLC', 'UNMATCHED')
+]
+
+
+class MatchingResultsExportTest(unittest.TestCase):
+    """Excel (xlsxwriter and openpyxl) and zipped CSV exports hold every customer with its status"""
+    
+    def setUp(self):
+        self.service = ExcelService()
+    
+    def _export(self, method):
+        result = method(MATCHED_PAIRS, UNMATCHED, FLAGGED, INVALID, SUMMARY)
+        self.assertTrue(result['success'], result.get('error'))
+        self.addCleanup(os.remove, result['file_path'])
+        return result
+    
+    def _assert_results(self, rows):
+        header = next(i for i, row in enumerate(rows) if row and row[0] == 'Customer ID')
+        data_rows = [row for row in rows[header + 1:] if row and row[0]]
+        self.assertEqual([(row[1], row[4]) for row in data_rows], EXPECTED_ORDER)
+        
+        headers = list(rows[header])
+        matched = data_rows[0]
+        self.assertEqual(matched[headers.index('Shell Name')], 'Acme Corporation')
+        self.assertEqual(matched[headers.index('Overall Match Confidence')], '91.5%')
+        self.assertEqual(matched[headers.index('AI Confidence Score')], '88/100')
+        self.assertEqual(matched[headers.index('AI Explanation')], "✅ Same domain\n⚠️ Different city")
+    
+    def _assert_workbook(self, file_path):
+        wb = load_workbook(file_path, read_only=True)
+        try:
+            self.assertEqual(wb.sheetnames, ['Customer Match Results', 'Summary Metrics'])
+            self._assert_results([list(row) for row in wb['Customer Match Results'].iter_rows(values_only=True)])
+            metrics = {row[0]: row[1] for row in wb['Summary Metrics'].iter_rows(values_only=True) if len(row) > 1 and row[0]}
+            self.assertEqual(metrics['Match Success Rate'], '50.0%')
+        finally:
+            wb.close()
+    
+    @unittest.skipIf(excel_service.xlsxwriter is None, "xlsxwriter is not installed")
+    def test_excel_export_with_xlsxwriter(self):
+        result = self._export(self.service.create_matching_results_export)
+        self.assertTrue(result['filename'].endswith('.xlsx'))
+        self._assert_workbook(result['file_path'])
+    
+    def test_excel_export_with_openpyxl(self):
+        with mock.patch.object(excel_service, 'xlsxwriter', None):
+            result = self._export(self.service.create_matching_results_export)
+        self._assert_workbook(result['file_path'])
+    
+    def test_csv_export(self):
+        result = self._export(self.service.create_matching_results_export_csv)
+        self.assertTrue(result['filename'].endswith('.zip'))
+        with zipfile.ZipFile(result['file_path']) as archive:
+            self.assertEqual(sorted(archive.namelist()), ['results.csv', 'summary.csv'])
+            results = archive.read('results.csv').decode('utf-8-sig')
+            summary = archive.read('summary.csv').decode('utf-8-sig')
+        self._assert_results(list(csv.reader(io.StringIO(results))))
+        self.assertIn(['Match Success Rate', '50.0%'], list(csv.reader(io.StringIO(summary))))
+
+
+if __name__ == '__main__':
+    unittest.main()
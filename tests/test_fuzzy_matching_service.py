@@ -0,0 +1,73 @@
+import unittest
+
+from services.fuzzy_matching_service import FuzzyMatchingService
+
+
+def _shell(shell_id, name, website=''):
+    return {'Id': shell_id, 'ZI_Company_Name__c': name, 'ZI_Website__c': website}
+
+
+class QgramBlockingTest(unittest.TestCase):
+    """Customers with no exact domain/name-token hit are compared to shells sharing enough 3-grams"""
+    
+    SHELLS = [
+        _shell('S1', 'Acme Widgets', 'acmewidgets.com'),
+        _shell('S2', 'Zebra Logistics', 'zebralogistics.com'),
+        _shell('S3', 'Northwind Traders', 'northwind.com'),
+    ]
+    CUSTOMER = {'Name': 'AcmeWidgets', 'Website': ''}  # No shared token with "acme widgets"
+    
+    def test_fast_filter_finds_no_token_hit(self):
+        matcher = FuzzyMatchingService()
+        hash_buckets = matcher.create_hash_buckets(self.SHELLS)
+        self.assertEqual(matcher.fast_filter_candidates(self.CUSTOMER, hash_buckets), [])
+    
+    def test_qgrams_keep_only_similar_shells(self):
+        matcher = FuzzyMatchingService()
+        hash_buckets = matcher.create_hash_buckets(self.SHELLS)
+        candidates = matcher.qgram_filter_candidates(self.CUSTOMER, hash_buckets)
+        self.assertEqual([shell['Id'] for shell in candidates], ['S1'])
+    
+    def test_domain_grams_are_used_too(self):
+        matcher = FuzzyMatchingService()
+        hash_buckets = matcher.create_hash_buckets(self.SHELLS)
+        candidates = matcher.qgram_filter_candidates({'Name': '', 'Website': 'https://north-wind.io'}, hash_buckets)
+        self.assertEqual([shell['Id'] for shell in candidates], ['S3'])
+    
+    def test_blocking_applies_above_full_scan_limit(self):
+        blocked = FuzzyMatchingService(full_scan_limit=2).find_best_shell_match(self.CUSTOMER, self.SHELLS)
+        self.assertEqual(blocked['candidate_count'], 1)
+        self.assertEqual(blocked['best_match']['shell_id'], 'S1')
+        
+        full_scan = FuzzyMatchingService(full_scan_limit=500).find_best_shell_match(self.CUSTOMER, self.SHELLS)
+        self.assertEqual(full_scan['candidate_count'], len(self.SHELLS))
+        self.assertEqual(full_scan['best_match']['shell_id'], 'S1')
+
+
+class FastFilterTest(unittest.TestCase):
+    """Exact domain hits come first; name-token candidates fill the rest, closest names first"""
+    
+    SHELLS = [
+        _shell('S1', 'Globex Holdings', 'acme.com'),
+        _shell('S2', 'Acme Rockets', 'rockets.com'),
+        _shell('S3', 'Acme Widget Company', 'widgets.com'),
+        _shell('S4', 'Acme Widgets', 'other.com'),
+    ]
+    
+    def test_name_candidates_kept_alongside_domain_hit(self):
+        matcher = FuzzyMatchingService()
+        candidates = matcher.fast_filter_candidates(
+            {'Name': 'Acme Widgets', 'Website': 'https://www.acme.com'}, matcher.create_hash_buckets(self.SHELLS)
+        )
+        self.assertEqual({shell['Id'] for shell in candidates}, {'S1', 'S2', 'S3', 'S4'})
+    
+    def test_cut_keeps_domain_hit_and_closest_names(self):
+        matcher = FuzzyMatchingService(max_candidates=2)
+        candidates = matcher.fast_filter_candidates(
+            {'Name': 'Acme Widgets', 'Website': 'https://www.acme.com'}, matcher.create_hash_buckets(self.SHELLS)
+        )
+        self.assertEqual({shell['Id'] for shell in candidates}, {'S1', 'S4'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,193 @@
+import asyncio
+import json
+import os
+import re
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+os.environ.setdefault('OPENAI_API_KEY', 'test-key')
+
+from services import openai_service
+from services.openai_service import AssessmentCache
+
+
+class _FailingCompletions:
+    """Chat completions endpoint that always fails like an exhausted rate limit"""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    async def create(self, **kwargs):
+        self.calls += 1
+        raise RuntimeError("Error code: 429 - Rate limit reached")
+
+
+class _FailingAsyncClient:
+    def __init__(self):
+        self.chat = mock.Mock()
+        self.chat.completions = _FailingCompletions()
+
+
+class _EchoCompletions:
+    """Chat completions endpoint that scores each pair by the number in its customer name"""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    async def create(self, **kwargs):
+        self.calls += 1
+        user_prompt = kwargs['messages'][-1]['content']
+        assessments = [
+            {'confidence_score': int(number), 'explanation_bullets': [f"✅ Pair {number}"]}
+            for number in re.findall(r'"Customer Name": "Pair (\d+)"', user_prompt)
+        ]
+        content = json.dumps({'assessments': assessments} if 'assessments' in user_prompt else assessments[0])
+        message = mock.Mock(content=content)
+        return mock.Mock(choices=[mock.Mock(message=message)], usage=None)
+
+
+class _EchoAsyncClient:
+    def __init__(self):
+        self.chat = mock.Mock()
+        self.chat.completions = _EchoCompletions()
+
+
+def _pairs(count):
+    """Distinct mid-score pairs, so every one needs the model"""
+    return [
+        {
+            'customer_account': {'Name': f'Pair {i}'},
+            'shell_account': {'ZI_Company_Name__c': f'Shell {i}'},
+            'match_scores': {'website_match': 50, 'name_match': 50, 'address_consistency': 50}
+        }
+        for i in range(count)
+    ]
+
+
+class AsyncBatchingTest(unittest.TestCase):
+    """Concurrent and grouped assessments come back complete and in input order"""
+    
+    def setUp(self):
+        self.client = _EchoAsyncClient()
+        patch = mock.patch.object(openai_service, 'assessment_cache', AssessmentCache(maxsize=100, ttl=0))
+        patch.start()
+        self.addCleanup(patch.stop)
+    
+    def _assess(self, pairs, **kwargs):
+        return asyncio.run(openai_service.get_ai_match_assessments_async(pairs, async_client=self.client, **kwargs))
+    
+    def test_results_keep_input_order(self):
+        results = self._assess(_pairs(7), concurrency=3)
+        self.assertEqual([result['confidence_score'] for result in results], list(range(7)))
+        self.assertTrue(all(result['success'] for result in results))
+        self.assertEqual(self.client.chat.completions.calls, 7)
+    
+    def test_pairs_are_grouped_per_request(self):
+        results = self._assess(_pairs(5), concurrency=2, pairs_per_request=2)
+        self.assertEqual([result['confidence_score'] for result in results], list(range(5)))
+        self.assertEqual(self.client.chat.completions.calls, 3)
+    
+    def test_results_are_reported_as_they_complete(self):
+        reported = {}
+        self._assess(_pairs(4), concurrency=2, on_result=reported.__setitem__)
+        self.assertEqual(sorted(reported), [0, 1, 2, 3])
+
+
+class AsyncRateLimiterTest(unittest.TestCase):
+    """The token bucket allows one second's burst, then paces callers at the configured rate"""
+    
+    def _elapsed(self, limiter, acquisitions, amount=1.0):
+        async def run():
+            start = time.monotonic()
+            for _ in range(acquisitions):
+                await limiter.acquire(amount)
+            return time.monotonic() - start
+        return asyncio.run(run())
+    
+    def test_unlimited_never_waits(self):
+        self.assertLess(self._elapsed(openai_service.AsyncRateLimiter(0), 1000), 0.1)
+    
+    def test_burst_then_paced(self):
+        limiter = openai_service.AsyncRateLimiter(600)  # 10 per second, bursts of 10
+        self.assertLess(self._elapsed(limiter, 10), 0.1)
+        self.assertGreaterEqual(self._elapsed(limiter, 3), 0.25)
+    
+    def test_large_amount_leaves_bucket_in_debt(self):
+        limiter = openai_service.AsyncRateLimiter(600)
+        self._elapsed(limiter, 1, amount=20)  # Full bucket, then 10 tokens of debt
+        self.assertGreaterEqual(self._elapsed(limiter, 1), 0.95)
+
+
+class OpenAIFailureCachingTest(unittest.TestCase):
+    """API failures must come back as failures and never be served from the assessment cache"""
+    
+    PAIR = {
+        'customer_account': {'Name': 'Acme Corp', 'Website': 'acme.com'},
+        'shell_account': {'ZI_Company_Name__c': 'Acme Corporation', 'ZI_Website__c': 'acme.io'},
+        # Mid scores so the pair needs the model rather than being settled locally
+        'match_scores': {'website_match': 50, 'name_match': 50, 'address_consistency': 50}
+    }
+    
+    def setUp(self):
+        openai_service._get_background_loop()  # Starts the loop, which resets the shared client
+        self.client = _FailingAsyncClient()
+        self.cache = AssessmentCache(maxsize=100, ttl=3600)
+        patches = [
+            mock.patch.object(openai_service, '_shared_async_client', self.client),
+            mock.patch.object(openai_service, 'assessment_cache', self.cache),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+    
+    def test_error_response_parses_as_failure(self):
+        result = openai_service._parse_ai_assessment(openai_service._openai_error_response(RuntimeError("429")))
+        self.assertFalse(result['success'])
+        self.assertIn('429', result['error'])
+    
+    def test_failed_assessment_is_not_cached(self):
+        results = dict(openai_service.iter_ai_match_assessments([self.PAIR], requests_per_minute=0))
+        self.assertFalse(results[0]['success'])
+        self.assertIsNone(self.cache.get(AssessmentCache.key_for(self.PAIR)))
+        
+        # A rerun asks OpenAI again instead of replaying the failure
+        dict(openai_service.iter_ai_match_assessments([self.PAIR], requests_per_minute=0))
+        self.assertEqual(self.client.chat.completions.calls, 2)
+
+
+class AssessmentCacheDiskTest(unittest.TestCase):
+    """Error assessments must not reach the SQLite file, and old files are cleaned on open"""
+    
+    GOOD = {'success': True, 'confidence_score': 80, 'explanation_bullets': ["✅ Same domain"], 'raw_response': '{}'}
+    ERROR = {'success': True, 'confidence_score': 0, 'raw_response': '{}',
+             'explanation_bullets': ["❌ Error: Error code: 429", "⚠️ Using computed scores only due to AI service error"]}
+    
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.path = os.path.join(tmpdir.name, 'assessments.db')
+    
+    def test_error_fallback_is_not_persisted(self):
+        cache = AssessmentCache(ttl=3600, path=self.path)
+        cache.put('good', self.GOOD)
+        cache.put('error', self.ERROR)
+        
+        reopened = AssessmentCache(ttl=3600, path=self.path)
+        self.assertEqual(reopened.get('good')['confidence_score'], 80)
+        self.assertIsNone(reopened.get('error'))
+    
+    def test_existing_error_rows_are_purged_on_open(self):
+        cache = AssessmentCache(ttl=3600, path=self.path)
+        # Simulate a file written before error fallbacks were kept out of the cache
+        cache._db.execute(
+            'INSERT INTO assessments VALUES (?, ?, ?)', ('error', time.time() + 3600, json.dumps(self.ERROR))
+        )
+        
+        AssessmentCache(ttl=3600, path=self.path)
+        self.assertEqual(cache._db.execute('SELECT COUNT(*) FROM assessments').fetchone()[0], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+from services.salesforce_service import SalesforceService
+
+
+def _reference_18_char_id(id_15):
+    """Salesforce's published checksum: one suffix character per 5-character chunk's uppercase bitmap"""
+    alphabet = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ012345'
+    suffix = ''
+    for start in range(0, 15, 5):
+        bits = sum(1 << i for i, char in enumerate(id_15[start:start + 5]) if 'A' <= char <= 'Z')
+        suffix += alphabet[bits]
+    return id_15 + suffix
+
+
+class AccountIdConversionTest(unittest.TestCase):
+    """15-character IDs gain the case-checksum suffix; everything else passes through"""
+    
+    IDS_15 = ['001A0000006Vm9r', '001000000000000', '001ZZZZZZZZZZZZ', '001xYzAbCdEfGhI', '0015g00000AbCdE']
+    
+    def setUp(self):
+        self.service = SalesforceService()
+    
+    def test_known_id(self):
+        self.assertEqual(self.service._convert_15_to_18_char_id('001A0000006Vm9r'), '001A0000006Vm9rIAC')
+    
+    def test_matches_reference_algorithm(self):
+        for id_15 in self.IDS_15:
+            self.assertEqual(self.service._convert_15_to_18_char_id(id_15), _reference_18_char_id(id_15))
+    
+    def test_bulk_conversion_matches_single(self):
+        converted = self.service._convert_ids_bulk([f' {id_15} ' for id_15 in self.IDS_15] + ['001A0000006Vm9rIAC'])
+        self.assertEqual(converted, [_reference_18_char_id(id_15) for id_15 in self.IDS_15] + ['001A0000006Vm9rIAC'])
+    
+    def test_partition_maps_query_ids_back_to_originals(self):
+        id_18 = _reference_18_char_id('0015g00000AbCdE')
+        query_ids, invalid_ids, id_mapping = self.service._partition_account_ids(
+            [' 001A0000006Vm9r', id_18, 'not-an-id']
+        )
+        self.assertEqual(query_ids, ['001A0000006Vm9rIAC', id_18])
+        self.assertEqual(invalid_ids, ['not-an-id'])
+        self.assertEqual(id_mapping, {'001A0000006Vm9rIAC': '001A0000006Vm9r', id_18: id_18})
+    
+    def test_partition_skips_mapping_without_15_char_ids(self):
+        _, _, id_mapping = self.service._partition_account_ids(['001A0000006Vm9rIAC'])
+        self.assertIsNone(id_mapping)
+
+
+if __name__ == '__main__':
+    unittest.main()